@@ -32,6 +32,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'visualizer.middleware.CompressionMiddleware',  # gzip/brotli for JSON API responses
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -114,4 +115,108 @@ WEBPACK_LOADER = {
         'TIMEOUT': None,
         'IGNORE': [r'.+\.hot-update.js', r'.+\.map'],
     }
-}
\ No newline at end of file
+}
+
+# Trace encoding settings
+# Delta-encoded traces carry a full array snapshot every N steps for seeking
+TRACE_KEYFRAME_INTERVAL = 64
+
+# Caches
+# The 'traces' cache holds computed algorithm traces. LocMemCache evicts the
+# least recently used entries; a CULL_FREQUENCY equal to MAX_ENTRIES makes it
+# drop a single entry at a time.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'algoviz-default',
+    },
+    'traces': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'algoviz-traces',
+        'TIMEOUT': 60 * 60,
+        'OPTIONS': {
+            'MAX_ENTRIES': 64,
+            'CULL_FREQUENCY': 64,
+        },
+    },
+}
+
+TRACE_CACHE_ALIAS = 'traces'
+# Traces with more steps or (estimated) bytes than this are never cached, so
+# the traces cache holds at most MAX_ENTRIES * TRACE_CACHE_MAX_ENTRY_BYTES
+TRACE_CACHE_MAX_STEPS = 50000
+TRACE_CACHE_MAX_ENTRY_BYTES = 2 * 1024 * 1024
+
+# Paged step retrieval (/api/visualizations/<id>/steps/)
+VISUALIZATION_STEPS_PAGE_SIZE = 100
+VISUALIZATION_STEPS_MAX_PAGE_SIZE = 1000
+# Decoded traces kept in memory for paging, bounded by their total steps
+TRACE_PAGE_CACHE_MAX_STEPS = 100000
+
+# Executed visualizations are saved by a background writer thread in batches
+VISUALIZATION_ASYNC_SAVE = True
+VISUALIZATION_SAVE_BATCH_SIZE = 50
+VISUALIZATION_SAVE_QUEUE_SIZE = 1000
+
+# Trace budgets, checked against the cost model before an algorithm runs.
+# Full traces over the byte budget are downgraded to the delta format when
+# that fits; anything still over budget is rejected with 413. The step and
+# byte budgets apply to the trace sent at the requested ?detail=; the work
+# budget to the full trace the engine walks through, where a dropped step
+# costs about as much as a counted one (see COUNT_MAX_STEPS).
+TRACE_MAX_STEPS = 250000
+TRACE_MAX_BYTES = 64 * 1024 * 1024
+TRACE_MAX_WORK = 20000000
+# Per-algorithm overrides, e.g. {'Bubble Sort': {'max_steps': 100000, 'max_work': 5000000}}
+TRACE_BUDGET_OVERRIDES = {}
+
+# Trace generation runs in a pool of worker processes (0 runs it inline).
+# Jobs over the CPU limit (seconds of CPU) or timeout (seconds of wall time
+# from when the job reaches a worker) fail with a timeout error, and only the
+# overrunning worker is killed; workers are restarted after a number of jobs.
+TRACE_EXECUTOR_WORKERS = 2
+TRACE_EXECUTOR_TIMEOUT = 30
+TRACE_EXECUTOR_CPU_LIMIT = 20
+TRACE_EXECUTOR_MEMORY_LIMIT = 1024 * 1024 * 1024
+TRACE_EXECUTOR_MAX_TASKS_PER_CHILD = 50
+
+# Most algorithms one /api/execute-algorithm/batch/ request may run
+BATCH_MAX_ALGORITHMS = 8
+
+# Cached dashboard catalogue (grouped lists and rendered sidebar fragment);
+# invalidated by Algorithm/DataStructure save and delete signals
+CATALOGUE_CACHE_ALIAS = 'default'
+CATALOGUE_CACHE_TIMEOUT = 60 * 60
+
+# Cursor-paginated visualization history (/api/visualizations/?page_size=)
+VISUALIZATION_PAGE_SIZE = 20
+VISUALIZATION_MAX_PAGE_SIZE = 100
+
+# JSON responses smaller than this are sent uncompressed
+RESPONSE_COMPRESSION_MIN_SIZE = 1024
+# Brotli is used when the brotli package is installed; 5 trades a little
+# ratio for much faster compression than the maximum of 11
+BROTLI_QUALITY = 5
+
+# Per-algorithm latency, step count and response size histograms, served in
+# the Prometheus text format at /metrics (404 when disabled)
+METRICS_ENABLED = True
+
+# Functions listed in ?profile=1 responses and by the profile_visualization command
+PROFILE_TOP_FUNCTIONS = 25
+
+# Operation counts (/api/execute-algorithm/counts/) skip the trace, so they get
+# their own limits: steps the counted run may take (about 3 million a second)
+# and values in an input generated from a 'generate' spec
+COUNT_MAX_STEPS = 50000000
+COUNT_MAX_INPUT_SIZE = 1000000
+
+# Measured complexity curves (/api/algorithms/<id>/complexity/): input sizes
+# double from the minimum until one counted run would take more steps or values
+# than allowed, or a run takes longer than the time limit (seconds). Curves are
+# cached until the engine version changes.
+COMPLEXITY_MIN_SIZE = 16
+COMPLEXITY_MAX_STEPS = 5000000
+COMPLEXITY_MAX_INPUT_SIZE = 262144
+COMPLEXITY_MAX_RUN_SECONDS = 1.0
+COMPLEXITY_CACHE_ALIAS = 'default'
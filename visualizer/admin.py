@@ -1,6 +1,7 @@
 from django.contrib import admin
-from .models import Algorithm, DataStructure, Visualization
+from .models import Algorithm, DataStructure, TraceBlob, Visualization
 
 admin.site.register(Algorithm)
 admin.site.register(DataStructure)
-admin.site.register(Visualization)
\ No newline at end of file
+admin.site.register(Visualization)
+admin.site.register(TraceBlob)
\ No newline at end of file
@@ -4,62 +4,269 @@ Enhanced Algorithm Engine for AlgoViz3D
 This module provides complete implementations for all algorithms with detailed
 step-by-step explanations and visualization cues, optimized for the enhanced
 visualization interface.
+
+Every algorithm is a generator that yields its steps as they are produced, so
+callers can stream a trace without holding all of it in memory. Step text lives
+in a static message catalogue per algorithm; steps carry a message ID and the
+parameters needed to render it.
+
+Algorithms take a ``keep`` filter and only build the steps it accepts, so a
+coarser level of detail (see DETAIL_LEVELS) makes long traces cheaper to
+generate as well as to send.
 """
 
-def execute_algorithm_steps(algorithm_name, input_data):
+import heapq
+import time
+from collections import Counter, defaultdict, deque
+
+# Bump whenever the step format changes so cached and stored traces produced
+# by an older engine are not mixed with new ones
+ENGINE_VERSION = 3
+
+MESSAGE_MODES = ('inline', 'catalogue')
+
+
+def iter_algorithm_steps(algorithm_name, input_data, messages='inline', detail='full'):
+    """
+    Return a generator over the visualization steps of the specified algorithm.
+    Unknown algorithms raise ValueError immediately rather than on first step.
+    
+    Steps reference their text by message ID in the algorithm's catalogue.
+    With messages='inline' the description, educational_note and
+    complexity_note strings are rendered into every step; with
+    messages='catalogue' steps keep only 'message' and 'params', and the
+    caller sends MESSAGE_CATALOGUES[algorithm_name] alongside them.
+    
+    ``detail`` is one of DETAIL_LEVELS or a maximum number of steps; a
+    maximum is only met once the whole trace has run, so those steps are
+    collected before the first one is returned.
+    """
+    if algorithm_name not in ALGORITHM_FUNCTIONS:
+        raise ValueError(f"Algorithm '{algorithm_name}' not implemented")
+    
+    if messages not in MESSAGE_MODES:
+        raise ValueError(f"Unknown message mode '{messages}'")
+    
+    if not is_valid_detail(detail):
+        raise ValueError(f"Unknown level of detail '{detail}'")
+    
+    if isinstance(detail, int):
+        sampler = FrameSampler(detail)
+        steps = iter(sampler.collect(ALGORITHM_FUNCTIONS[algorithm_name](input_data, sampler)))
+    else:
+        steps = ALGORITHM_FUNCTIONS[algorithm_name](input_data, DETAIL_FILTERS[detail])
+    
+    if messages == 'inline':
+        return render_step_messages(steps, MESSAGE_CATALOGUES[algorithm_name])
+    return steps
+
+
+def execute_algorithm_steps(algorithm_name, input_data, messages='inline', detail='full'):
     """
     Execute the specified algorithm and return visualization steps.
     Each step includes detailed educational explanations and visual cues
     for the enhanced 3D visualization.
     """
-    algorithm_functions = {
-        # Sorting algorithms
-        'Bubble Sort': bubble_sort,
-        'Selection Sort': selection_sort,
-        'Insertion Sort': insertion_sort,
-        'Merge Sort': merge_sort,
-        'Quick Sort': quick_sort,
-        
-        # Searching algorithms
-        'Linear Search': linear_search,
-        'Binary Search': binary_search,
-        
-        # Tree operations
-        'BST Insertion': bst_insertion,
-        'BST Traversal': bst_traversal,
-        
-        # Graph algorithms
-        'Breadth-First Search': bfs,
-        'Depth-First Search': dfs,
-        'Dijkstra\'s Algorithm': dijkstra,
-    }
-    
-    if algorithm_name not in algorithm_functions:
-        raise ValueError(f"Algorithm '{algorithm_name}' not implemented")
+    return list(iter_algorithm_steps(algorithm_name, input_data, messages, detail))
+
+
+def render_step_messages(steps, catalogue):
+    """
+    Replace each step's message ID and params with the rendered text fields,
+    keeping them where the message ID sat in the step.
+    """
+    for step in steps:
+        params = step.get('params')
+        rendered = {}
+        
+        for key, value in step.items():
+            if key == 'message':
+                for field, template in catalogue[value].items():
+                    rendered[field] = template.format(**params) if params else template
+            elif key != 'params':
+                rendered[key] = value
+        
+        yield rendered
+
+
+# ===================== LEVEL OF DETAIL =====================
+
+# Steps that start or finish a pass, phase or subproblem; sent at every level
+MILESTONE_STEP_TYPES = {
+    'initial', 'final',
+    'pass_start', 'sorted', 'early_termination', 'selection_start', 'current',
+    'divide', 'merged', 'partition', 'subarray_sorted',
+    'search_range', 'found', 'not_found',
+    'insert_start', 'after_insertion',
+    'inorder_start', 'inorder_complete', 'preorder_start', 'preorder_complete',
+    'postorder_start', 'postorder_complete',
+    'bfs_start', 'bfs_new_level', 'dfs_start',
+    'dijkstra_init', 'dijkstra_current', 'dijkstra_unreachable',
+}
+
+# Steps that change the array, tree or search state
+STATE_CHANGE_STEP_TYPES = {
+    'swap', 'after_swap', 'shift', 'insert', 'place',
+    'move_left', 'move_right',
+    'insert_root', 'insert_left', 'insert_right',
+    'inorder_visit', 'preorder_visit', 'postorder_visit',
+    'bfs_visit', 'bfs_enqueue', 'dfs_visit', 'dfs_push', 'dfs_backtrack',
+    'dijkstra_update',
+}
+
+# Step fields holding changes rather than a snapshot; merged forward when a step is dropped
+COALESCED_FIELDS = ('distance_update', 'previous_update')
+
+# The initial step, the final step and at least one in between
+MIN_FRAMES = 3
+
+
+def keep_all(step_type):
+    return True
+
+
+def keep_state_changes(step_type):
+    return step_type in STATE_CHANGE_STEP_TYPES or step_type in MILESTONE_STEP_TYPES
+
+
+def keep_milestones(step_type):
+    return step_type in MILESTONE_STEP_TYPES
+
+
+DETAIL_FILTERS = {
+    'full': keep_all,
+    'swaps-only': keep_state_changes,
+    'pass-level': keep_milestones,
+}
+DETAIL_LEVELS = tuple(DETAIL_FILTERS)
+
+
+def is_valid_detail(detail):
+    """True for a level in DETAIL_LEVELS or a maximum step count of at least MIN_FRAMES"""
+    if isinstance(detail, bool):
+        return False
+    if isinstance(detail, int):
+        return detail >= MIN_FRAMES
+    return isinstance(detail, str) and detail in DETAIL_FILTERS
+
+
+def _coalesce(dropped, step):
+    """Move the change fields of a dropped step into the step that follows it"""
+    for field in COALESCED_FIELDS:
+        if field in dropped:
+            step[field] = {**dropped[field], **step.get(field, {})}
+
+
+class FrameSampler:
+    """
+    Step filter that keeps at most ``max_frames`` steps, evenly spread.
+    Used as an algorithm's ``keep`` filter it accepts every ``stride``-th
+    step; collect() gathers the accepted steps and, whenever there are too
+    many, drops every other one and doubles the stride, so most of the steps
+    that would be discarded are never built.
+    """
     
-    return algorithm_functions[algorithm_name](input_data)
+    def __init__(self, max_frames):
+        self.max_frames = max_frames
+        self.stride = 1
+        self.seen = 0
+    
+    def __call__(self, step_type):
+        keep = self.seen % self.stride == 0
+        self.seen += 1
+        return keep
+    
+    def collect(self, steps):
+        """The sampled trace; the first (initial) and last (final) steps are always kept"""
+        steps = iter(steps)
+        first = next(steps, None)
+        if first is None:
+            return []
+        
+        # Steps allowed after the first one, the final step included
+        limit = self.max_frames - 1
+        sampled = []
+        for step in steps:
+            sampled.append(step)
+            if len(sampled) > limit:
+                # The newest step may be the final one, so it is kept out of the halving
+                newest = sampled.pop()
+                for index in range(1, len(sampled), 2):
+                    following = sampled[index + 1] if index + 1 < len(sampled) else newest
+                    _coalesce(sampled[index], following)
+                sampled = sampled[::2]
+                sampled.append(newest)
+                self.stride *= 2
+        
+        return [first] + sampled
+
+
+def _ignore_comparison():
+    pass
+
+
+def comparison_counter(keep):
+    """
+    Callback an algorithm makes at each comparison of values, whether or not
+    a step shows it; only OperationCounter records them.
+    """
+    return getattr(keep, 'count_comparison', _ignore_comparison)
 
 
 # ===================== SORTING ALGORITHMS =====================
 
-def bubble_sort(data):
+BUBBLE_SORT_MESSAGES = {
+    'initial': {
+        'description': 'Bubble Sort starts with the unsorted array',
+        'educational_note': 'Bubble Sort compares adjacent elements and swaps them if they are in the wrong order, causing larger elements to "bubble up" to the end of the array.',
+        'complexity_note': 'Time Complexity: O(n²) in worst case, where n is the number of elements',
+    },
+    'pass_start': {
+        'description': 'Starting pass {pass_number} of {n}',
+        'educational_note': 'With each pass, the largest unsorted element "bubbles up" to its correct position.',
+    },
+    'comparison': {
+        'description': 'Comparing {value_j} and {value_next}',
+        'educational_note': 'We compare adjacent elements to see if they need to be swapped.',
+    },
+    'swap': {
+        'description': 'Swapped {left_value} and {right_value} as they were in wrong order',
+        'educational_note': 'Since {left_value} > {right_value}, we swap them to move the larger value to the right.',
+    },
+    'no_swap': {
+        'description': 'No swap needed as elements are in correct order',
+        'educational_note': 'Since {value_j} ≤ {value_next}, these elements are already in the correct order.',
+    },
+    'sorted': {
+        'description': 'Element {element} is now in its correct sorted position',
+        'educational_note': 'After pass {pass_number}, the largest unsorted element has "bubbled up" to its final position at index {element_pos}.',
+    },
+    'early_termination': {
+        'description': 'No swaps needed in pass {pass_number} - array is already sorted!',
+        'educational_note': 'This is an optimization of Bubble Sort: if no swaps occur in a complete pass, the array is already sorted and we can stop early.',
+    },
+    'final': {
+        'description': 'Bubble Sort complete! The array is now fully sorted.',
+        'educational_note': 'Bubble Sort is simple but inefficient for large arrays. Its advantage is that it is easy to understand and implement.',
+    },
+}
+
+def bubble_sort(data, keep=keep_all):
     """
     Enhanced bubble sort implementation with detailed educational descriptions
     to support the improved visualization.
     """
-    steps = []
+    compared = comparison_counter(keep)
     arr = data.copy()
     n = len(arr)
     
     # Initial state with detailed explanation
-    steps.append({
+    yield {
         'type': 'initial',
         'state': arr.copy(),
-        'description': 'Bubble Sort starts with the unsorted array',
-        'educational_note': 'Bubble Sort compares adjacent elements and swaps them if they are in the wrong order, causing larger elements to "bubble up" to the end of the array.',
-        'complexity_note': 'Time Complexity: O(n²) in worst case, where n is the number of elements',
+        'message': 'initial',
         'current_focus': []
-    })
+    }
     
     # Track if the algorithm is done early
     for i in range(n):
@@ -68,284 +275,382 @@ def bubble_sort(data):
         
         # Show beginning of pass
         if i > 0:
-            steps.append({
-                'type': 'pass_start',
-                'state': arr.copy(),
-                'description': f'Starting pass {i+1} of {n}',
-                'educational_note': f'With each pass, the largest unsorted element "bubbles up" to its correct position.',
-                'sorted_indices': list(range(n-i, n)),
-                'current_focus': list(range(0, n-i))
-            })
+            if keep('pass_start'):
+                yield {
+                    'type': 'pass_start',
+                    'state': arr.copy(),
+                    'message': 'pass_start',
+                    'params': {'pass_number': i + 1, 'n': n},
+                    'sorted_indices': list(range(n-i, n)),
+                    'current_focus': list(range(0, n-i))
+                }
         
         for j in range(0, n - i - 1):
             # Comparing elements with educational explanation
-            steps.append({
-                'type': 'comparison',
-                'state': arr.copy(),
-                'description': f'Comparing {arr[j]} and {arr[j+1]}',
-                'educational_note': f'We compare adjacent elements to see if they need to be swapped.',
-                'comparing': [j, j+1],
-                'sorted_indices': list(range(n-i, n)) if i > 0 else [],
-                'current_focus': [j, j+1]
-            })
+            if keep('comparison'):
+                yield {
+                    'type': 'comparison',
+                    'state': arr.copy(),
+                    'message': 'comparison',
+                    'params': {'value_j': arr[j], 'value_next': arr[j + 1]},
+                    'comparing': [j, j+1],
+                    'sorted_indices': list(range(n-i, n)) if i > 0 else [],
+                    'current_focus': [j, j+1]
+                }
             
+            compared()
             if arr[j] > arr[j + 1]:
                 # Swap the elements with detailed explanation
                 old_values = [arr[j], arr[j+1]]
                 arr[j], arr[j + 1] = arr[j + 1], arr[j]
                 swapped = True
                 
-                steps.append({
-                    'type': 'swap',
-                    'state': arr.copy(),
-                    'description': f'Swapped {old_values[0]} and {old_values[1]} as they were in wrong order',
-                    'educational_note': f'Since {old_values[0]} > {old_values[1]}, we swap them to move the larger value to the right.',
-                    'swapped': [j, j+1],
-                    'sorted_indices': list(range(n-i, n)) if i > 0 else [],
-                    'current_focus': [j, j+1]
-                })
+                if keep('swap'):
+                    yield {
+                        'type': 'swap',
+                        'state': arr.copy(),
+                        'message': 'swap',
+                        'params': {'left_value': old_values[0], 'right_value': old_values[1]},
+                        'swapped': [j, j+1],
+                        'sorted_indices': list(range(n-i, n)) if i > 0 else [],
+                        'current_focus': [j, j+1]
+                    }
             else:
                 # No swap needed with explanation
-                steps.append({
-                    'type': 'no_swap',
-                    'state': arr.copy(),
-                    'description': f'No swap needed as elements are in correct order',
-                    'educational_note': f'Since {arr[j]} ≤ {arr[j+1]}, these elements are already in the correct order.',
-                    'sorted_indices': list(range(n-i, n)) if i > 0 else [],
-                    'current_focus': [j, j+1]
-                })
+                if keep('no_swap'):
+                    yield {
+                        'type': 'no_swap',
+                        'state': arr.copy(),
+                        'message': 'no_swap',
+                        'params': {'value_j': arr[j], 'value_next': arr[j + 1]},
+                        'sorted_indices': list(range(n-i, n)) if i > 0 else [],
+                        'current_focus': [j, j+1]
+                    }
         
         # After completing a pass, mark element as sorted
         if i < n - 1:  # Not the last pass
             element_pos = n - i - 1
-            steps.append({
-                'type': 'sorted',
-                'state': arr.copy(),
-                'description': f'Element {arr[element_pos]} is now in its correct sorted position',
-                'educational_note': f'After pass {i+1}, the largest unsorted element has "bubbled up" to its final position at index {element_pos}.',
-                'sorted_indices': list(range(n-i-1, n)),
-                'current_focus': [element_pos],
-                'newly_sorted': [element_pos]
-            })
+            if keep('sorted'):
+                yield {
+                    'type': 'sorted',
+                    'state': arr.copy(),
+                    'message': 'sorted',
+                    'params': {'element': arr[element_pos], 'pass_number': i + 1, 'element_pos': element_pos},
+                    'sorted_indices': list(range(n-i-1, n)),
+                    'current_focus': [element_pos],
+                    'newly_sorted': [element_pos]
+                }
         
         # If no swaps were made, array is sorted - optimization explanation
         if not swapped:
-            steps.append({
-                'type': 'early_termination',
-                'state': arr.copy(),
-                'description': f'No swaps needed in pass {i+1} - array is already sorted!',
-                'educational_note': 'This is an optimization of Bubble Sort: if no swaps occur in a complete pass, the array is already sorted and we can stop early.',
-                'sorted_indices': list(range(n)),
-                'current_focus': list(range(n))
-            })
+            if keep('early_termination'):
+                yield {
+                    'type': 'early_termination',
+                    'state': arr.copy(),
+                    'message': 'early_termination',
+                    'params': {'pass_number': i + 1},
+                    'sorted_indices': list(range(n)),
+                    'current_focus': list(range(n))
+                }
             break
     
     # Final state with educational conclusion
-    steps.append({
+    yield {
         'type': 'final',
         'state': arr.copy(),
-        'description': 'Bubble Sort complete! The array is now fully sorted.',
-        'educational_note': 'Bubble Sort is simple but inefficient for large arrays. Its advantage is that it is easy to understand and implement.',
+        'message': 'final',
         'sorted_indices': list(range(n)),
         'current_focus': list(range(n))
-    })
+    }
 
-    return steps
 
+SELECTION_SORT_MESSAGES = {
+    'initial': {
+        'description': 'Selection Sort starts with the unsorted array',
+        'educational_note': 'Selection Sort works by repeatedly finding the minimum element from the unsorted part and putting it at the beginning.',
+        'complexity_note': 'Time Complexity: O(n²) in all cases, where n is the number of elements',
+    },
+    'selection_start': {
+        'description': 'Starting selection phase {phase_number}: finding the minimum in unsorted part',
+        'educational_note': 'The array now has two parts: sorted ([0:{i}]) and unsorted ([{i}:{n}]). We need to find the minimum element in the unsorted part.',
+    },
+    'min_selected': {
+        'description': 'Initially assuming {min_value} at index {min_idx} is the minimum',
+        'educational_note': 'We start by assuming the first element of the unsorted portion is the minimum.',
+    },
+    'comparison': {
+        'description': 'Comparing {value_j} with current minimum {min_value}',
+        'educational_note': 'We compare each unsorted element with the current minimum to find the smallest value.',
+    },
+    'new_min': {
+        'description': 'New minimum {min_value} found at index {min_idx}',
+        'educational_note': 'Since {min_value} is smaller than our previous minimum, we update our minimum.',
+    },
+    'before_swap': {
+        'description': 'Swapping {value_i} with minimum {min_value}',
+        'educational_note': 'After finding the minimum element in the unsorted portion, we place it at the end of the sorted portion.',
+    },
+    'after_swap': {
+        'description': 'Swapped {value_i} with {min_value}',
+        'educational_note': 'The minimum element from the unsorted portion is now in its final sorted position.',
+    },
+    'no_swap_needed': {
+        'description': 'No swap needed - minimum {value_i} is already at index {i}',
+        'educational_note': 'The minimum element was already in the correct position, so no swap is needed.',
+    },
+    'sorted': {
+        'description': 'Element {value_i} is now in its final sorted position',
+        'educational_note': 'After phase {phase_number}, we have {phase_number} elements in the sorted portion of the array.',
+    },
+    'final': {
+        'description': 'Selection Sort complete! The array is now fully sorted.',
+        'educational_note': 'Selection Sort makes the minimum number of swaps (at most n-1) compared to other algorithms, which can be advantageous when the cost of swapping elements is high.',
+    },
+}
 
-def selection_sort(data):
+def selection_sort(data, keep=keep_all):
     """
     Enhanced selection sort implementation with detailed educational descriptions.
     """
-    steps = []
+    compared = comparison_counter(keep)
     arr = data.copy()
     n = len(arr)
     
     # Initial state with educational context
-    steps.append({
+    yield {
         'type': 'initial',
         'state': arr.copy(),
-        'description': 'Selection Sort starts with the unsorted array',
-        'educational_note': 'Selection Sort works by repeatedly finding the minimum element from the unsorted part and putting it at the beginning.',
-        'complexity_note': 'Time Complexity: O(n²) in all cases, where n is the number of elements',
+        'message': 'initial',
         'current_focus': list(range(n))
-    })
+    }
     
     for i in range(n):
         # Start of new selection phase with educational note
-        steps.append({
-            'type': 'selection_start',
-            'state': arr.copy(),
-            'description': f'Starting selection phase {i+1}: finding the minimum in unsorted part',
-            'educational_note': f'The array now has two parts: sorted ([0:{i}]) and unsorted ([{i}:{n}]). We need to find the minimum element in the unsorted part.',
-            'sorted_indices': list(range(i)),
-            'current_focus': list(range(i, n))
-        })
+        if keep('selection_start'):
+            yield {
+                'type': 'selection_start',
+                'state': arr.copy(),
+                'message': 'selection_start',
+                'params': {'phase_number': i + 1, 'i': i, 'n': n},
+                'sorted_indices': list(range(i)),
+                'current_focus': list(range(i, n))
+            }
         
         # Assume the minimum is the first unsorted element
         min_idx = i
-        steps.append({
-            'type': 'min_selected',
-            'state': arr.copy(),
-            'description': f'Initially assuming {arr[min_idx]} at index {min_idx} is the minimum',
-            'educational_note': 'We start by assuming the first element of the unsorted portion is the minimum.',
-            'min_idx': min_idx,
-            'sorted_indices': list(range(i)),
-            'current_focus': [min_idx]
-        })
+        if keep('min_selected'):
+            yield {
+                'type': 'min_selected',
+                'state': arr.copy(),
+                'message': 'min_selected',
+                'params': {'min_value': arr[min_idx], 'min_idx': min_idx},
+                'min_idx': min_idx,
+                'sorted_indices': list(range(i)),
+                'current_focus': [min_idx]
+            }
         
         # Find the minimum element in the unsorted part with educational explanation
         for j in range(i+1, n):
-            steps.append({
-                'type': 'comparison',
-                'state': arr.copy(),
-                'description': f'Comparing {arr[j]} with current minimum {arr[min_idx]}',
-                'educational_note': f'We compare each unsorted element with the current minimum to find the smallest value.',
-                'comparing': [j, min_idx],
-                'sorted_indices': list(range(i)),
-                'current_focus': [j, min_idx],
-                'min_idx': min_idx
-            })
+            if keep('comparison'):
+                yield {
+                    'type': 'comparison',
+                    'state': arr.copy(),
+                    'message': 'comparison',
+                    'params': {'value_j': arr[j], 'min_value': arr[min_idx]},
+                    'comparing': [j, min_idx],
+                    'sorted_indices': list(range(i)),
+                    'current_focus': [j, min_idx],
+                    'min_idx': min_idx
+                }
             
+            compared()
             if arr[j] < arr[min_idx]:
                 min_idx = j
-                steps.append({
-                    'type': 'new_min',
-                    'state': arr.copy(),
-                    'description': f'New minimum {arr[min_idx]} found at index {min_idx}',
-                    'educational_note': f'Since {arr[min_idx]} is smaller than our previous minimum, we update our minimum.',
-                    'min_idx': min_idx,
-                    'sorted_indices': list(range(i)),
-                    'current_focus': [min_idx]
-                })
+                if keep('new_min'):
+                    yield {
+                        'type': 'new_min',
+                        'state': arr.copy(),
+                        'message': 'new_min',
+                        'params': {'min_value': arr[min_idx], 'min_idx': min_idx},
+                        'min_idx': min_idx,
+                        'sorted_indices': list(range(i)),
+                        'current_focus': [min_idx]
+                    }
         
         # Swap the found minimum element with the first element of unsorted part
         if min_idx != i:
-            steps.append({
-                'type': 'before_swap',
-                'state': arr.copy(),
-                'description': f'Swapping {arr[i]} with minimum {arr[min_idx]}',
-                'educational_note': f'After finding the minimum element in the unsorted portion, we place it at the end of the sorted portion.',
-                'swapping': [i, min_idx],
-                'sorted_indices': list(range(i)),
-                'current_focus': [i, min_idx]
-            })
+            if keep('before_swap'):
+                yield {
+                    'type': 'before_swap',
+                    'state': arr.copy(),
+                    'message': 'before_swap',
+                    'params': {'value_i': arr[i], 'min_value': arr[min_idx]},
+                    'swapping': [i, min_idx],
+                    'sorted_indices': list(range(i)),
+                    'current_focus': [i, min_idx]
+                }
             
             arr[i], arr[min_idx] = arr[min_idx], arr[i]
             
-            steps.append({
-                'type': 'after_swap',
-                'state': arr.copy(),
-                'description': f'Swapped {arr[i]} with {arr[min_idx]}',
-                'educational_note': f'The minimum element from the unsorted portion is now in its final sorted position.',
-                'swapped': [i, min_idx],
-                'sorted_indices': list(range(i)),
-                'current_focus': [i, min_idx]
-            })
+            if keep('after_swap'):
+                yield {
+                    'type': 'after_swap',
+                    'state': arr.copy(),
+                    'message': 'after_swap',
+                    'params': {'value_i': arr[i], 'min_value': arr[min_idx]},
+                    'swapped': [i, min_idx],
+                    'sorted_indices': list(range(i)),
+                    'current_focus': [i, min_idx]
+                }
         else:
             # No swap needed - element already in position
-            steps.append({
-                'type': 'no_swap_needed',
-                'state': arr.copy(),
-                'description': f'No swap needed - minimum {arr[i]} is already at index {i}',
-                'educational_note': f'The minimum element was already in the correct position, so no swap is needed.',
-                'sorted_indices': list(range(i)),
-                'current_focus': [i]
-            })
+            if keep('no_swap_needed'):
+                yield {
+                    'type': 'no_swap_needed',
+                    'state': arr.copy(),
+                    'message': 'no_swap_needed',
+                    'params': {'value_i': arr[i], 'i': i},
+                    'sorted_indices': list(range(i)),
+                    'current_focus': [i]
+                }
         
         # Mark element as sorted
-        steps.append({
-            'type': 'sorted',
-            'state': arr.copy(),
-            'description': f'Element {arr[i]} is now in its final sorted position',
-            'educational_note': f'After phase {i+1}, we have {i+1} elements in the sorted portion of the array.',
-            'sorted_indices': list(range(i+1)),
-            'current_focus': [i],
-            'newly_sorted': [i]
-        })
+        if keep('sorted'):
+            yield {
+                'type': 'sorted',
+                'state': arr.copy(),
+                'message': 'sorted',
+                'params': {'value_i': arr[i], 'phase_number': i + 1},
+                'sorted_indices': list(range(i+1)),
+                'current_focus': [i],
+                'newly_sorted': [i]
+            }
     
     # Final state
-    steps.append({
+    yield {
         'type': 'final',
         'state': arr.copy(),
-        'description': 'Selection Sort complete! The array is now fully sorted.',
-        'educational_note': 'Selection Sort makes the minimum number of swaps (at most n-1) compared to other algorithms, which can be advantageous when the cost of swapping elements is high.',
+        'message': 'final',
         'sorted_indices': list(range(n)),
         'current_focus': list(range(n))
-    })
-    
-    return steps
+    }
+
 
+INSERTION_SORT_MESSAGES = {
+    'initial': {
+        'description': 'Insertion Sort begins with an unsorted array',
+        'educational_note': 'Insertion Sort builds the sorted array one element at a time by placing each element in its correct position within the already-sorted portion.',
+        'complexity_note': 'Time Complexity: O(n²) worst case, but O(n) when array is nearly sorted',
+    },
+    'first_sorted': {
+        'description': 'First element is considered a sorted array of length 1',
+        'educational_note': 'We start by considering the first element as a sorted subarray of size 1.',
+    },
+    'current': {
+        'description': 'Selecting element {current} at index {i} for insertion',
+        'educational_note': 'The array is divided into a sorted part ([0:{i}]) and an unsorted part ([{i}:{n}]). We take the first element from the unsorted part and insert it into its correct position.',
+    },
+    'comparison': {
+        'description': 'Comparing {current} with {value_j} in the sorted portion',
+        'educational_note': 'We compare the current element with elements in the sorted portion from right to left, looking for the correct insertion point.',
+    },
+    'shift': {
+        'description': 'Shifting {value_j} one position to the right',
+        'educational_note': 'We shift larger elements to the right to make space for the element being inserted.',
+    },
+    'insert': {
+        'description': 'Inserting {current} at index {position}',
+        'educational_note': 'We have found the correct position for our element and insert it there.',
+    },
+    'already_positioned': {
+        'description': 'Element {current} is already in the correct position',
+        'educational_note': 'No shifting was needed as the element is already in the correct position relative to the sorted portion.',
+    },
+    'sorted': {
+        'description': 'Sorted portion now includes elements up to index {i}',
+        'educational_note': 'The sorted portion has grown by one element. We now have {sorted_count} elements in correct order.',
+    },
+    'final': {
+        'description': 'Insertion Sort complete! The array is now fully sorted.',
+        'educational_note': 'Insertion Sort is efficient for small data sets and particularly efficient for arrays that are already substantially sorted.',
+    },
+}
 
-def insertion_sort(data):
+def insertion_sort(data, keep=keep_all):
     """
     Enhanced insertion sort implementation with detailed educational descriptions.
     """
-    steps = []
+    compared = comparison_counter(keep)
     arr = data.copy()
     n = len(arr)
     
     # Initial state with educational context
-    steps.append({
+    yield {
         'type': 'initial',
         'state': arr.copy(),
-        'description': 'Insertion Sort begins with an unsorted array',
-        'educational_note': 'Insertion Sort builds the sorted array one element at a time by placing each element in its correct position within the already-sorted portion.',
-        'complexity_note': 'Time Complexity: O(n²) worst case, but O(n) when array is nearly sorted',
+        'message': 'initial',
         'current_focus': list(range(n))
-    })
+    }
     
     # Consider the first element as sorted
-    steps.append({
-        'type': 'sorted',
-        'state': arr.copy(),
-        'description': 'First element is considered a sorted array of length 1',
-        'educational_note': 'We start by considering the first element as a sorted subarray of size 1.',
-        'sorted_indices': [0],
-        'current_focus': [0]
-    })
+    if keep('sorted'):
+        yield {
+            'type': 'sorted',
+            'state': arr.copy(),
+            'message': 'first_sorted',
+            'sorted_indices': [0],
+            'current_focus': [0]
+        }
     
     # Insert each element into the sorted part
     for i in range(1, n):
         # Select current element to insert
         current = arr[i]
-        steps.append({
-            'type': 'current',
-            'state': arr.copy(),
-            'description': f'Selecting element {current} at index {i} for insertion',
-            'educational_note': f'The array is divided into a sorted part ([0:{i}]) and an unsorted part ([{i}:{n}]). We take the first element from the unsorted part and insert it into its correct position.',
-            'current_index': i,
-            'sorted_indices': list(range(i)),
-            'current_focus': [i]
-        })
+        if keep('current'):
+            yield {
+                'type': 'current',
+                'state': arr.copy(),
+                'message': 'current',
+                'params': {'current': current, 'i': i, 'n': n},
+                'current_index': i,
+                'sorted_indices': list(range(i)),
+                'current_focus': [i]
+            }
         
         # Find the correct position in the sorted part
         j = i - 1
         shifting_done = False
         
-        while j >= 0 and arr[j] > current:
-            steps.append({
-                'type': 'comparison',
-                'state': arr.copy(),
-                'description': f'Comparing {current} with {arr[j]} in the sorted portion',
-                'educational_note': f'We compare the current element with elements in the sorted portion from right to left, looking for the correct insertion point.',
-                'comparing': [j, i if not shifting_done else j+1],
-                'sorted_indices': list(range(j)),
-                'current_focus': [j, i if not shifting_done else j+1]
-            })
+        while j >= 0:
+            # The comparison that ends the loop is counted but has no step
+            compared()
+            if arr[j] <= current:
+                break
+            
+            if keep('comparison'):
+                yield {
+                    'type': 'comparison',
+                    'state': arr.copy(),
+                    'message': 'comparison',
+                    'params': {'current': current, 'value_j': arr[j]},
+                    'comparing': [j, i if not shifting_done else j+1],
+                    'sorted_indices': list(range(j)),
+                    'current_focus': [j, i if not shifting_done else j+1]
+                }
             
             # Shift element to the right
             arr[j + 1] = arr[j]
             
-            steps.append({
-                'type': 'shift',
-                'state': arr.copy(),
-                'description': f'Shifting {arr[j]} one position to the right',
-                'educational_note': f'We shift larger elements to the right to make space for the element being inserted.',
-                'shifted': j + 1,
-                'sorted_indices': list(range(j)),
-                'current_focus': [j + 1]
-            })
+            if keep('shift'):
+                yield {
+                    'type': 'shift',
+                    'state': arr.copy(),
+                    'message': 'shift',
+                    'params': {'value_j': arr[j]},
+                    'shifted': j + 1,
+                    'sorted_indices': list(range(j)),
+                    'current_focus': [j + 1]
+                }
             
             j -= 1
             shifting_done = True
@@ -354,89 +659,129 @@ def insertion_sort(data):
             # Insert current element into correct position
             arr[j + 1] = current
             
-            steps.append({
-                'type': 'insert',
-                'state': arr.copy(),
-                'description': f'Inserting {current} at index {j + 1}',
-                'educational_note': f'We have found the correct position for our element and insert it there.',
-                'inserted_index': j + 1,
-                'sorted_indices': list(range(i+1)),
-                'current_focus': [j + 1]
-            })
+            if keep('insert'):
+                yield {
+                    'type': 'insert',
+                    'state': arr.copy(),
+                    'message': 'insert',
+                    'params': {'current': current, 'position': j + 1},
+                    'inserted_index': j + 1,
+                    'sorted_indices': list(range(i+1)),
+                    'current_focus': [j + 1]
+                }
         else:
             # Element is already in the right position
-            steps.append({
-                'type': 'already_positioned',
-                'state': arr.copy(),
-                'description': f'Element {current} is already in the correct position',
-                'educational_note': f'No shifting was needed as the element is already in the correct position relative to the sorted portion.',
-                'sorted_indices': list(range(i + 1)),
-                'current_focus': [i]
-            })
+            if keep('already_positioned'):
+                yield {
+                    'type': 'already_positioned',
+                    'state': arr.copy(),
+                    'message': 'already_positioned',
+                    'params': {'current': current},
+                    'sorted_indices': list(range(i + 1)),
+                    'current_focus': [i]
+                }
         
         # Update sorted portion
-        steps.append({
-            'type': 'sorted',
-            'state': arr.copy(),
-            'description': f'Sorted portion now includes elements up to index {i}',
-            'educational_note': f'The sorted portion has grown by one element. We now have {i+1} elements in correct order.',
-            'sorted_indices': list(range(i + 1)),
-            'current_focus': list(range(i + 1))
-        })
+        if keep('sorted'):
+            yield {
+                'type': 'sorted',
+                'state': arr.copy(),
+                'message': 'sorted',
+                'params': {'i': i, 'sorted_count': i + 1},
+                'sorted_indices': list(range(i + 1)),
+                'current_focus': list(range(i + 1))
+            }
     
     # Final state
-    steps.append({
+    yield {
         'type': 'final',
         'state': arr.copy(),
-        'description': 'Insertion Sort complete! The array is now fully sorted.',
-        'educational_note': 'Insertion Sort is efficient for small data sets and particularly efficient for arrays that are already substantially sorted.',
+        'message': 'final',
         'sorted_indices': list(range(n)),
         'current_focus': list(range(n))
-    })
-    
-    return steps
+    }
+
 
+MERGE_SORT_MESSAGES = {
+    'initial': {
+        'description': 'Merge Sort begins with an unsorted array',
+        'educational_note': 'Merge Sort uses the divide-and-conquer technique: it divides the array into halves, sorts each half, then merges them back together.',
+        'complexity_note': 'Time Complexity: O(n log n) for all cases, making it very efficient even for large arrays',
+    },
+    'divide': {
+        'description': 'Dividing array into left [{left_start}:{mid_next}] and right [{mid_next}:{right_stop}]',
+        'educational_note': 'We have divided the array into two subarrays: left (indices {left_start} to {mid}) and right (indices {mid_next} to {right_end}).',
+    },
+    'comparison': {
+        'description': 'Comparing {left_value} and {right_value}',
+        'educational_note': 'We compare the next elements from each subarray to determine which should go next in the merged result.',
+    },
+    'place_left': {
+        'description': 'Placing {left_value} at index {arr_idx}',
+        'educational_note': 'The element from the left subarray is smaller, so we place it in the merged result.',
+    },
+    'place_right': {
+        'description': 'Placing {right_value} at index {arr_idx}',
+        'educational_note': 'The element from the right subarray is smaller, so we place it in the merged result.',
+    },
+    'place_remaining_left': {
+        'description': 'Placing remaining left element {left_value} at index {arr_idx}',
+        'educational_note': 'We have exhausted the right subarray, so we copy the remaining elements from the left subarray.',
+    },
+    'place_remaining_right': {
+        'description': 'Placing remaining right element {right_value} at index {arr_idx}',
+        'educational_note': 'We have exhausted the left subarray, so we copy the remaining elements from the right subarray.',
+    },
+    'merged': {
+        'description': 'Merged segment from {left_start} to {right_end}',
+        'educational_note': 'We have successfully merged the two subarrays into a single sorted segment.',
+    },
+    'recursive_call': {
+        'description': 'Dividing array segment [{left}:{right_end}] at midpoint {mid}',
+        'educational_note': 'We recursively divide the array into smaller subarrays until we reach segments of size 1, which are trivially sorted.',
+    },
+    'final': {
+        'description': 'Merge Sort complete! The array is now fully sorted.',
+        'educational_note': 'Merge Sort is a stable, efficient algorithm with O(n log n) time complexity. Its main disadvantage is the O(n) space requirement for temporary arrays during merging.',
+    },
+}
 
-def merge_sort(data):
+def merge_sort(data, keep=keep_all):
     """
     Enhanced merge sort implementation with detailed educational descriptions.
     """
-    steps = []
+    compared = comparison_counter(keep)
     arr = data.copy()
     n = len(arr)
     
     # Initial state with educational context
-    steps.append({
+    yield {
         'type': 'initial',
         'state': arr.copy(),
-        'description': 'Merge Sort begins with an unsorted array',
-        'educational_note': 'Merge Sort uses the divide-and-conquer technique: it divides the array into halves, sorts each half, then merges them back together.',
-        'complexity_note': 'Time Complexity: O(n log n) for all cases, making it very efficient even for large arrays',
+        'message': 'initial',
         'current_focus': list(range(n))
-    })
-    
-    # Global array for tracking sorted segments
-    sorted_segments = []
+    }
     
     # Merge helper function
     def merge(left_start, mid, right_end, depth=0):
-        nonlocal steps, arr, sorted_segments
+        nonlocal arr
         
         # Create a temporary array for the merged result
         left_arr = arr[left_start:mid + 1]
         right_arr = arr[mid + 1:right_end + 1]
         
         # Show the division of the array
-        steps.append({
-            'type': 'divide',
-            'state': arr.copy(),
-            'description': f'Dividing array into left [{left_start}:{mid+1}] and right [{mid+1}:{right_end+1}]',
-            'educational_note': f'We have divided the array into two subarrays: left (indices {left_start} to {mid}) and right (indices {mid+1} to {right_end}).',
-            'left_part': list(range(left_start, mid + 1)),
-            'right_part': list(range(mid + 1, right_end + 1)),
-            'recursion_depth': depth,
-            'current_focus': list(range(left_start, right_end + 1))
-        })
+        if keep('divide'):
+            yield {
+                'type': 'divide',
+                'state': arr.copy(),
+                'message': 'divide',
+                'params': {'left_start': left_start, 'mid_next': mid + 1, 'right_stop': right_end + 1, 'mid': mid, 'right_end': right_end},
+                'left_part': list(range(left_start, mid + 1)),
+                'right_part': list(range(mid + 1, right_end + 1)),
+                'recursion_depth': depth,
+                'current_focus': list(range(left_start, right_end + 1))
+            }
         
         # Initialize indices
         left_idx = 0
@@ -446,87 +791,91 @@ def merge_sort(data):
         # Merge the two subarrays
         while left_idx < len(left_arr) and right_idx < len(right_arr):
             # Compare elements
-            steps.append({
-                'type': 'comparison',
-                'state': arr.copy(),
-                'description': f'Comparing {left_arr[left_idx]} and {right_arr[right_idx]}',
-                'educational_note': f'We compare the next elements from each subarray to determine which should go next in the merged result.',
-                'comparing': [left_start + left_idx, mid + 1 + right_idx],
-                'recursion_depth': depth,
-                'current_focus': [left_start + left_idx, mid + 1 + right_idx]
-            })
+            if keep('comparison'):
+                yield {
+                    'type': 'comparison',
+                    'state': arr.copy(),
+                    'message': 'comparison',
+                    'params': {'left_value': left_arr[left_idx], 'right_value': right_arr[right_idx]},
+                    'comparing': [left_start + left_idx, mid + 1 + right_idx],
+                    'recursion_depth': depth,
+                    'current_focus': [left_start + left_idx, mid + 1 + right_idx]
+                }
             
+            compared()
             if left_arr[left_idx] <= right_arr[right_idx]:
                 # Place element from left array
                 arr[arr_idx] = left_arr[left_idx]
-                steps.append({
-                    'type': 'place',
-                    'state': arr.copy(),
-                    'description': f'Placing {left_arr[left_idx]} at index {arr_idx}',
-                    'educational_note': f'The element from the left subarray is smaller, so we place it in the merged result.',
-                    'placed_index': arr_idx,
-                    'recursion_depth': depth,
-                    'current_focus': [arr_idx]
-                })
+                if keep('place'):
+                    yield {
+                        'type': 'place',
+                        'state': arr.copy(),
+                        'message': 'place_left',
+                        'params': {'left_value': left_arr[left_idx], 'arr_idx': arr_idx},
+                        'placed_index': arr_idx,
+                        'recursion_depth': depth,
+                        'current_focus': [arr_idx]
+                    }
                 left_idx += 1
             else:
                 # Place element from right array
                 arr[arr_idx] = right_arr[right_idx]
-                steps.append({
-                    'type': 'place',
-                    'state': arr.copy(),
-                    'description': f'Placing {right_arr[right_idx]} at index {arr_idx}',
-                    'educational_note': f'The element from the right subarray is smaller, so we place it in the merged result.',
-                    'placed_index': arr_idx,
-                    'recursion_depth': depth,
-                    'current_focus': [arr_idx]
-                })
+                if keep('place'):
+                    yield {
+                        'type': 'place',
+                        'state': arr.copy(),
+                        'message': 'place_right',
+                        'params': {'right_value': right_arr[right_idx], 'arr_idx': arr_idx},
+                        'placed_index': arr_idx,
+                        'recursion_depth': depth,
+                        'current_focus': [arr_idx]
+                    }
                 right_idx += 1
             arr_idx += 1
         
         # Copy remaining elements from left subarray
         while left_idx < len(left_arr):
             arr[arr_idx] = left_arr[left_idx]
-            steps.append({
-                'type': 'place',
-                'state': arr.copy(),
-                'description': f'Placing remaining left element {left_arr[left_idx]} at index {arr_idx}',
-                'educational_note': f'We have exhausted the right subarray, so we copy the remaining elements from the left subarray.',
-                'placed_index': arr_idx,
-                'recursion_depth': depth,
-                'current_focus': [arr_idx]
-            })
+            if keep('place'):
+                yield {
+                    'type': 'place',
+                    'state': arr.copy(),
+                    'message': 'place_remaining_left',
+                    'params': {'left_value': left_arr[left_idx], 'arr_idx': arr_idx},
+                    'placed_index': arr_idx,
+                    'recursion_depth': depth,
+                    'current_focus': [arr_idx]
+                }
             left_idx += 1
             arr_idx += 1
         
         # Copy remaining elements from right subarray
         while right_idx < len(right_arr):
             arr[arr_idx] = right_arr[right_idx]
-            steps.append({
-                'type': 'place',
-                'state': arr.copy(),
-                'description': f'Placing remaining right element {right_arr[right_idx]} at index {arr_idx}',
-                'educational_note': f'We have exhausted the left subarray, so we copy the remaining elements from the right subarray.',
-                'placed_index': arr_idx,
-                'recursion_depth': depth,
-                'current_focus': [arr_idx]
-            })
+            if keep('place'):
+                yield {
+                    'type': 'place',
+                    'state': arr.copy(),
+                    'message': 'place_remaining_right',
+                    'params': {'right_value': right_arr[right_idx], 'arr_idx': arr_idx},
+                    'placed_index': arr_idx,
+                    'recursion_depth': depth,
+                    'current_focus': [arr_idx]
+                }
             right_idx += 1
             arr_idx += 1
         
         # Mark the merged segment as sorted
-        steps.append({
-            'type': 'merged',
-            'state': arr.copy(),
-            'description': f'Merged segment from {left_start} to {right_end}',
-            'educational_note': f'We have successfully merged the two subarrays into a single sorted segment.',
-            'merged_indices': list(range(left_start, right_end + 1)),
-            'recursion_depth': depth,
-            'current_focus': list(range(left_start, right_end + 1))
-        })
-        
-        # Track this segment as sorted for visualization
-        sorted_segments.append(list(range(left_start, right_end + 1)))
+        if keep('merged'):
+            yield {
+                'type': 'merged',
+                'state': arr.copy(),
+                'message': 'merged',
+                'params': {'left_start': left_start, 'right_end': right_end},
+                'merged_indices': list(range(left_start, right_end + 1)),
+                'recursion_depth': depth,
+                'current_focus': list(range(left_start, right_end + 1))
+            }
     
     # Recursive merge sort function
     def merge_sort_recursive(left, right, depth=0):
@@ -535,259 +884,358 @@ def merge_sort(data):
             mid = (left + right) // 2
             
             # Show the division
-            steps.append({
-                'type': 'recursive_call',
-                'state': arr.copy(),
-                'description': f'Dividing array segment [{left}:{right+1}] at midpoint {mid}',
-                'educational_note': f'We recursively divide the array into smaller subarrays until we reach segments of size 1, which are trivially sorted.',
-                'segment': list(range(left, right + 1)),
-                'recursion_depth': depth,
-                'current_focus': list(range(left, right + 1))
-            })
+            if keep('recursive_call'):
+                yield {
+                    'type': 'recursive_call',
+                    'state': arr.copy(),
+                    'message': 'recursive_call',
+                    'params': {'left': left, 'right_end': right + 1, 'mid': mid},
+                    'segment': list(range(left, right + 1)),
+                    'recursion_depth': depth,
+                    'current_focus': list(range(left, right + 1))
+                }
             
             # Recursively sort the left and right halves
-            merge_sort_recursive(left, mid, depth + 1)
-            merge_sort_recursive(mid + 1, right, depth + 1)
+            yield from merge_sort_recursive(left, mid, depth + 1)
+            yield from merge_sort_recursive(mid + 1, right, depth + 1)
             
             # Merge the sorted halves
-            merge(left, mid, right, depth)
+            yield from merge(left, mid, right, depth)
     
     # Execute merge sort
-    merge_sort_recursive(0, n - 1)
-    
-    # Add all sorted segments to the final result
-    all_sorted = set()
-    for segment in sorted_segments:
-        for idx in segment:
-            all_sorted.add(idx)
+    yield from merge_sort_recursive(0, n - 1)
     
     # Final state
-    steps.append({
+    yield {
         'type': 'final',
         'state': arr.copy(),
-        'description': 'Merge Sort complete! The array is now fully sorted.',
-        'educational_note': 'Merge Sort is a stable, efficient algorithm with O(n log n) time complexity. Its main disadvantage is the O(n) space requirement for temporary arrays during merging.',
+        'message': 'final',
         'sorted_indices': list(range(n)),
         'current_focus': list(range(n))
-    })
-    
-    return steps
+    }
 
 
-def quick_sort(data):
+QUICK_SORT_MESSAGES = {
+    'initial': {
+        'description': 'Quick Sort begins with an unsorted array',
+        'educational_note': 'Quick Sort uses a divide-and-conquer approach by selecting a pivot and partitioning the array around it.',
+        'complexity_note': 'Time Complexity: O(n log n) average case, O(n²) worst case when poorly pivoted',
+    },
+    'pivot': {
+        'description': 'Selected pivot: {pivot} at index {high}',
+        'educational_note': 'We choose the last element as our pivot. All elements less than the pivot will go to the left, greater elements will go to the right.',
+    },
+    'comparison': {
+        'description': 'Comparing {value_j} with pivot {pivot}',
+        'educational_note': 'We compare each element with the pivot to determine which partition it belongs to.',
+    },
+    'before_swap': {
+        'description': 'Moving {value_j} to the left partition',
+        'educational_note': 'Since {value_j} is less than or equal to the pivot, we move it to the left partition.',
+    },
+    'after_swap': {
+        'description': 'Swapped {value_i} and {value_j}',
+        'educational_note': 'After this swap, all elements to the left of index {i} are less than or equal to the pivot.',
+    },
+    'no_swap_needed': {
+        'description': 'Element {value_j} is already in correct partition',
+        'educational_note': 'No swap needed as the element is already in the correct position.',
+    },
+    'pivot_before_swap': {
+        'description': 'Moving pivot {pivot} to its correct position',
+        'educational_note': 'After partitioning, we place the pivot between the two partitions at index {pivot_position}.',
+    },
+    'pivot_after_swap': {
+        'description': 'Pivot {pivot} is now at index {pivot_position}',
+        'educational_note': 'The pivot is now in its final sorted position. All elements to its left are smaller, and all elements to its right are larger.',
+    },
+    'partition': {
+        'description': 'Partition complete: pivot {pivot} at position {pivot_position}',
+        'educational_note': 'The array segment is now partitioned: elements < pivot ([{low}:{pivot_position}]) | pivot | elements > pivot ([{right_start}:{high_end}]).',
+    },
+    'recursive_call': {
+        'description': 'Processing subarray from index {low} to {high}',
+        'educational_note': 'Quick Sort works by recursively partitioning smaller and smaller subarrays.',
+    },
+    'recursive_left': {
+        'description': 'Recursively sorting left partition: [{low}:{pi}]',
+        'educational_note': 'We now apply Quick Sort to the left partition (elements less than the pivot).',
+    },
+    'recursive_right': {
+        'description': 'Recursively sorting right partition: [{right_start}:{high_end}]',
+        'educational_note': 'We now apply Quick Sort to the right partition (elements greater than the pivot).',
+    },
+    'subarray_sorted': {
+        'description': 'Subarray [{low}:{high_end}] is now sorted',
+        'educational_note': 'As we return from the recursive calls, larger portions of the array become sorted.',
+    },
+    'final': {
+        'description': 'Quick Sort complete! The array is now fully sorted.',
+        'educational_note': 'Quick Sort is very efficient for large datasets and has good cache performance, but its worst-case time complexity is O(n²) when poor pivots are chosen consistently.',
+    },
+}
+
+def quick_sort(data, keep=keep_all):
     """
     Enhanced quick sort implementation with detailed educational descriptions.
     """
-    steps = []
+    compared = comparison_counter(keep)
     arr = data.copy()
     n = len(arr)
     
     # Initial state with educational context
-    steps.append({
+    yield {
         'type': 'initial',
         'state': arr.copy(),
-        'description': 'Quick Sort begins with an unsorted array',
-        'educational_note': 'Quick Sort uses a divide-and-conquer approach by selecting a pivot and partitioning the array around it.',
-        'complexity_note': 'Time Complexity: O(n log n) average case, O(n²) worst case when poorly pivoted',
+        'message': 'initial',
         'current_focus': list(range(n))
-    })
+    }
     
     # Helper function for partition
     def partition(low, high, depth=0):
-        nonlocal steps, arr
+        nonlocal arr
         
         # Select pivot (using last element)
         pivot = arr[high]
-        steps.append({
-            'type': 'pivot',
-            'state': arr.copy(),
-            'description': f'Selected pivot: {pivot} at index {high}',
-            'educational_note': f'We choose the last element as our pivot. All elements less than the pivot will go to the left, greater elements will go to the right.',
-            'pivot_index': high,
-            'partition_range': [low, high],
-            'recursion_depth': depth,
-            'current_focus': [high]
-        })
+        if keep('pivot'):
+            yield {
+                'type': 'pivot',
+                'state': arr.copy(),
+                'message': 'pivot',
+                'params': {'pivot': pivot, 'high': high},
+                'pivot_index': high,
+                'partition_range': [low, high],
+                'recursion_depth': depth,
+                'current_focus': [high]
+            }
         
         i = low - 1  # Index of smaller element
         
         # Process each element in the partition
         for j in range(low, high):
-            steps.append({
-                'type': 'comparison',
-                'state': arr.copy(),
-                'description': f'Comparing {arr[j]} with pivot {pivot}',
-                'educational_note': f'We compare each element with the pivot to determine which partition it belongs to.',
-                'comparing': [j, high],
-                'pivot_index': high,
-                'partition_range': [low, high],
-                'recursion_depth': depth,
-                'current_focus': [j, high]
-            })
+            if keep('comparison'):
+                yield {
+                    'type': 'comparison',
+                    'state': arr.copy(),
+                    'message': 'comparison',
+                    'params': {'value_j': arr[j], 'pivot': pivot},
+                    'comparing': [j, high],
+                    'pivot_index': high,
+                    'partition_range': [low, high],
+                    'recursion_depth': depth,
+                    'current_focus': [j, high]
+                }
             
+            compared()
             if arr[j] <= pivot:
                 # Element goes to left partition
                 i += 1
                 
                 if i != j:  # Only swap if indices are different
-                    steps.append({
-                        'type': 'before_swap',
-                        'state': arr.copy(),
-                        'description': f'Moving {arr[j]} to the left partition',
-                        'educational_note': f'Since {arr[j]} is less than or equal to the pivot, we move it to the left partition.',
-                        'swapping': [i, j],
-                        'pivot_index': high,
-                        'partition_range': [low, high],
-                        'recursion_depth': depth,
-                        'current_focus': [i, j]
-                    })
+                    if keep('before_swap'):
+                        yield {
+                            'type': 'before_swap',
+                            'state': arr.copy(),
+                            'message': 'before_swap',
+                            'params': {'value_j': arr[j]},
+                            'swapping': [i, j],
+                            'pivot_index': high,
+                            'partition_range': [low, high],
+                            'recursion_depth': depth,
+                            'current_focus': [i, j]
+                        }
                     
                     arr[i], arr[j] = arr[j], arr[i]
                     
-                    steps.append({
-                        'type': 'after_swap',
-                        'state': arr.copy(),
-                        'description': f'Swapped {arr[i]} and {arr[j]}',
-                        'educational_note': f'After this swap, all elements to the left of index {i} are less than or equal to the pivot.',
-                        'swapped': [i, j],
-                        'pivot_index': high,
-                        'partition_range': [low, high],
-                        'recursion_depth': depth,
-                        'current_focus': [i, j]
-                    })
+                    if keep('after_swap'):
+                        yield {
+                            'type': 'after_swap',
+                            'state': arr.copy(),
+                            'message': 'after_swap',
+                            'params': {'value_i': arr[i], 'value_j': arr[j], 'i': i},
+                            'swapped': [i, j],
+                            'pivot_index': high,
+                            'partition_range': [low, high],
+                            'recursion_depth': depth,
+                            'current_focus': [i, j]
+                        }
                 else:
                     # No swap needed
-                    steps.append({
-                        'type': 'no_swap_needed',
-                        'state': arr.copy(),
-                        'description': f'Element {arr[j]} is already in correct partition',
-                        'educational_note': f'No swap needed as the element is already in the correct position.',
-                        'pivot_index': high,
-                        'partition_range': [low, high],
-                        'recursion_depth': depth,
-                        'current_focus': [j]
-                    })
+                    if keep('no_swap_needed'):
+                        yield {
+                            'type': 'no_swap_needed',
+                            'state': arr.copy(),
+                            'message': 'no_swap_needed',
+                            'params': {'value_j': arr[j]},
+                            'pivot_index': high,
+                            'partition_range': [low, high],
+                            'recursion_depth': depth,
+                            'current_focus': [j]
+                        }
         
         # Move pivot to its final position
         pivot_position = i + 1
-        steps.append({
-            'type': 'before_swap',
-            'state': arr.copy(),
-            'description': f'Moving pivot {pivot} to its correct position',
-            'educational_note': f'After partitioning, we place the pivot between the two partitions at index {pivot_position}.',
-            'swapping': [pivot_position, high],
-            'pivot_index': high,
-            'partition_range': [low, high],
-            'recursion_depth': depth,
-            'current_focus': [pivot_position, high]
-        })
+        if keep('before_swap'):
+            yield {
+                'type': 'before_swap',
+                'state': arr.copy(),
+                'message': 'pivot_before_swap',
+                'params': {'pivot': pivot, 'pivot_position': pivot_position},
+                'swapping': [pivot_position, high],
+                'pivot_index': high,
+                'partition_range': [low, high],
+                'recursion_depth': depth,
+                'current_focus': [pivot_position, high]
+            }
         
         arr[pivot_position], arr[high] = arr[high], arr[pivot_position]
         
-        steps.append({
-            'type': 'after_swap',
-            'state': arr.copy(),
-            'description': f'Pivot {pivot} is now at index {pivot_position}',
-            'educational_note': f'The pivot is now in its final sorted position. All elements to its left are smaller, and all elements to its right are larger.',
-            'swapped': [pivot_position, high],
-            'pivot_index': pivot_position,
-            'partition_range': [low, high],
-            'recursion_depth': depth,
-            'current_focus': [pivot_position]
-        })
-        
-        steps.append({
-            'type': 'partition',
-            'state': arr.copy(),
-            'description': f'Partition complete: pivot {pivot} at position {pivot_position}',
-            'educational_note': f'The array segment is now partitioned: elements < pivot ([{low}:{pivot_position}]) | pivot | elements > pivot ([{pivot_position+1}:{high+1}]).',
-            'pivot_index': pivot_position,
-            'left_partition': list(range(low, pivot_position)),
-            'right_partition': list(range(pivot_position + 1, high + 1)),
-            'recursion_depth': depth,
-            'current_focus': list(range(low, high + 1))
-        })
+        if keep('after_swap'):
+            yield {
+                'type': 'after_swap',
+                'state': arr.copy(),
+                'message': 'pivot_after_swap',
+                'params': {'pivot': pivot, 'pivot_position': pivot_position},
+                'swapped': [pivot_position, high],
+                'pivot_index': pivot_position,
+                'partition_range': [low, high],
+                'recursion_depth': depth,
+                'current_focus': [pivot_position]
+            }
+        
+        if keep('partition'):
+            yield {
+                'type': 'partition',
+                'state': arr.copy(),
+                'message': 'partition',
+                'params': {'pivot': pivot, 'pivot_position': pivot_position, 'low': low, 'right_start': pivot_position + 1, 'high_end': high + 1},
+                'pivot_index': pivot_position,
+                'left_partition': list(range(low, pivot_position)),
+                'right_partition': list(range(pivot_position + 1, high + 1)),
+                'recursion_depth': depth,
+                'current_focus': list(range(low, high + 1))
+            }
         
         return pivot_position
     
-    # Helper function for recursive quick sort
-    def quick_sort_recursive(low, high, depth=0):
-        nonlocal steps, arr
+    # Subarrays still to sort, as an explicit stack so ordered input (which
+    # partitions one element at a time) is not limited by Python's recursion
+    # depth. Each entry is ('sort', low, high, depth), ('right', pi, high, depth)
+    # for the right partition once the left one is sorted, or ('sorted', low, high)
+    # once the whole array is.
+    pending = [('sort', 0, n - 1, 0)]
+    
+    while pending:
+        task = pending.pop()
         
-        if low < high:
+        if task[0] == 'sort':
+            _, low, high, depth = task
+            if low >= high:
+                continue
+            
             # Starting a new recursive call
-            steps.append({
-                'type': 'recursive_call',
-                'state': arr.copy(),
-                'description': f'Processing subarray from index {low} to {high}',
-                'educational_note': f'Quick Sort works by recursively partitioning smaller and smaller subarrays.',
-                'subarray_range': [low, high],
-                'recursion_depth': depth,
-                'current_focus': list(range(low, high + 1))
-            })
+            if keep('recursive_call'):
+                yield {
+                    'type': 'recursive_call',
+                    'state': arr.copy(),
+                    'message': 'recursive_call',
+                    'params': {'low': low, 'high': high},
+                    'subarray_range': [low, high],
+                    'recursion_depth': depth,
+                    'current_focus': list(range(low, high + 1))
+                }
             
             # Find the partition index
-            pi = partition(low, high, depth)
+            pi = yield from partition(low, high, depth)
+            
+            # If this is the root call (depth=0), show sorted segments after both partitions
+            if depth == 0:
+                pending.append(('sorted', low, high))
+            pending.append(('right', pi, high, depth))
             
             # Sort elements before and after partition
             if pi - 1 > low:  # There are elements to sort on the left
-                steps.append({
-                    'type': 'recursive_left',
-                    'state': arr.copy(),
-                    'description': f'Recursively sorting left partition: [{low}:{pi}]',
-                    'educational_note': f'We now apply Quick Sort to the left partition (elements less than the pivot).',
-                    'left_range': [low, pi - 1],
-                    'recursion_depth': depth,
-                    'current_focus': list(range(low, pi))
-                })
-                quick_sort_recursive(low, pi - 1, depth + 1)
-            
+                if keep('recursive_left'):
+                    yield {
+                        'type': 'recursive_left',
+                        'state': arr.copy(),
+                        'message': 'recursive_left',
+                        'params': {'low': low, 'pi': pi},
+                        'left_range': [low, pi - 1],
+                        'recursion_depth': depth,
+                        'current_focus': list(range(low, pi))
+                    }
+                pending.append(('sort', low, pi - 1, depth + 1))
+        
+        elif task[0] == 'right':
+            _, pi, high, depth = task
             if pi + 1 < high:  # There are elements to sort on the right
-                steps.append({
-                    'type': 'recursive_right',
-                    'state': arr.copy(),
-                    'description': f'Recursively sorting right partition: [{pi+1}:{high+1}]',
-                    'educational_note': f'We now apply Quick Sort to the right partition (elements greater than the pivot).',
-                    'right_range': [pi + 1, high],
-                    'recursion_depth': depth,
-                    'current_focus': list(range(pi + 1, high + 1))
-                })
-                quick_sort_recursive(pi + 1, high, depth + 1)
-            
-            # If this is the root call (depth=0), show sorted segments
-            if depth == 0:
-                # Mark as sorted when returning from recursion
-                steps.append({
+                if keep('recursive_right'):
+                    yield {
+                        'type': 'recursive_right',
+                        'state': arr.copy(),
+                        'message': 'recursive_right',
+                        'params': {'right_start': pi + 1, 'high_end': high + 1},
+                        'right_range': [pi + 1, high],
+                        'recursion_depth': depth,
+                        'current_focus': list(range(pi + 1, high + 1))
+                    }
+                pending.append(('sort', pi + 1, high, depth + 1))
+        
+        else:
+            _, low, high = task
+            # Mark as sorted when returning from recursion
+            if keep('subarray_sorted'):
+                yield {
                     'type': 'subarray_sorted',
                     'state': arr.copy(),
-                    'description': f'Subarray [{low}:{high+1}] is now sorted',
-                    'educational_note': f'As we return from the recursive calls, larger portions of the array become sorted.',
+                    'message': 'subarray_sorted',
+                    'params': {'low': low, 'high_end': high + 1},
                     'sorted_indices': list(range(low, high + 1)),
                     'current_focus': list(range(low, high + 1))
-                })
-    
-    # Execute quick sort
-    quick_sort_recursive(0, n - 1)
+                }
     
     # Final state
-    steps.append({
+    yield {
         'type': 'final',
         'state': arr.copy(),
-        'description': 'Quick Sort complete! The array is now fully sorted.',
-        'educational_note': 'Quick Sort is very efficient for large datasets and has good cache performance, but its worst-case time complexity is O(n²) when poor pivots are chosen consistently.',
+        'message': 'final',
         'sorted_indices': list(range(n)),
         'current_focus': list(range(n))
-    })
-    
-    return steps
+    }
 
 
 # ===================== SEARCHING ALGORITHMS =====================
 
-def linear_search(data):
+LINEAR_SEARCH_MESSAGES = {
+    'initial': {
+        'description': 'Linear Search begins, looking for target value {target}',
+        'educational_note': 'Linear Search examines each element sequentially until the target is found or the end is reached.',
+        'complexity_note': 'Time Complexity: O(n) - in worst case, we need to check all n elements',
+    },
+    'checking': {
+        'description': 'Checking element at index {i}: Is {value_i} equal to {target}?',
+        'educational_note': 'Linear Search simply compares each element of the array with the target value.',
+    },
+    'found': {
+        'description': 'Found target {target} at index {i}!',
+        'educational_note': 'Success! We have found the target value after checking {checked_count} elements.',
+    },
+    'not_found': {
+        'description': 'Target {target} not found after checking all {n} elements',
+        'educational_note': 'After examining all elements, we conclude that the target value is not present in the array.',
+    },
+    'final': {
+        'description': 'Linear Search complete! Found {target} at index {i}.',
+        'educational_note': 'Linear Search is simple but inefficient for large arrays. It has O(n) time complexity in the worst case.',
+    },
+}
+
+def linear_search(data, keep=keep_all):
     """
     Enhanced linear search implementation with detailed educational descriptions.
     """
+    compared = comparison_counter(keep)
     # For linear search, data should contain the array and the target value
     # Format: {'array': [...], 'target': value}
     
@@ -800,75 +1248,112 @@ def linear_search(data):
         arr = data.get('array', []).copy()
         target = data.get('target', 0)
     
-    steps = []
     n = len(arr)
     
     # Initial state with educational context
-    steps.append({
+    yield {
         'type': 'initial',
         'state': arr.copy(),
-        'description': f'Linear Search begins, looking for target value {target}',
-        'educational_note': 'Linear Search examines each element sequentially until the target is found or the end is reached.',
-        'complexity_note': 'Time Complexity: O(n) - in worst case, we need to check all n elements',
+        'message': 'initial',
+        'params': {'target': target},
         'target': target,
         'current_focus': []
-    })
+    }
     
     # Perform linear search
     found = False
     
     for i in range(n):
-        steps.append({
-            'type': 'checking',
-            'state': arr.copy(),
-            'description': f'Checking element at index {i}: Is {arr[i]} equal to {target}?',
-            'educational_note': f'Linear Search simply compares each element of the array with the target value.',
-            'checking_index': i,
-            'target': target,
-            'current_focus': [i]
-        })
-        
-        if arr[i] == target:
-            steps.append({
-                'type': 'found',
+        if keep('checking'):
+            yield {
+                'type': 'checking',
                 'state': arr.copy(),
-                'description': f'Found target {target} at index {i}!',
-                'educational_note': f'Success! We have found the target value after checking {i+1} elements.',
-                'found_index': i,
+                'message': 'checking',
+                'params': {'i': i, 'value_i': arr[i], 'target': target},
+                'checking_index': i,
                 'target': target,
                 'current_focus': [i]
-            })
+            }
+        
+        compared()
+        if arr[i] == target:
+            if keep('found'):
+                yield {
+                    'type': 'found',
+                    'state': arr.copy(),
+                    'message': 'found',
+                    'params': {'target': target, 'i': i, 'checked_count': i + 1},
+                    'found_index': i,
+                    'target': target,
+                    'current_focus': [i]
+                }
             found = True
             break
     
     # Final state
     if not found:
-        steps.append({
+        # The terminal step of an unsuccessful search is sent at every level of detail
+        yield {
             'type': 'not_found',
             'state': arr.copy(),
-            'description': f'Target {target} not found after checking all {n} elements',
-            'educational_note': f'After examining all elements, we conclude that the target value is not present in the array.',
+            'message': 'not_found',
+            'params': {'target': target, 'n': n},
             'target': target,
             'current_focus': []
-        })
+        }
     else:
-        steps.append({
+        yield {
             'type': 'final',
             'state': arr.copy(),
-            'description': f'Linear Search complete! Found {target} at index {i}.',
-            'educational_note': f'Linear Search is simple but inefficient for large arrays. It has O(n) time complexity in the worst case.',
+            'message': 'final',
+            'params': {'target': target, 'i': i},
             'target': target,
             'found_index': i,
             'current_focus': [i]
-        })
-    
-    return steps
+        }
 
 
-def binary_search(data):
+BINARY_SEARCH_MESSAGES = {
+    'initial': {
+        'description': 'Binary Search begins on a sorted array, looking for target value {target}',
+        'educational_note': 'Binary Search requires a sorted array. It works by repeatedly dividing the search interval in half.',
+        'complexity_note': 'Time Complexity: O(log n) - much faster than linear search for large arrays',
+    },
+    'search_range': {
+        'description': 'Searching in range [{left}:{right_end}] (elements {range_size})',
+        'educational_note': 'We have narrowed our search to {range_size} elements. Binary search divides the search space in half with each step.',
+    },
+    'checking': {
+        'description': 'Checking middle element at index {mid}: Is {mid_value} equal to {target}?',
+        'educational_note': 'The key to binary search is comparing the middle element with our target value.',
+    },
+    'found': {
+        'description': 'Found target {target} at index {mid}!',
+        'educational_note': 'Success! Binary search found the target in just {iterations} steps, demonstrating its efficiency.',
+    },
+    'move_right': {
+        'description': '{mid_value} < {target}, searching in right half',
+        'educational_note': 'Since the middle element is less than our target, we eliminate the entire left half including the middle element.',
+    },
+    'move_left': {
+        'description': '{mid_value} > {target}, searching in left half',
+        'educational_note': 'Since the middle element is greater than our target, we eliminate the entire right half including the middle element.',
+    },
+    'not_found': {
+        'description': 'Target {target} not found in the array after {iterations} iterations',
+        'educational_note': 'Binary search has exhausted all possibilities and concluded that the target is not present in the array.',
+    },
+    'final': {
+        'description': 'Binary Search complete! Found {target} in {iterations} steps.',
+        'educational_note': 'Compare this to Linear Search which would take up to {n} steps in the worst case. The logarithmic efficiency of Binary Search makes it extremely fast for large datasets.',
+    },
+}
+
+def binary_search(data, keep=keep_all):
     """
     Enhanced binary search implementation with detailed educational descriptions.
     """
+    compared = comparison_counter(keep)
     # For binary search, data should contain the sorted array and the target value
     # Format: {'array': [...], 'target': value}
     
@@ -881,18 +1366,15 @@ def binary_search(data):
         arr = sorted(data.get('array', []).copy())  # Ensure array is sorted
         target = data.get('target', 0)
     
-    steps = []
-    
     # Initial state with educational context
-    steps.append({
+    yield {
         'type': 'initial',
         'state': arr.copy(),
-        'description': f'Binary Search begins on a sorted array, looking for target value {target}',
-        'educational_note': 'Binary Search requires a sorted array. It works by repeatedly dividing the search interval in half.',
-        'complexity_note': 'Time Complexity: O(log n) - much faster than linear search for large arrays',
+        'message': 'initial',
+        'params': {'target': target},
         'target': target,
         'current_focus': list(range(len(arr)))
-    })
+    }
     
     # Perform binary search
     left, right = 0, len(arr) - 1
@@ -904,107 +1386,155 @@ def binary_search(data):
         iterations += 1
         mid = (left + right) // 2
         
-        steps.append({
-            'type': 'search_range',
-            'state': arr.copy(),
-            'description': f'Searching in range [{left}:{right+1}] (elements {right-left+1})',
-            'educational_note': f'We have narrowed our search to {right-left+1} elements. Binary search divides the search space in half with each step.',
-            'left': left,
-            'right': right,
-            'mid': mid,
-            'target': target,
-            'current_focus': list(range(left, right + 1)),
-            'highlighted_focus': [mid]
-        })
-        
-        steps.append({
-            'type': 'checking',
-            'state': arr.copy(),
-            'description': f'Checking middle element at index {mid}: Is {arr[mid]} equal to {target}?',
-            'educational_note': f'The key to binary search is comparing the middle element with our target value.',
-            'checking_index': mid,
-            'target': target,
-            'left': left,
-            'right': right,
-            'current_focus': [mid]
-        })
+        if keep('search_range'):
+            yield {
+                'type': 'search_range',
+                'state': arr.copy(),
+                'message': 'search_range',
+                'params': {'left': left, 'right_end': right + 1, 'range_size': right - left + 1},
+                'left': left,
+                'right': right,
+                'mid': mid,
+                'target': target,
+                'current_focus': list(range(left, right + 1)),
+                'highlighted_focus': [mid]
+            }
         
-        if arr[mid] == target:
-            steps.append({
-                'type': 'found',
+        if keep('checking'):
+            yield {
+                'type': 'checking',
                 'state': arr.copy(),
-                'description': f'Found target {target} at index {mid}!',
-                'educational_note': f'Success! Binary search found the target in just {iterations} steps, demonstrating its efficiency.',
-                'found_index': mid,
+                'message': 'checking',
+                'params': {'mid': mid, 'mid_value': arr[mid], 'target': target},
+                'checking_index': mid,
                 'target': target,
+                'left': left,
+                'right': right,
                 'current_focus': [mid]
-            })
+            }
+        
+        compared()
+        if arr[mid] == target:
+            if keep('found'):
+                yield {
+                    'type': 'found',
+                    'state': arr.copy(),
+                    'message': 'found',
+                    'params': {'target': target, 'mid': mid, 'iterations': iterations},
+                    'found_index': mid,
+                    'target': target,
+                    'current_focus': [mid]
+                }
             found = True
             break
         elif arr[mid] < target:
-            steps.append({
-                'type': 'move_right',
-                'state': arr.copy(),
-                'description': f'{arr[mid]} < {target}, searching in right half',
-                'educational_note': f'Since the middle element is less than our target, we eliminate the entire left half including the middle element.',
-                'left': mid + 1,
-                'right': right,
-                'mid': mid,
-                'target': target,
-                'eliminated_range': list(range(left, mid + 1)),
-                'current_focus': list(range(mid + 1, right + 1))
-            })
+            if keep('move_right'):
+                yield {
+                    'type': 'move_right',
+                    'state': arr.copy(),
+                    'message': 'move_right',
+                    'params': {'mid_value': arr[mid], 'target': target},
+                    'left': mid + 1,
+                    'right': right,
+                    'mid': mid,
+                    'target': target,
+                    'eliminated_range': list(range(left, mid + 1)),
+                    'current_focus': list(range(mid + 1, right + 1))
+                }
             left = mid + 1
         else:
-            steps.append({
-                'type': 'move_left',
-                'state': arr.copy(),
-                'description': f'{arr[mid]} > {target}, searching in left half',
-                'educational_note': f'Since the middle element is greater than our target, we eliminate the entire right half including the middle element.',
-                'left': left,
-                'right': mid - 1,
-                'mid': mid,
-                'target': target,
-                'eliminated_range': list(range(mid, right + 1)),
-                'current_focus': list(range(left, mid))
-            })
+            if keep('move_left'):
+                yield {
+                    'type': 'move_left',
+                    'state': arr.copy(),
+                    'message': 'move_left',
+                    'params': {'mid_value': arr[mid], 'target': target},
+                    'left': left,
+                    'right': mid - 1,
+                    'mid': mid,
+                    'target': target,
+                    'eliminated_range': list(range(mid, right + 1)),
+                    'current_focus': list(range(left, mid))
+                }
             right = mid - 1
     
     # Final state
     if not found:
-        steps.append({
+        # The terminal step of an unsuccessful search is sent at every level of detail
+        yield {
             'type': 'not_found',
             'state': arr.copy(),
-            'description': f'Target {target} not found in the array after {iterations} iterations',
-            'educational_note': f'Binary search has exhausted all possibilities and concluded that the target is not present in the array.',
+            'message': 'not_found',
+            'params': {'target': target, 'iterations': iterations},
             'target': target,
             'current_focus': []
-        })
+        }
     else:
-        steps.append({
+        yield {
             'type': 'final',
             'state': arr.copy(),
-            'description': f'Binary Search complete! Found {target} in {iterations} steps.',
-            'educational_note': f'Compare this to Linear Search which would take up to {len(arr)} steps in the worst case. The logarithmic efficiency of Binary Search makes it extremely fast for large datasets.',
+            'message': 'final',
+            'params': {'target': target, 'iterations': iterations, 'n': len(arr)},
             'target': target,
             'found_index': mid,
             'current_focus': [mid]
-        })
-    
-    return steps
+        }
 
 
 # ===================== TREE OPERATIONS =====================
 
-def bst_insertion(data):
+BST_INSERTION_MESSAGES = {
+    'initial': {
+        'description': 'Starting with an empty Binary Search Tree',
+        'educational_note': 'A Binary Search Tree (BST) is a tree data structure where for each node, all elements in its left subtree are less than the node, and all elements in its right subtree are greater.',
+        'complexity_note': 'Time Complexity: O(log n) average case for insertions, but O(n) worst case for skewed trees',
+    },
+    'insert_start': {
+        'description': 'Inserting value {value} into the BST',
+        'educational_note': 'To insert a value, we start at the root and move down the tree, comparing with each node.',
+    },
+    'insert_root': {
+        'description': 'Created root node with value {value}',
+        'educational_note': 'For the first insertion, we create the root node of the tree.',
+    },
+    'comparison': {
+        'description': 'Comparing {value} with node value {node_value}',
+        'educational_note': 'We compare the value to be inserted with the current node to determine whether to go left or right.',
+    },
+    'go_left': {
+        'description': '{value} < {node_value}, moving to left child',
+        'educational_note': 'Since the value is less than the current node, we move to the left subtree.',
+    },
+    'go_right': {
+        'description': '{value} >= {node_value}, moving to right child',
+        'educational_note': 'Since the value is greater than or equal to the current node, we move to the right subtree.',
+    },
+    'insert_left': {
+        'description': 'Inserted {value} as left child of {parent_value}',
+        'educational_note': 'We have found the insertion point: {value} becomes the left child of {parent_value}.',
+    },
+    'insert_right': {
+        'description': 'Inserted {value} as right child of {parent_value}',
+        'educational_note': 'We have found the insertion point: {value} becomes the right child of {parent_value}.',
+    },
+    'after_insertion': {
+        'description': 'Tree after inserting {value}',
+        'educational_note': 'The BST property is maintained: for every node, all elements in its left subtree are less, and all elements in its right subtree are greater.',
+    },
+    'final': {
+        'description': 'Binary Search Tree construction complete!',
+        'educational_note': 'The resulting BST allows for efficient operations like search, insertion, and deletion, all with O(log n) average time complexity in balanced trees.',
+    },
+}
+
+def bst_insertion(data, keep=keep_all):
     """
     Enhanced Binary Search Tree Insertion implementation with detailed educational descriptions.
     """
+    compared = comparison_counter(keep)
     # For BST insertion, data should be a list of values to insert in order
     # We'll represent the tree as a list of nodes with indices
     
-    steps = []
-    
     # Helper class to represent a node in the BST
     class Node:
         def __init__(self, value):
@@ -1030,11 +1560,11 @@ def bst_insertion(data):
             return {}
         
         node_dict = {}
-        queue = [(root, 0)]
+        queue = deque([(root, 0)])
         counter = 0
         
         while queue:
-            node, level = queue.pop(0)
+            node, level = queue.popleft()
             node.index = counter
             node_dict[node] = counter
             counter += 1
@@ -1047,42 +1577,52 @@ def bst_insertion(data):
         return node_dict
     
     # Initial state with educational context
-    steps.append({
+    yield {
         'type': 'initial',
         'state': [],
-        'description': 'Starting with an empty Binary Search Tree',
-        'educational_note': 'A Binary Search Tree (BST) is a tree data structure where for each node, all elements in its left subtree are less than the node, and all elements in its right subtree are greater.',
-        'complexity_note': 'Time Complexity: O(log n) average case for insertions, but O(n) worst case for skewed trees',
+        'message': 'initial',
         'current_focus': []
-    })
+    }
     
     root = None
     node_dict = {}
+    indices_stale = False
+    
+    # Level-order indices change with every insertion but are only recomputed
+    # when a step that shows them is built
+    def current_indices():
+        nonlocal node_dict, indices_stale
+        if indices_stale:
+            node_dict = assign_indices(root)
+            indices_stale = False
+        return node_dict
     
     # Insert each value into the BST
     for i, value in enumerate(data):
-        steps.append({
-            'type': 'insert_start',
-            'state': tree_to_array(root, node_dict) if root else [],
-            'description': f'Inserting value {value} into the BST',
-            'educational_note': f'To insert a value, we start at the root and move down the tree, comparing with each node.',
-            'inserting_value': value,
-            'current_focus': []
-        })
+        if keep('insert_start'):
+            yield {
+                'type': 'insert_start',
+                'state': tree_to_array(root, current_indices()) if root else [],
+                'message': 'insert_start',
+                'params': {'value': value},
+                'inserting_value': value,
+                'current_focus': []
+            }
         
         # If the tree is empty, create a root node
         if not root:
             root = Node(value)
             node_dict = assign_indices(root)
             
-            steps.append({
-                'type': 'insert_root',
-                'state': tree_to_array(root, node_dict),
-                'description': f'Created root node with value {value}',
-                'educational_note': f'For the first insertion, we create the root node of the tree.',
-                'inserted_index': 0,
-                'current_focus': [0]
-            })
+            if keep('insert_root'):
+                yield {
+                    'type': 'insert_root',
+                    'state': tree_to_array(root, current_indices()),
+                    'message': 'insert_root',
+                    'params': {'value': value},
+                    'inserted_index': 0,
+                    'current_focus': [0]
+                }
             continue
         
         # Start at the root and find the proper position
@@ -1092,41 +1632,45 @@ def bst_insertion(data):
         
         while current:
             parent = current
-            path.append(current.index)
+            path.append(current)
             
-            steps.append({
-                'type': 'comparison',
-                'state': tree_to_array(root, node_dict),
-                'description': f'Comparing {value} with node value {current.value}',
-                'educational_note': f'We compare the value to be inserted with the current node to determine whether to go left or right.',
-                'comparing': [current.index],
-                'current_focus': [current.index],
-                'path': path.copy()
-            })
+            if keep('comparison'):
+                yield {
+                    'type': 'comparison',
+                    'state': tree_to_array(root, current_indices()),
+                    'message': 'comparison',
+                    'params': {'value': value, 'node_value': current.value},
+                    'comparing': [current.index],
+                    'current_focus': [current.index],
+                    'path': [node.index for node in path]
+                }
             
+            compared()
             if value < current.value:
-                steps.append({
-                    'type': 'go_left',
-                    'state': tree_to_array(root, node_dict),
-                    'description': f'{value} < {current.value}, moving to left child',
-                    'educational_note': f'Since the value is less than the current node, we move to the left subtree.',
-                    'current_node': current.index,
-                    'current_focus': [current.index],
-                    'path': path.copy(),
-                    'direction': 'left'
-                })
+                if keep('go_left'):
+                    yield {
+                        'type': 'go_left',
+                        'state': tree_to_array(root, current_indices()),
+                        'message': 'go_left',
+                        'params': {'value': value, 'node_value': current.value},
+                        'current_node': current.index,
+                        'current_focus': [current.index],
+                        'path': [node.index for node in path],
+                        'direction': 'left'
+                    }
                 current = current.left
             else:
-                steps.append({
-                    'type': 'go_right',
-                    'state': tree_to_array(root, node_dict),
-                    'description': f'{value} >= {current.value}, moving to right child',
-                    'educational_note': f'Since the value is greater than or equal to the current node, we move to the right subtree.',
-                    'current_node': current.index,
-                    'current_focus': [current.index],
-                    'path': path.copy(),
-                    'direction': 'right'
-                })
+                if keep('go_right'):
+                    yield {
+                        'type': 'go_right',
+                        'state': tree_to_array(root, current_indices()),
+                        'message': 'go_right',
+                        'params': {'value': value, 'node_value': current.value},
+                        'current_node': current.index,
+                        'current_focus': [current.index],
+                        'path': [node.index for node in path],
+                        'direction': 'right'
+                    }
                 current = current.right
         
         # Create a new node at the appropriate position
@@ -1134,64 +1678,130 @@ def bst_insertion(data):
         
         if value < parent.value:
             parent.left = new_node
-            steps.append({
-                'type': 'insert_left',
-                'state': tree_to_array(root, assign_indices(root)),
-                'description': f'Inserted {value} as left child of {parent.value}',
-                'educational_note': f'We have found the insertion point: {value} becomes the left child of {parent.value}.',
-                'parent_index': parent.index,
-                'inserted_value': value,
-                'current_focus': [parent.index],
-                'path': path.copy()
-            })
+            if keep('insert_left'):
+                yield {
+                    'type': 'insert_left',
+                    'state': tree_to_array(root, assign_indices(root)),
+                    'message': 'insert_left',
+                    'params': {'value': value, 'parent_value': parent.value},
+                    'parent_index': parent.index,
+                    'inserted_value': value,
+                    'current_focus': [parent.index],
+                    'path': [node.index for node in path]
+                }
         else:
             parent.right = new_node
-            steps.append({
-                'type': 'insert_right',
-                'state': tree_to_array(root, assign_indices(root)),
-                'description': f'Inserted {value} as right child of {parent.value}',
-                'educational_note': f'We have found the insertion point: {value} becomes the right child of {parent.value}.',
-                'parent_index': parent.index,
-                'inserted_value': value,
-                'current_focus': [parent.index],
-                'path': path.copy()
-            })
-        
-        # Update the node dictionary
-        node_dict = assign_indices(root)
+            if keep('insert_right'):
+                yield {
+                    'type': 'insert_right',
+                    'state': tree_to_array(root, assign_indices(root)),
+                    'message': 'insert_right',
+                    'params': {'value': value, 'parent_value': parent.value},
+                    'parent_index': parent.index,
+                    'inserted_value': value,
+                    'current_focus': [parent.index],
+                    'path': [node.index for node in path]
+                }
+        
+        # The node dictionary is updated when next needed
+        indices_stale = True
         
         # Show the tree after insertion
-        steps.append({
-            'type': 'after_insertion',
-            'state': tree_to_array(root, node_dict),
-            'description': f'Tree after inserting {value}',
-            'educational_note': f'The BST property is maintained: for every node, all elements in its left subtree are less, and all elements in its right subtree are greater.',
-            'node_indices': list(node_dict.values()),
-            'current_focus': list(node_dict.values())
-        })
+        if keep('after_insertion'):
+            yield {
+                'type': 'after_insertion',
+                'state': tree_to_array(root, current_indices()),
+                'message': 'after_insertion',
+                'params': {'value': value},
+                'node_indices': list(node_dict.values()),
+                'current_focus': list(node_dict.values())
+            }
     
     # Final state
-    steps.append({
+    yield {
         'type': 'final',
-        'state': tree_to_array(root, node_dict),
-        'description': 'Binary Search Tree construction complete!',
-        'educational_note': 'The resulting BST allows for efficient operations like search, insertion, and deletion, all with O(log n) average time complexity in balanced trees.',
+        'state': tree_to_array(root, current_indices()),
+        'message': 'final',
         'node_indices': list(node_dict.values()),
         'current_focus': list(node_dict.values())
-    })
-    
-    return steps
+    }
 
 
-def bst_traversal(data):
+BST_TRAVERSAL_MESSAGES = {
+    'initial': {
+        'description': 'Binary Search Tree ready for traversal',
+        'educational_note': 'Tree traversal is the process of visiting each node in a tree data structure exactly once. There are different traversal orders: in-order, pre-order, and post-order.',
+        'complexity_note': 'Time Complexity: O(n) for all traversal methods, where n is the number of nodes',
+    },
+    'inorder_start': {
+        'description': 'Starting In-order Traversal (Left, Root, Right)',
+        'educational_note': 'In-order traversal visits the left subtree, then the root, then the right subtree. For a BST, this yields elements in sorted order.',
+    },
+    'inorder_left': {
+        'description': 'Moving to left child of {node_value}',
+        'educational_note': 'In in-order traversal, we first recursively visit the left subtree.',
+    },
+    'inorder_visit': {
+        'description': 'Visiting node {node_value}',
+        'educational_note': 'After visiting the left subtree, we visit the node itself.',
+    },
+    'inorder_right': {
+        'description': 'Moving to right child of {node_value}',
+        'educational_note': 'After visiting the node, we recursively visit the right subtree.',
+    },
+    'inorder_complete': {
+        'description': 'In-order Traversal complete: {inorder_result}',
+        'educational_note': 'For a Binary Search Tree, in-order traversal gives the elements in sorted (ascending) order.',
+    },
+    'preorder_start': {
+        'description': 'Starting Pre-order Traversal (Root, Left, Right)',
+        'educational_note': 'Pre-order traversal visits the root, then the left subtree, then the right subtree. It is useful for creating a copy of the tree or prefix expression.',
+    },
+    'preorder_visit': {
+        'description': 'Visiting node {node_value}',
+        'educational_note': 'In pre-order traversal, we visit the node first, before its children.',
+    },
+    'preorder_left': {
+        'description': 'Moving to left child of {node_value}',
+        'educational_note': 'After visiting the node, we recursively visit the left subtree.',
+    },
+    'preorder_right': {
+        'description': 'Moving to right child of {node_value}',
+        'educational_note': 'After visiting the left subtree, we recursively visit the right subtree.',
+    },
+    'preorder_complete': {
+        'description': 'Pre-order Traversal complete: {preorder_result}',
+        'educational_note': 'Pre-order traversal is useful when you want to create a copy of the tree or to generate a prefix expression (Polish notation).',
+    },
+    'postorder_start': {
+        'description': 'Starting Post-order Traversal (Left, Right, Root)',
+        'educational_note': 'Post-order traversal visits the left subtree, then the right subtree, then the root. It is useful for deletion operations and postfix expressions.',
+    },
+    'postorder_left': {
+        'description': 'Moving to left child of {node_value}',
+        'educational_note': 'In post-order traversal, we first recursively visit the left subtree.',
+    },
+    'postorder_visit': {
+        'description': 'Visiting node {node_value}',
+        'educational_note': 'In post-order traversal, we visit the node after both its subtrees have been visited.',
+    },
+    'postorder_complete': {
+        'description': 'Post-order Traversal complete: {postorder_result}',
+        'educational_note': 'Post-order traversal is useful for deleting the tree (as we visit children before parents) or for generating postfix notation.',
+    },
+    'final': {
+        'description': 'All traversals complete!',
+        'educational_note': 'Traversal methods give us different ways to process all nodes in a tree in a specific order, each with its own applications.',
+    },
+}
+
+def bst_traversal(data, keep=keep_all):
     """
     Enhanced Binary Search Tree Traversal implementation with detailed educational descriptions.
     """
     # For BST traversal, data should be a list of values to first build the tree
     # Then we'll demonstrate different traversal methods
     
-    steps = []
-    
     # Helper class to represent a node in the BST
     class Node:
         def __init__(self, value):
@@ -1217,11 +1827,11 @@ def bst_traversal(data):
             return {}
         
         node_dict = {}
-        queue = [(root, 0)]
+        queue = deque([(root, 0)])
         counter = 0
         
         while queue:
-            node, level = queue.pop(0)
+            node, level = queue.popleft()
             node.index = counter
             node_dict[node] = counter
             counter += 1
@@ -1266,108 +1876,110 @@ def bst_traversal(data):
     root, node_dict = build_bst(data)
     
     # Initial state with educational context
-    steps.append({
+    yield {
         'type': 'initial',
         'state': tree_to_array(root, node_dict),
-        'description': 'Binary Search Tree ready for traversal',
-        'educational_note': 'Tree traversal is the process of visiting each node in a tree data structure exactly once. There are different traversal orders: in-order, pre-order, and post-order.',
-        'complexity_note': 'Time Complexity: O(n) for all traversal methods, where n is the number of nodes',
+        'message': 'initial',
         'node_indices': list(node_dict.values()),
         'current_focus': list(node_dict.values())
-    })
+    }
     
     # In-order traversal
-    steps.append({
-        'type': 'inorder_start',
-        'state': tree_to_array(root, node_dict),
-        'description': 'Starting In-order Traversal (Left, Root, Right)',
-        'educational_note': 'In-order traversal visits the left subtree, then the root, then the right subtree. For a BST, this yields elements in sorted order.',
-        'node_indices': list(node_dict.values()),
-        'current_focus': [root.index]
-    })
+    if keep('inorder_start'):
+        yield {
+            'type': 'inorder_start',
+            'state': tree_to_array(root, node_dict),
+            'message': 'inorder_start',
+            'node_indices': list(node_dict.values()),
+            'current_focus': [root.index]
+        }
     
     inorder_result = []
     visited_nodes = []
     
     def inorder(node):
-        nonlocal steps, inorder_result, visited_nodes
+        nonlocal inorder_result, visited_nodes
         
         if not node:
             return
         
         # Visit left subtree
         if node.left:
-            steps.append({
-                'type': 'inorder_left',
-                'state': tree_to_array(root, node_dict),
-                'description': f'Moving to left child of {node.value}',
-                'educational_note': 'In in-order traversal, we first recursively visit the left subtree.',
-                'current_node': node.index,
-                'next_node': node.left.index,
-                'visited': visited_nodes.copy(),
-                'current_focus': [node.index, node.left.index]
-            })
+            if keep('inorder_left'):
+                yield {
+                    'type': 'inorder_left',
+                    'state': tree_to_array(root, node_dict),
+                    'message': 'inorder_left',
+                    'params': {'node_value': node.value},
+                    'current_node': node.index,
+                    'next_node': node.left.index,
+                    'visited': visited_nodes.copy(),
+                    'current_focus': [node.index, node.left.index]
+                }
         
-        inorder(node.left)
+        yield from inorder(node.left)
         
         # Visit the node itself
         inorder_result.append(node.value)
         visited_nodes.append(node.index)
         
-        steps.append({
-            'type': 'inorder_visit',
-            'state': tree_to_array(root, node_dict),
-            'description': f'Visiting node {node.value}',
-            'educational_note': 'After visiting the left subtree, we visit the node itself.',
-            'visited_node': node.index,
-            'visited': visited_nodes.copy(),
-            'inorder_result': inorder_result.copy(),
-            'current_focus': [node.index]
-        })
+        if keep('inorder_visit'):
+            yield {
+                'type': 'inorder_visit',
+                'state': tree_to_array(root, node_dict),
+                'message': 'inorder_visit',
+                'params': {'node_value': node.value},
+                'visited_node': node.index,
+                'visited': visited_nodes.copy(),
+                'inorder_result': inorder_result.copy(),
+                'current_focus': [node.index]
+            }
         
         # Visit right subtree
         if node.right:
-            steps.append({
-                'type': 'inorder_right',
-                'state': tree_to_array(root, node_dict),
-                'description': f'Moving to right child of {node.value}',
-                'educational_note': 'After visiting the node, we recursively visit the right subtree.',
-                'current_node': node.index,
-                'next_node': node.right.index,
-                'visited': visited_nodes.copy(),
-                'current_focus': [node.index, node.right.index]
-            })
+            if keep('inorder_right'):
+                yield {
+                    'type': 'inorder_right',
+                    'state': tree_to_array(root, node_dict),
+                    'message': 'inorder_right',
+                    'params': {'node_value': node.value},
+                    'current_node': node.index,
+                    'next_node': node.right.index,
+                    'visited': visited_nodes.copy(),
+                    'current_focus': [node.index, node.right.index]
+                }
         
-        inorder(node.right)
+        yield from inorder(node.right)
     
-    inorder(root)
+    yield from inorder(root)
     
     # In-order traversal complete
-    steps.append({
-        'type': 'inorder_complete',
-        'state': tree_to_array(root, node_dict),
-        'description': f'In-order Traversal complete: {inorder_result}',
-        'educational_note': 'For a Binary Search Tree, in-order traversal gives the elements in sorted (ascending) order.',
-        'inorder_result': inorder_result,
-        'visited': visited_nodes.copy(),
-        'current_focus': list(node_dict.values())
-    })
+    if keep('inorder_complete'):
+        yield {
+            'type': 'inorder_complete',
+            'state': tree_to_array(root, node_dict),
+            'message': 'inorder_complete',
+            'params': {'inorder_result': list(inorder_result)},
+            'inorder_result': inorder_result,
+            'visited': visited_nodes.copy(),
+            'current_focus': list(node_dict.values())
+        }
     
     # Pre-order traversal
-    steps.append({
-        'type': 'preorder_start',
-        'state': tree_to_array(root, node_dict),
-        'description': 'Starting Pre-order Traversal (Root, Left, Right)',
-        'educational_note': 'Pre-order traversal visits the root, then the left subtree, then the right subtree. It is useful for creating a copy of the tree or prefix expression.',
-        'node_indices': list(node_dict.values()),
-        'current_focus': [root.index]
-    })
+    if keep('preorder_start'):
+        yield {
+            'type': 'preorder_start',
+            'state': tree_to_array(root, node_dict),
+            'message': 'preorder_start',
+            'node_indices': list(node_dict.values()),
+            'current_focus': [root.index]
+        }
     
     preorder_result = []
     visited_nodes = []
     
     def preorder(node):
-        nonlocal steps, preorder_result, visited_nodes
+        nonlocal preorder_result, visited_nodes
         
         if not node:
             return
@@ -1376,155 +1988,192 @@ def bst_traversal(data):
         preorder_result.append(node.value)
         visited_nodes.append(node.index)
         
-        steps.append({
-            'type': 'preorder_visit',
-            'state': tree_to_array(root, node_dict),
-            'description': f'Visiting node {node.value}',
-            'educational_note': 'In pre-order traversal, we visit the node first, before its children.',
-            'visited_node': node.index,
-            'visited': visited_nodes.copy(),
-            'preorder_result': preorder_result.copy(),
-            'current_focus': [node.index]
-        })
+        if keep('preorder_visit'):
+            yield {
+                'type': 'preorder_visit',
+                'state': tree_to_array(root, node_dict),
+                'message': 'preorder_visit',
+                'params': {'node_value': node.value},
+                'visited_node': node.index,
+                'visited': visited_nodes.copy(),
+                'preorder_result': preorder_result.copy(),
+                'current_focus': [node.index]
+            }
         
         # Then visit left subtree
         if node.left:
-            steps.append({
-                'type': 'preorder_left',
-                'state': tree_to_array(root, node_dict),
-                'description': f'Moving to left child of {node.value}',
-                'educational_note': 'After visiting the node, we recursively visit the left subtree.',
-                'current_node': node.index,
-                'next_node': node.left.index,
-                'visited': visited_nodes.copy(),
-                'current_focus': [node.index, node.left.index]
-            })
+            if keep('preorder_left'):
+                yield {
+                    'type': 'preorder_left',
+                    'state': tree_to_array(root, node_dict),
+                    'message': 'preorder_left',
+                    'params': {'node_value': node.value},
+                    'current_node': node.index,
+                    'next_node': node.left.index,
+                    'visited': visited_nodes.copy(),
+                    'current_focus': [node.index, node.left.index]
+                }
         
-        preorder(node.left)
+        yield from preorder(node.left)
         
         # Finally visit right subtree
         if node.right:
-            steps.append({
-                'type': 'preorder_right',
-                'state': tree_to_array(root, node_dict),
-                'description': f'Moving to right child of {node.value}',
-                'educational_note': 'After visiting the left subtree, we recursively visit the right subtree.',
-                'current_node': node.index,
-                'next_node': node.right.index,
-                'visited': visited_nodes.copy(),
-                'current_focus': [node.index, node.right.index]
-            })
+            if keep('preorder_right'):
+                yield {
+                    'type': 'preorder_right',
+                    'state': tree_to_array(root, node_dict),
+                    'message': 'preorder_right',
+                    'params': {'node_value': node.value},
+                    'current_node': node.index,
+                    'next_node': node.right.index,
+                    'visited': visited_nodes.copy(),
+                    'current_focus': [node.index, node.right.index]
+                }
         
-        preorder(node.right)
+        yield from preorder(node.right)
     
-    preorder(root)
+    yield from preorder(root)
     
     # Pre-order traversal complete
-    steps.append({
-        'type': 'preorder_complete',
-        'state': tree_to_array(root, node_dict),
-        'description': f'Pre-order Traversal complete: {preorder_result}',
-        'educational_note': 'Pre-order traversal is useful when you want to create a copy of the tree or to generate a prefix expression (Polish notation).',
-        'preorder_result': preorder_result,
-        'visited': visited_nodes.copy(),
-        'current_focus': list(node_dict.values())
-    })
+    if keep('preorder_complete'):
+        yield {
+            'type': 'preorder_complete',
+            'state': tree_to_array(root, node_dict),
+            'message': 'preorder_complete',
+            'params': {'preorder_result': list(preorder_result)},
+            'preorder_result': preorder_result,
+            'visited': visited_nodes.copy(),
+            'current_focus': list(node_dict.values())
+        }
     
     # Post-order traversal
-    steps.append({
-        'type': 'postorder_start',
-        'state': tree_to_array(root, node_dict),
-        'description': 'Starting Post-order Traversal (Left, Right, Root)',
-        'educational_note': 'Post-order traversal visits the left subtree, then the right subtree, then the root. It is useful for deletion operations and postfix expressions.',
-        'node_indices': list(node_dict.values()),
-        'current_focus': [root.index]
-    })
+    if keep('postorder_start'):
+        yield {
+            'type': 'postorder_start',
+            'state': tree_to_array(root, node_dict),
+            'message': 'postorder_start',
+            'node_indices': list(node_dict.values()),
+            'current_focus': [root.index]
+        }
     
     postorder_result = []
     visited_nodes = []
     
     def postorder(node):
-        nonlocal steps, postorder_result, visited_nodes
+        nonlocal postorder_result, visited_nodes
         
         if not node:
             return
         
         # First visit left subtree
         if node.left:
-            steps.append({
-                'type': 'postorder_left',
-                'state': tree_to_array(root, node_dict),
-                'description': f'Moving to left child of {node.value}',
-                'educational_note': 'In post-order traversal, we first recursively visit the left subtree.',
-                'current_node': node.index,
-                'next_node': node.left.index,
-                'visited': visited_nodes.copy(),
-                'current_focus': [node.index, node.left.index]
-            })
+            if keep('postorder_left'):
+                yield {
+                    'type': 'postorder_left',
+                    'state': tree_to_array(root, node_dict),
+                    'message': 'postorder_left',
+                    'params': {'node_value': node.value},
+                    'current_node': node.index,
+                    'next_node': node.left.index,
+                    'visited': visited_nodes.copy(),
+                    'current_focus': [node.index, node.left.index]
+                }
         
-        postorder(node.left)
+        yield from postorder(node.left)
         
         # Then visit right subtree
         if node.right:
-            steps.append({
-                'type': 'postorder_right',
-                'state': tree_to_array(root, node_dict),
-                'description': f'Moving to right child of {node.value}',
-                'educational_note': 'After visiting the left subtree, we recursively visit the right subtree.',
-                'current_node': node.index,
-                'next_node': node.right.index,
-                'visited': visited_nodes.copy(),
-                'current_focus': [node.index, node.right.index]
-            })
+            if keep('postorder_right'):
+                yield {
+                    'type': 'postorder_right',
+                    'state': tree_to_array(root, node_dict),
+                    'message': 'preorder_right',
+                    'params': {'node_value': node.value},
+                    'current_node': node.index,
+                    'next_node': node.right.index,
+                    'visited': visited_nodes.copy(),
+                    'current_focus': [node.index, node.right.index]
+                }
         
-        postorder(node.right)
+        yield from postorder(node.right)
         
         # Visit the node itself last
         postorder_result.append(node.value)
         visited_nodes.append(node.index)
         
-        steps.append({
-            'type': 'postorder_visit',
-            'state': tree_to_array(root, node_dict),
-            'description': f'Visiting node {node.value}',
-            'educational_note': 'In post-order traversal, we visit the node after both its subtrees have been visited.',
-            'visited_node': node.index,
-            'visited': visited_nodes.copy(),
-            'postorder_result': postorder_result.copy(),
-            'current_focus': [node.index]
-        })
+        if keep('postorder_visit'):
+            yield {
+                'type': 'postorder_visit',
+                'state': tree_to_array(root, node_dict),
+                'message': 'postorder_visit',
+                'params': {'node_value': node.value},
+                'visited_node': node.index,
+                'visited': visited_nodes.copy(),
+                'postorder_result': postorder_result.copy(),
+                'current_focus': [node.index]
+            }
     
-    postorder(root)
+    yield from postorder(root)
     
     # Post-order traversal complete
-    steps.append({
-        'type': 'postorder_complete',
-        'state': tree_to_array(root, node_dict),
-        'description': f'Post-order Traversal complete: {postorder_result}',
-        'educational_note': 'Post-order traversal is useful for deleting the tree (as we visit children before parents) or for generating postfix notation.',
-        'postorder_result': postorder_result,
-        'visited': visited_nodes.copy(),
-        'current_focus': list(node_dict.values())
-    })
+    if keep('postorder_complete'):
+        yield {
+            'type': 'postorder_complete',
+            'state': tree_to_array(root, node_dict),
+            'message': 'postorder_complete',
+            'params': {'postorder_result': list(postorder_result)},
+            'postorder_result': postorder_result,
+            'visited': visited_nodes.copy(),
+            'current_focus': list(node_dict.values())
+        }
     
     # Final state
-    steps.append({
+    yield {
         'type': 'final',
         'state': tree_to_array(root, node_dict),
-        'description': 'All traversals complete!',
-        'educational_note': 'Traversal methods give us different ways to process all nodes in a tree in a specific order, each with its own applications.',
+        'message': 'final',
         'inorder_result': inorder_result,
         'preorder_result': preorder_result,
         'postorder_result': postorder_result,
         'current_focus': list(node_dict.values())
-    })
-    
-    return steps
+    }
 
 
 # ===================== GRAPH ALGORITHMS =====================
 
-def bfs(data):
+BFS_MESSAGES = {
+    'initial': {
+        'description': 'Breadth-First Search starting from node {start}',
+        'educational_note': 'Breadth-First Search (BFS) explores a graph level by level, visiting all neighbors of a node before moving to the next level.',
+        'complexity_note': 'Time Complexity: O(V + E) where V is the number of vertices and E is the number of edges',
+    },
+    'bfs_start': {
+        'description': 'Starting BFS from node {start}',
+        'educational_note': 'We begin by adding the start node to the queue and marking it as visited.',
+    },
+    'bfs_new_level': {
+        'description': 'Moving to level {current_level}',
+        'educational_note': 'BFS explores the graph level by level. We are now exploring nodes at distance {current_level} from the start.',
+    },
+    'bfs_visit': {
+        'description': 'Visiting node {node}',
+        'educational_note': 'We process the node at the front of the queue and then enqueue all its unvisited neighbors.',
+    },
+    'bfs_enqueue': {
+        'description': 'Adding neighbor {neighbor} of node {node} to the queue',
+        'educational_note': 'Since node {neighbor} has not been visited yet, we add it to the queue for later processing.',
+    },
+    'bfs_skip': {
+        'description': 'Skipping neighbor {neighbor} of node {node} as it\'s already visited',
+        'educational_note': 'Node {neighbor} has already been visited or is already in the queue, so we skip it to avoid cycles.',
+    },
+    'final': {
+        'description': 'Breadth-First Search complete! Visited nodes: {visited}',
+        'educational_note': 'BFS gives us the shortest path (in terms of the number of edges) from the start node to all reachable nodes.',
+    },
+}
+
+def bfs(data, keep=keep_all):
     """
     Enhanced Breadth-First Search implementation with detailed educational descriptions.
     """
@@ -1546,117 +2195,145 @@ def bfs(data):
                 graph[i].append(i + 1)
         start = 0
     
-    steps = []
-    
-    # Initial state with educational context
-    steps.append({
+    # Initial state with educational context; the graph is only sent on this
+    # step, later steps refer to nodes by name
+    yield {
         'type': 'initial',
         'state': graph,
-        'description': f'Breadth-First Search starting from node {start}',
-        'educational_note': 'Breadth-First Search (BFS) explores a graph level by level, visiting all neighbors of a node before moving to the next level.',
-        'complexity_note': 'Time Complexity: O(V + E) where V is the number of vertices and E is the number of edges',
+        'message': 'initial',
+        'params': {'start': start},
         'start_node': start,
         'current_focus': [start]
-    })
+    }
     
     # Perform BFS
     visited = []
-    queue = [start]
-    visited_nodes = [start]
+    queue = deque([start])
+    # Nodes ever enqueued; a set keeps the membership checks O(1)
+    discovered = {start}
     levels = {start: 0}
     
-    steps.append({
-        'type': 'bfs_start',
-        'state': graph,
-        'description': f'Starting BFS from node {start}',
-        'educational_note': 'We begin by adding the start node to the queue and marking it as visited.',
-        'start_node': start,
-        'visited': visited.copy(),
-        'queue': queue.copy(),
-        'current_focus': [start]
-    })
+    if keep('bfs_start'):
+        yield {
+            'type': 'bfs_start',
+            'message': 'bfs_start',
+            'params': {'start': start},
+            'start_node': start,
+            'visited': visited.copy(),
+            'queue': list(queue),
+            'current_focus': [start]
+        }
     
     current_level = 0
     level_nodes = []
     
     while queue:
-        node = queue.pop(0)
+        node = queue.popleft()
         visited.append(node)
         
         # Check if we're starting a new level
         if levels[node] > current_level:
             current_level = levels[node]
-            steps.append({
-                'type': 'bfs_new_level',
-                'state': graph,
-                'description': f'Moving to level {current_level}',
-                'educational_note': f'BFS explores the graph level by level. We are now exploring nodes at distance {current_level} from the start.',
-                'level': current_level,
-                'level_nodes': level_nodes.copy(),
-                'visited': visited.copy(),
-                'queue': queue.copy(),
-                'current_focus': level_nodes.copy()
-            })
+            if keep('bfs_new_level'):
+                yield {
+                    'type': 'bfs_new_level',
+                    'message': 'bfs_new_level',
+                    'params': {'current_level': current_level},
+                    'level': current_level,
+                    'level_nodes': level_nodes.copy(),
+                    'visited': visited.copy(),
+                    'queue': list(queue),
+                    'current_focus': level_nodes.copy()
+                }
             level_nodes = []
         
         level_nodes.append(node)
         
-        steps.append({
-            'type': 'bfs_visit',
-            'state': graph,
-            'description': f'Visiting node {node}',
-            'educational_note': 'We process the node at the front of the queue and then enqueue all its unvisited neighbors.',
-            'visited_node': node,
-            'visited': visited.copy(),
-            'queue': queue.copy(),
-            'current_focus': [node]
-        })
+        if keep('bfs_visit'):
+            yield {
+                'type': 'bfs_visit',
+                'message': 'bfs_visit',
+                'params': {'node': node},
+                'visited_node': node,
+                'visited': visited.copy(),
+                'queue': list(queue),
+                'current_focus': [node]
+            }
         
         # Add unvisited neighbors to the queue
         for neighbor in graph.get(node, []):
-            if neighbor not in visited_nodes:
+            if neighbor not in discovered:
                 queue.append(neighbor)
-                visited_nodes.append(neighbor)
+                discovered.add(neighbor)
                 levels[neighbor] = levels[node] + 1
                 
-                steps.append({
-                    'type': 'bfs_enqueue',
-                    'state': graph,
-                    'description': f'Adding neighbor {neighbor} of node {node} to the queue',
-                    'educational_note': f'Since node {neighbor} has not been visited yet, we add it to the queue for later processing.',
-                    'added_node': neighbor,
-                    'from_node': node,
-                    'visited': visited.copy(),
-                    'queue': queue.copy(),
-                    'current_focus': [node, neighbor]
-                })
+                if keep('bfs_enqueue'):
+                    yield {
+                        'type': 'bfs_enqueue',
+                        'message': 'bfs_enqueue',
+                        'params': {'neighbor': neighbor, 'node': node},
+                        'added_node': neighbor,
+                        'from_node': node,
+                        'visited': visited.copy(),
+                        'queue': list(queue),
+                        'current_focus': [node, neighbor]
+                    }
             else:
-                steps.append({
-                    'type': 'bfs_skip',
-                    'state': graph,
-                    'description': f'Skipping neighbor {neighbor} of node {node} as it\'s already visited',
-                    'educational_note': f'Node {neighbor} has already been visited or is already in the queue, so we skip it to avoid cycles.',
-                    'skipped_node': neighbor,
-                    'from_node': node,
-                    'visited': visited.copy(),
-                    'queue': queue.copy(),
-                    'current_focus': [node, neighbor]
-                })
+                if keep('bfs_skip'):
+                    yield {
+                        'type': 'bfs_skip',
+                        'message': 'bfs_skip',
+                        'params': {'neighbor': neighbor, 'node': node},
+                        'skipped_node': neighbor,
+                        'from_node': node,
+                        'visited': visited.copy(),
+                        'queue': list(queue),
+                        'current_focus': [node, neighbor]
+                    }
     
     # BFS complete
-    steps.append({
+    yield {
         'type': 'final',
-        'state': graph,
-        'description': f'Breadth-First Search complete! Visited nodes: {visited}',
-        'educational_note': 'BFS gives us the shortest path (in terms of the number of edges) from the start node to all reachable nodes.',
+        'message': 'final',
+        'params': {'visited': list(visited)},
         'visited': visited,
         'current_focus': visited.copy()
-    })
-    
-    return steps
+    }
+
 
+DFS_MESSAGES = {
+    'initial': {
+        'description': 'Depth-First Search starting from node {start}',
+        'educational_note': 'Depth-First Search (DFS) explores as far as possible along each branch before backtracking.',
+        'complexity_note': 'Time Complexity: O(V + E) where V is the number of vertices and E is the number of edges',
+    },
+    'dfs_start': {
+        'description': 'Starting DFS from node {start}',
+        'educational_note': 'We begin by adding the start node to the stack and will explore its path as deeply as possible before backtracking.',
+    },
+    'dfs_visit': {
+        'description': 'Visiting node {node}',
+        'educational_note': 'We process the node at the top of the stack and then push all its unvisited neighbors to continue exploring deeply.',
+    },
+    'dfs_push': {
+        'description': 'Pushing neighbor {neighbor} of node {node} onto the stack',
+        'educational_note': 'We add node {neighbor} to the stack so we can explore its path deeply before returning to other branches.',
+    },
+    'dfs_skip': {
+        'description': 'Skipping neighbor {neighbor} of node {node} as it\'s already visited',
+        'educational_note': 'Node {neighbor} has already been visited, so we skip it to avoid cycles.',
+    },
+    'dfs_backtrack': {
+        'description': 'Reached a dead end at node {node}, backtracking',
+        'educational_note': 'When there are no more unvisited neighbors, DFS backtracks to explore other branches.',
+    },
+    'final': {
+        'description': 'Depth-First Search complete! Visited nodes: {visited}',
+        'educational_note': 'DFS is useful for finding connected components, topological sorting, and pathfinding in maze-like structures.',
+    },
+}
 
-def dfs(data):
+def dfs(data, keep=keep_all):
     """
     Enhanced Depth-First Search implementation with detailed educational descriptions.
     """
@@ -1678,119 +2355,153 @@ def dfs(data):
                 graph[i].append(i + 1)
         start = 0
     
-    steps = []
-    
-    # Initial state with educational context
-    steps.append({
+    # Initial state with educational context; the graph is only sent on this
+    # step, later steps refer to nodes by name
+    yield {
         'type': 'initial',
         'state': graph,
-        'description': f'Depth-First Search starting from node {start}',
-        'educational_note': 'Depth-First Search (DFS) explores as far as possible along each branch before backtracking.',
-        'complexity_note': 'Time Complexity: O(V + E) where V is the number of vertices and E is the number of edges',
+        'message': 'initial',
+        'params': {'start': start},
         'start_node': start,
         'current_focus': [start]
-    })
+    }
     
     # Perform DFS
     visited = []
+    # Same nodes as visited; a set keeps the membership checks O(1)
+    visited_set = set()
     stack = [start]
     path = []
     
-    steps.append({
-        'type': 'dfs_start',
-        'state': graph,
-        'description': f'Starting DFS from node {start}',
-        'educational_note': 'We begin by adding the start node to the stack and will explore its path as deeply as possible before backtracking.',
-        'start_node': start,
-        'visited': visited.copy(),
-        'stack': stack.copy(),
-        'path': path.copy(),
-        'current_focus': [start]
-    })
+    if keep('dfs_start'):
+        yield {
+            'type': 'dfs_start',
+            'message': 'dfs_start',
+            'params': {'start': start},
+            'start_node': start,
+            'visited': visited.copy(),
+            'stack': stack.copy(),
+            'path': path.copy(),
+            'current_focus': [start]
+        }
     
     while stack:
         node = stack.pop()
         
-        if node not in visited:
+        if node not in visited_set:
             visited.append(node)
+            visited_set.add(node)
             path.append(node)
             
-            steps.append({
-                'type': 'dfs_visit',
-                'state': graph,
-                'description': f'Visiting node {node}',
-                'educational_note': 'We process the node at the top of the stack and then push all its unvisited neighbors to continue exploring deeply.',
-                'visited_node': node,
-                'visited': visited.copy(),
-                'stack': stack.copy(),
-                'path': path.copy(),
-                'current_focus': [node]
-            })
+            if keep('dfs_visit'):
+                yield {
+                    'type': 'dfs_visit',
+                    'message': 'dfs_visit',
+                    'params': {'node': node},
+                    'visited_node': node,
+                    'visited': visited.copy(),
+                    'stack': stack.copy(),
+                    'path': path.copy(),
+                    'current_focus': [node]
+                }
             
             # Add unvisited neighbors to the stack (in reverse order to maintain the expected DFS order)
             neighbors = sorted(graph.get(node, []), reverse=True)
             for neighbor in neighbors:
-                if neighbor not in visited:
+                if neighbor not in visited_set:
                     stack.append(neighbor)
                     
-                    steps.append({
-                        'type': 'dfs_push',
-                        'state': graph,
-                        'description': f'Pushing neighbor {neighbor} of node {node} onto the stack',
-                        'educational_note': f'We add node {neighbor} to the stack so we can explore its path deeply before returning to other branches.',
-                        'pushed_node': neighbor,
-                        'from_node': node,
-                        'visited': visited.copy(),
-                        'stack': stack.copy(),
-                        'path': path.copy(),
-                        'current_focus': [node, neighbor]
-                    })
+                    if keep('dfs_push'):
+                        yield {
+                            'type': 'dfs_push',
+                            'message': 'dfs_push',
+                            'params': {'neighbor': neighbor, 'node': node},
+                            'pushed_node': neighbor,
+                            'from_node': node,
+                            'visited': visited.copy(),
+                            'stack': stack.copy(),
+                            'path': path.copy(),
+                            'current_focus': [node, neighbor]
+                        }
                 else:
-                    steps.append({
-                        'type': 'dfs_skip',
-                        'state': graph,
-                        'description': f'Skipping neighbor {neighbor} of node {node} as it\'s already visited',
-                        'educational_note': f'Node {neighbor} has already been visited, so we skip it to avoid cycles.',
-                        'skipped_node': neighbor,
-                        'from_node': node,
+                    if keep('dfs_skip'):
+                        yield {
+                            'type': 'dfs_skip',
+                            'message': 'dfs_skip',
+                            'params': {'neighbor': neighbor, 'node': node},
+                            'skipped_node': neighbor,
+                            'from_node': node,
+                            'visited': visited.copy(),
+                            'stack': stack.copy(),
+                            'path': path.copy(),
+                            'current_focus': [node, neighbor]
+                        }
+            
+            # If no unvisited neighbors, we've reached a dead end
+            if all(neighbor in visited_set for neighbor in graph.get(node, [])):
+                if keep('dfs_backtrack'):
+                    yield {
+                        'type': 'dfs_backtrack',
+                        'message': 'dfs_backtrack',
+                        'params': {'node': node},
+                        'dead_end_node': node,
                         'visited': visited.copy(),
                         'stack': stack.copy(),
                         'path': path.copy(),
-                        'current_focus': [node, neighbor]
-                    })
-            
-            # If no unvisited neighbors, we've reached a dead end
-            if all(neighbor in visited for neighbor in graph.get(node, [])):
-                steps.append({
-                    'type': 'dfs_backtrack',
-                    'state': graph,
-                    'description': f'Reached a dead end at node {node}, backtracking',
-                    'educational_note': 'When there are no more unvisited neighbors, DFS backtracks to explore other branches.',
-                    'dead_end_node': node,
-                    'visited': visited.copy(),
-                    'stack': stack.copy(),
-                    'path': path.copy(),
-                    'current_focus': [node]
-                })
+                        'current_focus': [node]
+                    }
     
     # DFS complete
-    steps.append({
+    yield {
         'type': 'final',
-        'state': graph,
-        'description': f'Depth-First Search complete! Visited nodes: {visited}',
-        'educational_note': 'DFS is useful for finding connected components, topological sorting, and pathfinding in maze-like structures.',
+        'message': 'final',
+        'params': {'visited': list(visited)},
         'visited': visited,
         'path': path,
         'current_focus': visited.copy()
-    })
-    
-    return steps
+    }
+
+
+# Above this many nodes the final step carries only the predecessor map
+DIJKSTRA_MAX_PATH_NODES = 1000
 
+DIJKSTRA_MESSAGES = {
+    'initial': {
+        'description': 'Dijkstra\'s Algorithm starting from node {start}',
+        'educational_note': 'Dijkstra\'s Algorithm finds the shortest path from a start node to all other nodes in a weighted graph with non-negative edge weights.',
+        'complexity_note': 'Time Complexity: O((V + E) log V) where V is the number of vertices and E is the number of edges',
+    },
+    'dijkstra_init': {
+        'description': 'Initializing distances: 0 for start node, infinity for all others',
+        'educational_note': 'We initialize the distance to the start node as 0 and to all other nodes as infinity. We\'ll update these distances as we discover shorter paths.',
+    },
+    'dijkstra_unreachable': {
+        'description': 'Remaining nodes are unreachable from the start node',
+        'educational_note': 'When the priority queue runs out before every node is settled, the remaining nodes are not connected to our start node.',
+    },
+    'dijkstra_current': {
+        'description': 'Processing node {current} with current distance {current_distance}',
+        'educational_note': 'We select the unvisited node with the smallest tentative distance as our current node.',
+    },
+    'dijkstra_check': {
+        'description': 'Checking path to {neighbor} via {current}',
+        'educational_note': 'We calculate the potential new distance to node {neighbor} by adding the weight of the edge from {current} to {neighbor} to the distance to {current}.',
+    },
+    'dijkstra_update': {
+        'description': 'Updated: shorter path to {neighbor} via {current}, new distance: {distance}',
+        'educational_note': 'We\'ve found a shorter path to node {neighbor} through {current}, so we update its distance and set {current} as its predecessor.',
+    },
+    'final': {
+        'description': 'Dijkstra\'s Algorithm complete!',
+        'educational_note': 'We have found the shortest path from the start node to all reachable nodes in the graph.',
+    },
+}
 
-def dijkstra(data):
+def dijkstra(data, keep=keep_all):
     """
     Enhanced Dijkstra's Algorithm implementation with detailed educational descriptions.
     """
+    compared = comparison_counter(keep)
     # For Dijkstra's algorithm, data should be a dictionary representing the graph with weighted edges and a starting node
     # Format: {'graph': {node: {neighbor: weight}}, 'start': start_node}
     
@@ -1808,125 +2519,267 @@ def dijkstra(data):
                 graph[i][i + 1] = 1  # Weight of 1 for all edges
         start = 0
     
-    steps = []
-    
-    # Initial state with educational context
-    steps.append({
+    # Initial state with educational context; the graph is only sent on this
+    # step, later steps refer to nodes by name
+    yield {
         'type': 'initial',
         'state': graph,
-        'description': f'Dijkstra\'s Algorithm starting from node {start}',
-        'educational_note': 'Dijkstra\'s Algorithm finds the shortest path from a start node to all other nodes in a weighted graph with non-negative edge weights.',
-        'complexity_note': 'Time Complexity: O((V + E) log V) where V is the number of vertices and E is the number of edges',
+        'message': 'initial',
+        'params': {'start': start},
         'start_node': start,
         'current_focus': [start]
-    })
-    
-    # Initialize distances and visited nodes
-    distances = {node: float('infinity') for node in graph}
-    distances[start] = 0
-    previous = {node: None for node in graph}
-    unvisited = list(graph.keys())
+    }
     
-    steps.append({
+    # Every node, including ones that only appear as edge targets
+    nodes = list(graph)
+    known = set(nodes)
+    for neighbors in graph.values():
+        for neighbor in neighbors:
+            if neighbor not in known:
+                known.add(neighbor)
+                nodes.append(neighbor)
+    
+    # Initialize distances; JSON has no infinity, so unreached nodes are sent as None
+    infinity = float('infinity')
+    distances = {start: 0}
+    previous = {start: None}
+    
+    yield {
         'type': 'dijkstra_init',
-        'state': graph,
-        'description': f'Initializing distances: 0 for start node, infinity for all others',
-        'educational_note': 'We initialize the distance to the start node as 0 and to all other nodes as infinity. We\'ll update these distances as we discover shorter paths.',
-        'distances': distances.copy(),
-        'unvisited': unvisited.copy(),
+        'message': 'dijkstra_init',
+        'distances': {node: distances.get(node) for node in nodes},
+        'unvisited': nodes.copy(),
         'current_focus': [start]
-    })
+    }
+    
+    # Priority queue of (distance, insertion order, node). Entries are never
+    # removed when a shorter path is found; stale ones are skipped when popped.
+    heap = [(0, 0, start)]
+    pushed = 1
+    visited = set()
+    settled_order = []
+    
+    # Updates from skipped steps, carried by the next update or current step sent
+    distance_updates = {}
+    previous_updates = {}
     
     # Main Dijkstra algorithm loop
-    while unvisited:
-        # Find the unvisited node with the smallest distance
-        current = min(unvisited, key=lambda node: distances[node])
-        
-        # If the smallest distance is infinity, there are unreachable nodes
-        if distances[current] == float('infinity'):
-            steps.append({
-                'type': 'dijkstra_unreachable',
-                'state': graph,
-                'description': f'Remaining nodes are unreachable from the start node',
-                'educational_note': 'When the minimum distance becomes infinity, it means the remaining nodes are not connected to our start node.',
-                'current_node': current,
-                'distances': distances.copy(),
-                'unvisited': unvisited.copy(),
-                'current_focus': unvisited.copy()
-            })
-            break
+    while heap:
+        current_distance, _, current = heapq.heappop(heap)
+        if current in visited or current_distance > distances[current]:
+            continue
         
-        steps.append({
-            'type': 'dijkstra_current',
-            'state': graph,
-            'description': f'Processing node {current} with current distance {distances[current]}',
-            'educational_note': 'We select the unvisited node with the smallest tentative distance as our current node.',
-            'current_node': current,
-            'distances': distances.copy(),
-            'unvisited': unvisited.copy(),
-            'current_focus': [current]
-        })
-        
-        # Remove current node from unvisited
-        unvisited.remove(current)
-        
-        # Update distances to neighbors
+        if keep('dijkstra_current'):
+            step = {
+                'type': 'dijkstra_current',
+                'message': 'dijkstra_current',
+                'params': {'current': current, 'current_distance': current_distance},
+                'current_node': current,
+                'current_distance': current_distance,
+                'visited_count': len(visited),
+                'current_focus': [current]
+            }
+            if distance_updates:
+                step['distance_update'] = distance_updates
+                step['previous_update'] = previous_updates
+                distance_updates, previous_updates = {}, {}
+            yield step
+        
+        visited.add(current)
+        settled_order.append(current)
+        
+        # Update distances to unvisited neighbors; steps record only the changed entry
         for neighbor, weight in graph.get(current, {}).items():
-            if neighbor in unvisited:  # Only consider unvisited neighbors
-                distance = distances[current] + weight
-                
-                steps.append({
+            if neighbor in visited:
+                continue
+            
+            distance = current_distance + weight
+            known_distance = distances.get(neighbor, infinity)
+            
+            if keep('dijkstra_check'):
+                yield {
                     'type': 'dijkstra_check',
-                    'state': graph,
-                    'description': f'Checking path to {neighbor} via {current}',
-                    'educational_note': f'We calculate the potential new distance to node {neighbor} by adding the weight of the edge from {current} to {neighbor} to the distance to {current}.',
+                    'message': 'dijkstra_check',
+                    'params': {'neighbor': neighbor, 'current': current},
                     'from_node': current,
                     'to_node': neighbor,
-                    'current_distance': distances[neighbor],
+                    'current_distance': distances.get(neighbor),
                     'new_distance': distance,
                     'weight': weight,
-                    'distances': distances.copy(),
                     'current_focus': [current, neighbor]
-                })
+                }
+            
+            compared()
+            if distance < known_distance:
+                distances[neighbor] = distance
+                previous[neighbor] = current
+                heapq.heappush(heap, (distance, pushed, neighbor))
+                pushed += 1
                 
-                if distance < distances[neighbor]:
-                    distances[neighbor] = distance
-                    previous[neighbor] = current
-                    
-                    steps.append({
+                distance_updates[neighbor] = distance
+                previous_updates[neighbor] = current
+                if keep('dijkstra_update'):
+                    yield {
                         'type': 'dijkstra_update',
-                        'state': graph,
-                        'description': f'Updated: shorter path to {neighbor} via {current}, new distance: {distance}',
-                        'educational_note': f'We\'ve found a shorter path to node {neighbor} through {current}, so we update its distance and set {current} as its predecessor.',
+                        'message': 'dijkstra_update',
+                        'params': {'neighbor': neighbor, 'current': current, 'distance': distance},
                         'updated_node': neighbor,
                         'from_node': current,
                         'new_distance': distance,
-                        'distances': distances.copy(),
-                        'previous': previous.copy(),
+                        'distance_update': distance_updates,
+                        'previous_update': previous_updates,
                         'current_focus': [current, neighbor]
-                    })
-    
-    # Construct shortest paths
+                    }
+                    distance_updates, previous_updates = {}, {}
+    
+    # Any nodes never settled are not connected to the start node
+    unreachable = [node for node in nodes if node not in visited]
+    if unreachable:
+        yield {
+            'type': 'dijkstra_unreachable',
+            'message': 'dijkstra_unreachable',
+            'unreachable': unreachable,
+            'current_focus': unreachable
+        }
+    
+    # Construct shortest paths in settle order, so each predecessor's path is
+    # already known. Skipped for large graphs, where 'previous' is enough to
+    # rebuild any path and the full path table would dominate the trace.
     paths = {}
-    for node in graph:
-        if distances[node] != float('infinity'):
-            path = []
-            current = node
-            while current is not None:
-                path.append(current)
-                current = previous[current]
-            path.reverse()
-            paths[node] = path
+    if len(nodes) <= DIJKSTRA_MAX_PATH_NODES:
+        for node in settled_order:
+            parent = previous[node]
+            paths[node] = [node] if parent is None else paths[parent] + [node]
     
     # Final state
-    steps.append({
+    yield {
         'type': 'final',
-        'state': graph,
-        'description': f'Dijkstra\'s Algorithm complete!',
-        'educational_note': 'We have found the shortest path from the start node to all reachable nodes in the graph.',
-        'distances': distances,
+        'message': 'final',
+        'distances': {node: distances.get(node) for node in nodes},
+        'previous': previous,
         'paths': paths,
-        'current_focus': list(graph.keys())
-    })
+        'current_focus': nodes
+    }
+
+
+# ===================== ALGORITHM REGISTRY =====================
+
+ALGORITHM_FUNCTIONS = {
+    # Sorting algorithms
+    'Bubble Sort': bubble_sort,
+    'Selection Sort': selection_sort,
+    'Insertion Sort': insertion_sort,
+    'Merge Sort': merge_sort,
+    'Quick Sort': quick_sort,
+    
+    # Searching algorithms
+    'Linear Search': linear_search,
+    'Binary Search': binary_search,
+    
+    # Tree operations
+    'BST Insertion': bst_insertion,
+    'BST Traversal': bst_traversal,
+    
+    # Graph algorithms
+    'Breadth-First Search': bfs,
+    'Breadth First Search': bfs,  # name used by load_initial_data
+    'Depth-First Search': dfs,
+    'Dijkstra\'s Algorithm': dijkstra,
+}
+
+MESSAGE_CATALOGUES = {
+    'Bubble Sort': BUBBLE_SORT_MESSAGES,
+    'Selection Sort': SELECTION_SORT_MESSAGES,
+    'Insertion Sort': INSERTION_SORT_MESSAGES,
+    'Merge Sort': MERGE_SORT_MESSAGES,
+    'Quick Sort': QUICK_SORT_MESSAGES,
+    'Linear Search': LINEAR_SEARCH_MESSAGES,
+    'Binary Search': BINARY_SEARCH_MESSAGES,
+    'BST Insertion': BST_INSERTION_MESSAGES,
+    'BST Traversal': BST_TRAVERSAL_MESSAGES,
+    'Breadth-First Search': BFS_MESSAGES,
+    'Breadth First Search': BFS_MESSAGES,
+    'Depth-First Search': DFS_MESSAGES,
+    'Dijkstra\'s Algorithm': DIJKSTRA_MESSAGES,
+}
+
+# ===================== TRACE METRICS =====================
+
+# Step types that correspond to one comparison, swap or array write
+COMPARISON_STEP_TYPES = {'comparison', 'checking', 'dijkstra_check'}
+SWAP_STEP_TYPES = {'swap', 'after_swap'}
+WRITE_STEP_TYPES = {'shift', 'insert', 'place'}
+
+# Element reads and writes behind a step: a comparison reads two elements, a
+# swap reads and writes two, a shift reads one and writes it one place over
+ACCESS_COUNTS = {
+    'comparison': 2, 'checking': 1,
+    'swap': 4, 'after_swap': 4,
+    'shift': 2, 'insert': 1, 'place': 1,
+}
+
+
+def summarize_step_counts(type_counts):
+    """Steps, comparisons, swaps, array writes and element accesses from the number of steps of each type"""
+    metrics = {'steps': 0, 'comparisons': 0, 'swaps': 0, 'writes': 0, 'accesses': 0}
+    for step_type, count in type_counts.items():
+        metrics['steps'] += count
+        if step_type in COMPARISON_STEP_TYPES:
+            metrics['comparisons'] += count
+        elif step_type in SWAP_STEP_TYPES:
+            metrics['swaps'] += count
+        elif step_type in WRITE_STEP_TYPES:
+            metrics['writes'] += count
+        metrics['accesses'] += ACCESS_COUNTS.get(step_type, 0) * count
+    return metrics
+
+
+def summarize_trace(steps):
+    """Count steps, comparisons, swaps, array writes and element accesses in a trace"""
+    return summarize_step_counts(Counter(step.get('type') for step in steps))
+
+
+class OperationCounter:
+    """
+    Step filter that counts the steps an algorithm would produce and builds
+    none of them, and the comparisons it makes (see comparison_counter)
+    """
+    
+    def __init__(self):
+        # Called once per step; defaultdict increments run about twice as fast as Counter's
+        self.type_counts = defaultdict(int)
+        self.comparisons = 0
+    
+    def __call__(self, step_type):
+        self.type_counts[step_type] += 1
+        return False
+    
+    def count_comparison(self):
+        self.comparisons += 1
+
+
+def count_algorithm_operations(algorithm_name, input_data):
+    """
+    Run an algorithm for its operation counts only, without a trace.
+    Returns (metrics, final_step, wall_time): the summarize_trace metrics the
+    full trace would have, except that comparisons are counted where they are
+    made (a trace does not show the one that ends an insertion sort shift),
+    the final step (with message IDs rather than text) and the time taken in
+    seconds.
+    """
+    if algorithm_name not in ALGORITHM_FUNCTIONS:
+        raise ValueError(f"Algorithm '{algorithm_name}' not implemented")
     
-    return steps
\ No newline at end of file
+    counter = OperationCounter()
+    final_step = None
+    started = time.perf_counter()
+    # Only the steps sent at every level of detail (initial, final and the not_found of a failed search) are built
+    for final_step in ALGORITHM_FUNCTIONS[algorithm_name](input_data, counter):
+        counter.type_counts[final_step['type']] += 1
+    wall_time = time.perf_counter() - started
+    
+    metrics = summarize_step_counts(counter.type_counts)
+    # Comparisons no step shows read two elements, like a 'comparison' step
+    metrics['accesses'] += ACCESS_COUNTS['comparison'] * (counter.comparisons - metrics['comparisons'])
+    metrics['comparisons'] = counter.comparisons
+    return metrics, final_step, wall_time
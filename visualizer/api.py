@@ -1,30 +1,161 @@
-from rest_framework import viewsets, permissions
+from django.conf import settings
+from django.db.models import Prefetch
+from django.utils.cache import patch_cache_control
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.response import Response
+from .benchmarks import shapes_for
+from .catalogue import catalogue_etag, catalogue_last_modified
+from .complexity import get_complexity_curve
+from .executor import TraceExecutionError, TraceTimeoutError
 from .models import Algorithm, DataStructure, Visualization
-from .serializers import AlgorithmSerializer, DataStructureSerializer, VisualizationSerializer
+from .pagination import VisualizationCursorPagination
+from .renderers import FastJSONRenderer
+from .serializers import (
+    AlgorithmSerializer, DataStructureSerializer, VisualizationListSerializer, VisualizationSerializer,
+    requested_fields
+)
+from .trace_encoding import expand_delta_window
+from .trace_pages import decoded_traces
 
-class AlgorithmViewSet(viewsets.ReadOnlyModelViewSet):
-    """API endpoint for viewing algorithms"""
+catalogue_conditional = method_decorator(condition(etag_func=catalogue_etag, last_modified_func=catalogue_last_modified))
+
+class ConditionalCatalogueMixin:
+    """
+    ETag/Last-Modified support for the read-only catalogue endpoints.
+    Both validators come from the cached catalogue version, so a matching
+    If-None-Match gets a 304 without touching the database. Responses are
+    marked no-cache so clients always revalidate instead of reusing them.
+    """
+    
+    @catalogue_conditional
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+    
+    @catalogue_conditional
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+    
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if request.method in ('GET', 'HEAD'):
+            patch_cache_control(response, no_cache=True)
+        return response
+
+def trimmed_queryset(queryset, serializer_class, request):
+    """Load only the model columns the (possibly ?fields= trimmed) serializer will output"""
+    fields = requested_fields(request) or serializer_class.Meta.fields
+    model_fields = {field.name for field in queryset.model._meta.concrete_fields}
+    return queryset.only('id', *(name for name in fields if name in model_fields))
+
+class AlgorithmViewSet(ConditionalCatalogueMixin, viewsets.ReadOnlyModelViewSet):
+    """API endpoint for viewing algorithms (supports ?fields=)"""
     queryset = Algorithm.objects.all()
     serializer_class = AlgorithmSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    
+    def get_queryset(self):
+        queryset = trimmed_queryset(Algorithm.objects.all(), self.serializer_class, self.request)
+        fields = requested_fields(self.request)
+        if fields is None or 'data_structures' in fields:
+            # One query for every algorithm's data structures instead of one per algorithm
+            data_structures = trimmed_queryset(DataStructure.objects.all(), DataStructureSerializer, None)
+            queryset = queryset.prefetch_related(Prefetch('data_structures', queryset=data_structures))
+        return queryset
+    
+    @action(detail=True, methods=['get'], renderer_classes=[FastJSONRenderer, BrowsableAPIRenderer])
+    def complexity(self, request, pk=None):
+        """Measured operation counts over growing inputs: /api/algorithms/<id>/complexity/?shape="""
+        algorithm = self.get_object()
+        shapes = shapes_for(algorithm.name)
+        shape = request.query_params.get('shape', shapes[0])
+        if shape not in shapes:
+            return Response({'error': f"shape must be one of {', '.join(shapes)}"}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            curve, cache_hit = get_complexity_curve(algorithm.name, shape)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except TraceExecutionError as e:
+            status_code = status.HTTP_504_GATEWAY_TIMEOUT if isinstance(e, TraceTimeoutError) else status.HTTP_503_SERVICE_UNAVAILABLE
+            return Response({'error': str(e)}, status=status_code)
+        
+        response = Response(dict(curve, algorithm=algorithm.name, declared=algorithm.time_complexity))
+        response['X-Complexity-Cache'] = 'hit' if cache_hit else 'miss'
+        return response
 
-class DataStructureViewSet(viewsets.ReadOnlyModelViewSet):
-    """API endpoint for viewing data structures"""
+class DataStructureViewSet(ConditionalCatalogueMixin, viewsets.ReadOnlyModelViewSet):
+    """API endpoint for viewing data structures (supports ?fields=)"""
     queryset = DataStructure.objects.all()
     serializer_class = DataStructureSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    
+    def get_queryset(self):
+        return trimmed_queryset(DataStructure.objects.all(), self.serializer_class, self.request)
 
 class VisualizationViewSet(viewsets.ModelViewSet):
     """API endpoint for managing visualizations"""
     queryset = Visualization.objects.all()
     serializer_class = VisualizationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = VisualizationCursorPagination
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
     
     def get_queryset(self):
         """Return only the user's own visualizations"""
-        if self.request.user.is_authenticated:
-            return Visualization.objects.filter(user=self.request.user)
-        return Visualization.objects.none()
+        if not self.request.user.is_authenticated:
+            return Visualization.objects.none()
+        
+        # Newest first, served by the (user, -created_at) index
+        queryset = Visualization.objects.filter(user=self.request.user).order_by('-created_at')
+        if self.action == 'list':
+            # Listings never touch the trace blob or the input data
+            queryset = queryset.select_related('algorithm', 'trace').only(
+                'id', 'name', 'created_at', 'user_id', 'algorithm__name', 'trace__step_count'
+            )
+        elif self.action == 'steps':
+            # The steps come from decoded_traces, so the blob columns are only read on a miss
+            queryset = queryset.select_related('trace').defer(
+                'input_data', 'trace__compressed_steps', 'trace__legacy_steps'
+            )
+        return queryset
+    
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return VisualizationListSerializer
+        return VisualizationSerializer
+    
+    @action(detail=True, methods=['get'])
+    def steps(self, request, pk=None):
+        """Return a window of steps: /api/visualizations/<id>/steps/?offset=&limit="""
+        default_limit = getattr(settings, 'VISUALIZATION_STEPS_PAGE_SIZE', 100)
+        max_limit = getattr(settings, 'VISUALIZATION_STEPS_MAX_PAGE_SIZE', 1000)
+        
+        try:
+            offset = int(request.query_params.get('offset', 0))
+            limit = int(request.query_params.get('limit', default_limit))
+        except ValueError:
+            return Response({'error': 'offset and limit must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if offset < 0 or limit < 1:
+            return Response({'error': 'offset must be >= 0 and limit >= 1'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = min(limit, max_limit)
+        
+        trace = self.get_object().trace
+        steps = decoded_traces.get_steps(trace)
+        window = steps[offset:offset + limit]
+        # Traces executed in the delta format are saved that way; pages are always full steps
+        if any('delta' in step or 'keyframe' in step for step in window):
+            window = expand_delta_window(steps, offset, offset + limit)
+        return Response({
+            'count': trace.step_count,
+            'offset': offset,
+            'limit': limit,
+            'steps': window
+        })
     
     def perform_create(self, serializer):
         """Set the user automatically"""
@@ -3,4 +3,8 @@ from django.apps import AppConfig
 
 class VisualizerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'visualizer'
\ No newline at end of file
+    name = 'visualizer'
+
+    def ready(self):
+        # Register the catalogue cache invalidation and trace cleanup handlers
+        from . import signals  # noqa: F401
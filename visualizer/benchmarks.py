@@ -0,0 +1,284 @@
+"""
+Benchmarks for AlgoViz3D trace generation
+
+Runs every registered algorithm over a grid of input sizes and shapes and
+records how long ``execute_algorithm_steps`` takes, its peak memory, the number
+of steps and the size of the trace as JSON. Results can be saved as a baseline
+and compared against later runs to catch regressions.
+
+Each case also records what it costs to put the trace on the wire: render time
+with DRF's JSONRenderer and with FastJSONRenderer, and the gzip and (when
+installed) brotli compressed sizes.
+
+Array inputs are generated in bulk with NumPy when it is installed and with the
+random module otherwise. The two produce different (but equally deterministic)
+values for the same seed, so INPUT_GENERATOR is recorded in saved baselines,
+generated count requests and complexity curves, and baselines from the other
+generator are refused.
+"""
+
+import hashlib
+import json
+import platform
+import random
+import time
+import tracemalloc
+
+from django.utils.text import compress_string
+from rest_framework.renderers import JSONRenderer
+
+from .algorithm_engine import ALGORITHM_FUNCTIONS, ENGINE_VERSION, execute_algorithm_steps
+from .graph_input import GRAPH_ALGORITHMS
+from .middleware import brotli, compress
+from .renderers import FastJSONRenderer
+
+try:
+    import numpy
+except ImportError:  # Optional; inputs are generated with the random module instead
+    numpy = None
+
+INPUT_GENERATOR = 'numpy' if numpy is not None else 'random'
+ARRAY_SHAPES = ('random', 'sorted', 'reversed', 'duplicates', 'nearly-sorted')
+GRAPH_SHAPES = ('sparse', 'dense')
+DEFAULT_SIZES = (16, 64, 256)
+
+# Metrics compared between runs; wall time is noisy so it gets its own tolerance
+METRICS = ('wall_time', 'peak_memory', 'step_count', 'json_bytes')
+DEFAULT_THRESHOLD = 0.2
+DEFAULT_TIME_THRESHOLD = 0.5
+
+
+def benchmark_algorithms():
+    """Registered algorithm names, skipping aliases of the same implementation"""
+    names = []
+    seen = set()
+    for name, function in ALGORITHM_FUNCTIONS.items():
+        if function not in seen:
+            seen.add(function)
+            names.append(name)
+    return names
+
+
+def shapes_for(algorithm_name):
+    """Input shapes that apply to an algorithm"""
+    return GRAPH_SHAPES if algorithm_name in GRAPH_ALGORITHMS else ARRAY_SHAPES
+
+
+def graph_degree(shape, size):
+    """Outgoing edges per node of a generated graph"""
+    return 2 if shape == 'sparse' else max(2, size // 2)
+
+
+def input_elements(shape, size):
+    """Number of values make_input creates: array elements, or nodes plus edges"""
+    if shape in GRAPH_SHAPES:
+        return size + size * min(graph_degree(shape, size), size - 1)
+    return size
+
+
+def nearly_sorted_swaps(size):
+    """Random swaps applied to sorted values for the 'nearly-sorted' shape"""
+    return max(1, size // 20) if size > 1 else 0
+
+
+def _value_range(shape, size):
+    if shape == 'duplicates':
+        return 1, max(2, size // 8)
+    return 1, size * 10
+
+
+def _numpy_array_input(shape, size, seed_text):
+    """Array input built with vectorized NumPy operations"""
+    # NumPy generators want an integer seed
+    seed = int.from_bytes(hashlib.sha256(seed_text.encode('utf-8')).digest()[:8], 'big')
+    rng = numpy.random.default_rng(seed)
+    low, high = _value_range(shape, size)
+    values = rng.integers(low, high, size=size, endpoint=True)
+
+    if shape in ('sorted', 'nearly-sorted'):
+        values.sort()
+    elif shape == 'reversed':
+        values = numpy.sort(values)[::-1]
+
+    swaps = nearly_sorted_swaps(size) if shape == 'nearly-sorted' else 0
+    if swaps:
+        positions = rng.choice(size, size=2 * swaps, replace=False)
+        first, second = positions[:swaps], positions[swaps:]
+        values[first], values[second] = values[second], values[first]
+    return values.tolist()
+
+
+def _array_input(shape, size, seed_text):
+    """Array input built with the random module"""
+    rng = random.Random(seed_text)
+    low, high = _value_range(shape, size)
+    values = [rng.randint(low, high) for _ in range(size)]
+
+    if shape in ('sorted', 'nearly-sorted'):
+        values.sort()
+    elif shape == 'reversed':
+        values.sort(reverse=True)
+
+    swaps = nearly_sorted_swaps(size) if shape == 'nearly-sorted' else 0
+    if swaps:
+        positions = rng.sample(range(size), 2 * swaps)
+        for i, j in zip(positions[:swaps], positions[swaps:]):
+            values[i], values[j] = values[j], values[i]
+    return values
+
+
+def make_input(algorithm_name, shape, size, seed=0):
+    """Build a deterministic input of the given shape and size"""
+    seed_text = f'{algorithm_name}:{shape}:{size}:{seed}'
+
+    if shape in GRAPH_SHAPES:
+        rng = random.Random(seed_text)
+        weighted = GRAPH_ALGORITHMS[algorithm_name]
+        degree = graph_degree(shape, size)
+        graph = {}
+        for node in range(size):
+            # A chain keeps every node reachable; the rest of the edges are random
+            targets = {node + 1} if node + 1 < size else set()
+            while len(targets) < min(degree, size - 1):
+                target = rng.randrange(size)
+                if target != node:
+                    targets.add(target)
+            if weighted:
+                graph[node] = {target: rng.randint(1, 20) for target in sorted(targets)}
+            else:
+                graph[node] = sorted(targets)
+        return {'graph': graph, 'start': 0}
+
+    if numpy is not None:
+        return _numpy_array_input(shape, size, seed_text)
+    return _array_input(shape, size, seed_text)
+
+
+def run_case(algorithm_name, input_data, repeat=3):
+    """Measure one algorithm on one input"""
+    wall_time = None
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        steps = execute_algorithm_steps(algorithm_name, input_data)
+        elapsed = time.perf_counter() - started
+        wall_time = elapsed if wall_time is None else min(wall_time, elapsed)
+
+    # Measured in a separate run, since tracing allocations slows execution down
+    tracemalloc.start()
+    try:
+        execute_algorithm_steps(algorithm_name, input_data)
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    result = {
+        'wall_time': wall_time,
+        'peak_memory': peak_memory,
+        'step_count': len(steps),
+        'json_bytes': len(json.dumps(steps).encode('utf-8')),
+    }
+    result.update(measure_wire(steps, repeat))
+    return result
+
+
+def _best_time(function, repeat):
+    best = None
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        output = function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, output
+
+
+def measure_wire(steps, repeat=3):
+    """Render time with the default and fast renderers, and compressed sizes"""
+    payload = {'steps': steps}
+    render_time, _ = _best_time(lambda: JSONRenderer().render(payload), repeat)
+    fast_render_time, body = _best_time(lambda: FastJSONRenderer().render(payload), repeat)
+    return {
+        'render_time': render_time,
+        'fast_render_time': fast_render_time,
+        'gzip_bytes': len(compress_string(body)),
+        'brotli_bytes': len(compress(body, 'br')) if brotli is not None else None,
+    }
+
+
+def run_benchmarks(algorithms=None, sizes=DEFAULT_SIZES, shapes=None, repeat=3, seed=0, progress=None):
+    """
+    Run the benchmark grid and return a list of result dicts.
+    ``progress`` is called with each result as it completes.
+    """
+    results = []
+    for algorithm_name in algorithms or benchmark_algorithms():
+        if algorithm_name not in ALGORITHM_FUNCTIONS:
+            raise ValueError(f"Algorithm '{algorithm_name}' not found")
+
+        for shape in shapes_for(algorithm_name):
+            if shapes and shape not in shapes:
+                continue
+            for size in sizes:
+                input_data = make_input(algorithm_name, shape, size, seed)
+                result = {'algorithm': algorithm_name, 'shape': shape, 'size': size}
+                result.update(run_case(algorithm_name, input_data, repeat))
+                results.append(result)
+                if progress is not None:
+                    progress(result)
+    return results
+
+
+def save_results(results, path):
+    """Write results to a JSON baseline file"""
+    report = {
+        'engine_version': ENGINE_VERSION,
+        'generator': INPUT_GENERATOR,
+        'python': platform.python_version(),
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results,
+    }
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+
+def load_results(path):
+    """Read the results from a JSON baseline file"""
+    with open(path) as f:
+        return json.load(f)['results']
+
+
+def load_generator(path):
+    """The input generator a baseline file was made with"""
+    with open(path) as f:
+        # Baselines from before NumPy support were all made with the random module
+        return json.load(f).get('generator', 'random')
+
+
+def compare_results(baseline, current, threshold=DEFAULT_THRESHOLD, time_threshold=DEFAULT_TIME_THRESHOLD):
+    """
+    Compare two result lists case by case.
+    Returns a list of regressions, one per metric that grew by more than the
+    allowed fraction; cases missing from either run are ignored.
+    """
+    baseline_cases = {(r['algorithm'], r['shape'], r['size']): r for r in baseline}
+    regressions = []
+
+    for result in current:
+        case = (result['algorithm'], result['shape'], result['size'])
+        previous = baseline_cases.get(case)
+        if previous is None:
+            continue
+
+        for metric in METRICS:
+            allowed = time_threshold if metric == 'wall_time' else threshold
+            before, after = previous.get(metric), result[metric]
+            if before and after > before * (1 + allowed):
+                regressions.append({
+                    'algorithm': case[0],
+                    'shape': case[1],
+                    'size': case[2],
+                    'metric': metric,
+                    'baseline': before,
+                    'current': after,
+                    'change': after / before - 1,
+                })
+    return regressions
@@ -0,0 +1,104 @@
+"""
+Cached algorithm and data structure catalogue
+
+The dashboard lists every Algorithm and DataStructure grouped by category.
+The grouped lists are built from only the columns the page shows and cached;
+a catalogue version number, bumped by the model signals in signals.py, is part
+of every dependent cache key (the dashboard fragment cache included), so a
+single bump invalidates them all. The version and the time of the last bump
+also drive the ETag and Last-Modified headers of the catalogue API.
+
+The version is kept in the database (CatalogueVersion) rather than in the
+cache: CATALOGUE_CACHE_ALIAS is usually a per-process LocMemCache, and a
+change made by another process (a server worker, the shell or
+load_initial_data) must still invalidate what every process has cached.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Algorithm, CatalogueVersion, DataStructure
+
+CATALOGUE_VERSION_ID = 1
+CATALOGUE_KEY = 'catalogue:grouped:{version}'
+DEFAULT_CATALOGUE_CACHE_TIMEOUT = 60 * 60
+
+
+def get_catalogue_cache():
+    return caches[getattr(settings, 'CATALOGUE_CACHE_ALIAS', 'default')]
+
+
+def get_catalogue_state():
+    """(version, modified_at) of the catalogue, starting at version 1"""
+    state = CatalogueVersion.objects.filter(pk=CATALOGUE_VERSION_ID).values_list('version', 'modified_at').first()
+    if state is None:
+        row, _ = CatalogueVersion.objects.get_or_create(pk=CATALOGUE_VERSION_ID)
+        state = (row.version, row.modified_at)
+    return state
+
+
+def get_catalogue_version():
+    """Current catalogue version"""
+    return get_catalogue_state()[0]
+
+
+def bump_catalogue_version():
+    """Invalidate everything cached against the current catalogue"""
+    now = timezone.now()
+    bumped = CatalogueVersion.objects.filter(pk=CATALOGUE_VERSION_ID).update(version=F('version') + 1, modified_at=now)
+    if not bumped:
+        # No version handed out yet; anything but 1 differs from a version created concurrently
+        CatalogueVersion.objects.get_or_create(pk=CATALOGUE_VERSION_ID, defaults={'version': 2, 'modified_at': now})
+
+
+def _request_catalogue_state(request):
+    """The catalogue state, read once per request for both validators"""
+    state = getattr(request, '_catalogue_state', None)
+    if state is None:
+        state = request._catalogue_state = get_catalogue_state()
+    return state
+
+
+def catalogue_etag(request, *args, **kwargs):
+    """ETag for a catalogue API response: the catalogue version plus the representation asked for"""
+    version, _ = _request_catalogue_state(request)
+    representation = f"{version}|{request.get_full_path()}|{request.META.get('HTTP_ACCEPT', '')}"
+    return hashlib.md5(representation.encode('utf-8')).hexdigest()
+
+
+def catalogue_last_modified(request, *args, **kwargs):
+    _, modified_at = _request_catalogue_state(request)
+    return modified_at.replace(microsecond=0)
+
+
+def _group_by_category(rows):
+    groups = {}
+    for row in rows:
+        groups.setdefault(row['category'], []).append({'id': row['id'], 'name': row['name']})
+    return groups
+
+
+def get_grouped_catalogue(version=None):
+    """
+    Return {'algorithm_categories': ..., 'data_structure_categories': ...},
+    each mapping a category to a list of {'id', 'name'} entries.
+    ``version`` saves a lookup when the caller already has the current version.
+    """
+    cache = get_catalogue_cache()
+    key = CATALOGUE_KEY.format(version=version or get_catalogue_version())
+
+    catalogue = cache.get(key)
+    if catalogue is None:
+        algorithms = Algorithm.objects.order_by('category', 'name').values('id', 'name', 'category')
+        data_structures = DataStructure.objects.order_by('category', 'name').values('id', 'name', 'category')
+        catalogue = {
+            'algorithm_categories': _group_by_category(algorithms),
+            'data_structure_categories': _group_by_category(data_structures),
+        }
+        cache.set(key, catalogue, getattr(settings, 'CATALOGUE_CACHE_TIMEOUT', DEFAULT_CATALOGUE_CACHE_TIMEOUT))
+
+    return catalogue
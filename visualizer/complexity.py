@@ -0,0 +1,160 @@
+"""
+Empirical complexity curves for AlgoViz3D algorithms
+
+measure_complexity runs the operation-count version of an algorithm (no trace
+is built) over a geometric series of generated inputs and fits the counts to
+the usual complexity classes, so the measured scaling can be shown next to the
+declared Algorithm.time_complexity. Sizes double from COMPLEXITY_MIN_SIZE until
+the cost model predicts more than COMPLEXITY_MAX_STEPS steps for one run or the
+input would hold more than COMPLEXITY_MAX_INPUT_SIZE values. The cost model
+cannot predict every run time exactly, so the series also ends after a run that
+takes longer than COMPLEXITY_MAX_RUN_SECONDS.
+
+Inputs are generated from a fixed seed, so a curve only depends on the
+algorithm, the input shape, the engine version and the input generator (see
+benchmarks.INPUT_GENERATOR); get_complexity_curve keeps one curve per algorithm
+and shape in the COMPLEXITY_CACHE_ALIAS cache until the engine changes.
+"""
+
+import math
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .algorithm_engine import ENGINE_VERSION, count_algorithm_operations
+from .benchmarks import INPUT_GENERATOR, input_elements, make_input
+from .cost_model import estimate_trace_cost
+from .executor import executor
+from .metrics import span
+from .digests import canonical_digest
+
+DEFAULT_COMPLEXITY_MIN_SIZE = 16
+DEFAULT_COMPLEXITY_MAX_STEPS = 5000000
+DEFAULT_COMPLEXITY_MAX_INPUT_SIZE = 262144
+DEFAULT_COMPLEXITY_MAX_RUN_SECONDS = 1.0
+DEFAULT_COMPLEXITY_CACHE_ALIAS = 'default'
+# Every curve is measured on the same inputs, so clients cannot force fresh measurements
+CURVE_SEED = 0
+# Bump whenever operation counting changes without a new engine version, so cached curves are remeasured
+CURVE_VERSION = 2
+# Fewer points than this cannot tell the classes apart
+MIN_CURVE_POINTS = 3
+COUNT_METRICS = ('steps', 'comparisons', 'swaps', 'writes', 'accesses')
+
+
+def _log2(n):
+    return math.log2(n) if n > 1 else 1
+
+
+# Simplest first, so that ties go to the simpler class
+COMPLEXITY_CLASSES = (
+    ('O(1)', lambda n: 1),
+    ('O(log n)', _log2),
+    ('O(n)', lambda n: n),
+    ('O(n log n)', lambda n: n * _log2(n)),
+    ('O(n²)', lambda n: n * n),
+    ('O(n³)', lambda n: n * n * n),
+)
+
+
+def _curve_limits():
+    return (
+        getattr(settings, 'COMPLEXITY_MIN_SIZE', DEFAULT_COMPLEXITY_MIN_SIZE),
+        getattr(settings, 'COMPLEXITY_MAX_STEPS', DEFAULT_COMPLEXITY_MAX_STEPS),
+        getattr(settings, 'COMPLEXITY_MAX_INPUT_SIZE', DEFAULT_COMPLEXITY_MAX_INPUT_SIZE),
+        getattr(settings, 'COMPLEXITY_MAX_RUN_SECONDS', DEFAULT_COMPLEXITY_MAX_RUN_SECONDS),
+    )
+
+
+def iter_curve_inputs(algorithm_name, shape):
+    """(size, input_data) for each size of the series that fits the limits"""
+    min_size, max_steps, max_input_size, _ = _curve_limits()
+    size = min_size
+    while input_elements(shape, size) <= max_input_size:
+        input_data = make_input(algorithm_name, shape, size, CURVE_SEED)
+        if estimate_trace_cost(algorithm_name, input_data)['steps'] > max_steps:
+            break
+        yield size, input_data
+        size *= 2
+
+
+def fit_complexity(sizes, counts):
+    """
+    Fit counts ~ c * f(n) for every complexity class f, best fit first.
+    c minimises the squared relative error, so small and large sizes weigh
+    the same; each fit has the class, c and the root mean square of the
+    relative error.
+    """
+    fits = []
+    for name, function in COMPLEXITY_CLASSES:
+        # Dividing both sides by the count turns relative error into plain least squares
+        basis = [function(size) / max(count, 1) for size, count in zip(sizes, counts)]
+        targets = [count / max(count, 1) for count in counts]
+        coefficient = sum(b * t for b, t in zip(basis, targets)) / sum(b * b for b in basis)
+        error = math.sqrt(sum((coefficient * b - t) ** 2 for b, t in zip(basis, targets)) / len(basis))
+        fits.append({'class': name, 'coefficient': coefficient, 'error': error})
+    fits.sort(key=lambda fit: fit['error'])
+    return fits
+
+
+def measure_complexity(algorithm_name, shape):
+    """
+    Count the operations of ``algorithm_name`` on inputs of a geometric
+    series of sizes and fit each count to the complexity classes.
+    The runs go through the trace worker pool, one job per size; the series
+    is cut short (and marked truncated) at a size that exhausts the stack.
+    """
+    max_run_seconds = getattr(settings, 'COMPLEXITY_MAX_RUN_SECONDS', DEFAULT_COMPLEXITY_MAX_RUN_SECONDS)
+    points = []
+    truncated = False
+    for size, input_data in iter_curve_inputs(algorithm_name, shape):
+        try:
+            counts, _, wall_time = executor.run(count_algorithm_operations, algorithm_name, input_data)
+        except RecursionError:
+            # Recursive algorithms on ordered input can run out of stack within the step budget
+            truncated = True
+            break
+        points.append({'size': size, 'counts': counts, 'wallTime': wall_time})
+        if wall_time > max_run_seconds:
+            break
+
+    fits = {}
+    if len(points) >= MIN_CURVE_POINTS:
+        sizes = [point['size'] for point in points]
+        for metric in COUNT_METRICS:
+            fits[metric] = fit_complexity(sizes, [point['counts'][metric] for point in points])
+
+    return {
+        'shape': shape,
+        'generator': INPUT_GENERATOR,
+        'engineVersion': ENGINE_VERSION,
+        'points': points,
+        'truncated': truncated,
+        'complexity': fits['steps'][0]['class'] if fits else None,
+        'fits': fits,
+    }
+
+
+def get_complexity_cache():
+    return caches[getattr(settings, 'COMPLEXITY_CACHE_ALIAS', DEFAULT_COMPLEXITY_CACHE_ALIAS)]
+
+
+def complexity_cache_key(algorithm_name, shape):
+    digest = canonical_digest([algorithm_name, ENGINE_VERSION, CURVE_VERSION, INPUT_GENERATOR, shape])
+    return f'complexity:{digest}'
+
+
+def get_complexity_curve(algorithm_name, shape):
+    """Return (curve, cache_hit) for measure_complexity, cached until the engine changes"""
+    cache = get_complexity_cache()
+    key = complexity_cache_key(algorithm_name, shape)
+
+    curve = cache.get(key)
+    if curve is not None:
+        return curve, True
+
+    with span(algorithm_name, 'complexity'):
+        curve = measure_complexity(algorithm_name, shape)
+    # The key carries the engine version, so the curve never goes stale
+    cache.set(key, curve, None)
+    return curve, False
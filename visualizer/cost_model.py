@@ -0,0 +1,243 @@
+"""
+Trace cost model for AlgoViz3D
+
+Predicts how many steps an algorithm will produce for an input and roughly how
+large the serialized trace will be, without running it. The view layer uses
+these estimates to reject or downgrade requests that would exceed the budgets
+in settings before any work is done.
+
+Step counts are worst-case for the input size, except where the input shape
+decides the complexity class (already-ordered input for Quick Sort and BST
+Insertion), in which case the input is inspected. Byte estimates are
+calibrated against ``benchmark_engine`` output.
+"""
+
+import json
+import math
+
+from django.conf import settings
+
+from .trace_encoding import DEFAULT_KEYFRAME_INTERVAL
+
+# Serialized size of a step without its state and per-step copies
+STEP_OVERHEAD_BYTES = 200
+# Extra bytes per step for inline description and educational text
+INLINE_MESSAGE_BYTES = 120
+# Serialized size of a typical delta ({'swap': [i, j]} or a short 'set')
+DELTA_BYTES = 30
+
+DEFAULT_MAX_STEPS = 250000
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_WORK = 20000000
+
+
+def _log2(n):
+    return math.log2(n) if n > 1 else 1
+
+
+def _array_values(input_data):
+    """The array an array algorithm will run on"""
+    if isinstance(input_data, dict):
+        return input_data.get('array', [])
+    return input_data
+
+
+def _element_bytes(values):
+    """Average serialized width of an array element, including the separator"""
+    sample = values[:100]
+    if not sample:
+        return 1
+    return len(json.dumps(sample)) / len(sample)
+
+
+def _is_presorted(values):
+    """True if the values are (almost) in ascending or descending order"""
+    sample = values[:1000]
+    if len(sample) < 3:
+        return True
+    ascending = sum(1 for a, b in zip(sample, sample[1:]) if a <= b)
+    ratio = ascending / (len(sample) - 1)
+    return ratio > 0.9 or ratio < 0.1
+
+
+def _graph_size(input_data):
+    """(node count, edge count) of a graph input"""
+    if isinstance(input_data, dict):
+        graph = input_data.get('graph', {})
+        nodes = set(graph)
+        edges = 0
+        for neighbors in graph.values():
+            nodes.update(neighbors)
+            edges += len(neighbors)
+        return len(nodes), edges
+    # A plain list is traced as a chain
+    return len(input_data), max(0, len(input_data) - 1)
+
+
+def _index_bytes(n):
+    """Serialized width of an index into an array of n elements, including the separator"""
+    return len(str(max(n - 1, 0))) + 1
+
+
+def _array_model(steps, indices=0):
+    """
+    Cost model for an algorithm whose state is the array itself.
+    ``indices`` is the average share of the array's indices copied into
+    every step (sorted_indices lists), which delta encoding does not shrink.
+    """
+    def model(input_data):
+        values = _array_values(input_data)
+        n = len(values)
+        return {
+            'size': n,
+            'steps': int(steps(n, values)),
+            'array_bytes': n * _element_bytes(values),
+            'step_bytes': indices * n * _index_bytes(n),
+        }
+    return model
+
+
+def _tree_model(steps):
+    """Cost model for the BST algorithms, whose state is a nested tree"""
+    def model(input_data):
+        n = len(input_data)
+        return {
+            'size': n,
+            'steps': int(steps(n, input_data)),
+            'array_bytes': 0,
+            'step_bytes': n * (_element_bytes(input_data) + 4),
+        }
+    return model
+
+
+def _graph_model(steps, step_bytes, final_bytes=lambda v, e: 0):
+    """Cost model for a graph algorithm; steps and per-step copies depend on V and E"""
+    def model(input_data):
+        v, e = _graph_size(input_data)
+        return {
+            'size': v,
+            'steps': int(steps(v, e)),
+            'array_bytes': 0,
+            'step_bytes': step_bytes(v, e),
+            'fixed_bytes': 12 * (v + e) + final_bytes(v, e),
+        }
+    return model
+
+
+def _quadratic_if_presorted(n, values):
+    return n * n + 4 * n if _is_presorted(values) else 2.5 * n * _log2(n) + 4 * n
+
+
+COST_MODELS = {
+    # The sorted part, a third of the array on average, is listed in every step
+    'Bubble Sort': _array_model(lambda n, values: n * n + 2 * n + 2, indices=1 / 3),
+    'Selection Sort': _array_model(lambda n, values: 0.8 * n * n + 2 * n + 2, indices=1 / 3),
+    'Insertion Sort': _array_model(lambda n, values: n * n + 3 * n + 2, indices=1 / 3),
+    'Merge Sort': _array_model(lambda n, values: 2.5 * n * _log2(n) + 2 * n + 2),
+    'Quick Sort': _array_model(_quadratic_if_presorted),
+    'Linear Search': _array_model(lambda n, values: n + 3),
+    'Binary Search': _array_model(lambda n, values: 3 * _log2(n) + 4),
+    'BST Insertion': _tree_model(_quadratic_if_presorted),
+    'BST Traversal': _tree_model(lambda n, values: 6 * n + 8),
+    # visited and queue/stack copies make BFS and DFS steps grow with the graph
+    'Breadth-First Search': _graph_model(lambda v, e: v + e + 3, lambda v, e: 6 * v),
+    'Depth-First Search': _graph_model(lambda v, e: v + e + 3, lambda v, e: 6 * v + 2 * e),
+    'Dijkstra\'s Algorithm': _graph_model(
+        lambda v, e: v + 2 * e + 4,
+        lambda v, e: 50,
+        # Final distances, predecessors and (on small graphs) full paths
+        lambda v, e: 30 * v + (4 * v * v if v <= 1000 else 0),
+    ),
+}
+COST_MODELS['Breadth First Search'] = COST_MODELS['Breadth-First Search']
+
+
+def _detail_steps(steps, size, detail):
+    """
+    Upper bound on the steps kept from a full trace of ``steps`` at a level
+    of detail. Pass boundaries are at most linear in the input size, and
+    comparisons and other inspections make up at least half of every
+    full trace, so state changes are at most the other half.
+    """
+    if isinstance(detail, int):
+        return min(steps, detail)
+    if detail == 'pass-level':
+        return min(steps, 4 * size + 8)
+    if detail == 'swaps-only':
+        return min(steps, steps // 2 + 4 * size + 8)
+    return steps
+
+
+def estimate_trace_cost(algorithm_name, input_data, messages='inline', trace_format='full', detail='full'):
+    """
+    Estimate the step count and serialized size of a trace.
+    Returns a dict with 'size', 'steps', 'bytes' and 'work'. 'steps' and
+    'bytes' describe the trace sent at the requested level of detail;
+    'work' is the step count of the full trace, which the engine walks
+    through whatever the detail (it only skips building the dropped steps).
+    """
+    model = COST_MODELS.get(algorithm_name)
+    if model is None:
+        raise ValueError(f"Algorithm '{algorithm_name}' not found")
+
+    cost = model(input_data)
+    work = cost['steps']
+    cost['steps'] = _detail_steps(work, cost['size'], detail)
+    per_step = STEP_OVERHEAD_BYTES + cost['step_bytes']
+    if messages == 'inline':
+        per_step += INLINE_MESSAGE_BYTES
+
+    # Delta traces only carry the array on keyframes
+    if trace_format == 'delta' and cost['array_bytes']:
+        keyframe_interval = getattr(settings, 'TRACE_KEYFRAME_INTERVAL', DEFAULT_KEYFRAME_INTERVAL)
+        per_step += DELTA_BYTES + cost['array_bytes'] / keyframe_interval
+    else:
+        per_step += cost['array_bytes']
+
+    return {
+        'size': cost['size'],
+        'steps': cost['steps'],
+        'bytes': int(cost['steps'] * per_step + cost.get('fixed_bytes', 0)),
+        'work': work,
+    }
+
+
+def get_trace_budget(algorithm_name):
+    """(max steps, max bytes) allowed for one trace of the algorithm"""
+    overrides = getattr(settings, 'TRACE_BUDGET_OVERRIDES', {}).get(algorithm_name, {})
+    return (
+        overrides.get('max_steps', getattr(settings, 'TRACE_MAX_STEPS', DEFAULT_MAX_STEPS)),
+        overrides.get('max_bytes', getattr(settings, 'TRACE_MAX_BYTES', DEFAULT_MAX_BYTES)),
+    )
+
+
+def get_work_budget(algorithm_name):
+    """Most steps of the full trace one run may walk through, built or not"""
+    overrides = getattr(settings, 'TRACE_BUDGET_OVERRIDES', {}).get(algorithm_name, {})
+    return overrides.get('max_work', getattr(settings, 'TRACE_MAX_WORK', DEFAULT_MAX_WORK))
+
+
+def plan_trace(algorithm_name, input_data, messages='inline', trace_format='full', detail='full'):
+    """
+    Decide how to serve a trace within budget.
+    Returns (trace_format, estimate, within_budget): full traces that only
+    fit once delta-encoded are downgraded to 'delta'; traces that still do
+    not fit are reported as over budget. The step and byte budgets bound the
+    trace actually built and sent; the work budget bounds the full trace the
+    engine walks through, which is far larger as a dropped step only costs
+    a call to the detail filter.
+    """
+    max_steps, max_bytes = get_trace_budget(algorithm_name)
+    estimate = estimate_trace_cost(algorithm_name, input_data, messages, trace_format, detail)
+
+    if estimate['bytes'] > max_bytes and trace_format == 'full':
+        delta_estimate = estimate_trace_cost(algorithm_name, input_data, messages, 'delta', detail)
+        if delta_estimate['bytes'] < estimate['bytes']:
+            trace_format, estimate = 'delta', delta_estimate
+
+    within_budget = (
+        estimate['steps'] <= max_steps
+        and estimate['bytes'] <= max_bytes
+        and estimate['work'] <= get_work_budget(algorithm_name)
+    )
+    return trace_format, estimate, within_budget
@@ -0,0 +1,10 @@
+"""Content hashing shared by the trace cache, trace blobs and curve caches"""
+
+import hashlib
+import json
+
+
+def canonical_digest(value):
+    """SHA-256 hex digest of the canonical JSON encoding of ``value``"""
+    encoded = json.dumps(value, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
@@ -0,0 +1,306 @@
+"""
+Process-pool execution of algorithm traces
+
+Trace generation is CPU-bound and cannot be interrupted from the request
+thread, so when TRACE_EXECUTOR_WORKERS is set it runs in a bounded pool of
+worker processes instead. Each job gets a CPU-time limit (RLIMIT_CPU, raised as
+a clean error inside the worker), each worker an address-space limit, and the
+caller waits at most TRACE_EXECUTOR_TIMEOUT seconds from the moment its job
+reaches a worker (time spent waiting for a free worker does not count). A job
+that overruns the timeout cannot be cancelled, so its worker process is killed
+and replaced; jobs running in the other workers are unaffected. Workers are
+recycled after TRACE_EXECUTOR_MAX_TASKS_PER_CHILD jobs so memory fragmentation
+from large traces does not accumulate.
+
+ProcessPoolExecutor is not used because losing one of its processes breaks the
+whole pool, failing every job in flight.
+"""
+
+import asyncio
+import atexit
+import logging
+import math
+import multiprocessing
+import signal
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .algorithm_engine import iter_algorithm_steps
+from .trace_encoding import DEFAULT_KEYFRAME_INTERVAL, iter_delta_steps
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; limits are skipped there
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 2
+DEFAULT_TIMEOUT = 30
+DEFAULT_CPU_LIMIT = 20
+DEFAULT_MEMORY_LIMIT = 1024 * 1024 * 1024
+DEFAULT_MAX_TASKS_PER_CHILD = 50
+
+
+class TraceExecutionError(Exception):
+    """A trace job failed in the worker pool"""
+
+
+class TraceTimeoutError(TraceExecutionError):
+    """A trace job ran past its CPU or wall-clock limit"""
+
+
+class _CPULimitExceeded(Exception):
+    pass
+
+
+def _raise_cpu_limit_exceeded(signum, frame):
+    raise _CPULimitExceeded()
+
+
+def _init_worker(memory_limit):
+    """Install the CPU-limit handler and memory limit in a new worker process"""
+    if hasattr(signal, 'SIGXCPU'):
+        signal.signal(signal.SIGXCPU, _raise_cpu_limit_exceeded)
+    if resource is not None and memory_limit:
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, hard))
+
+
+def _call_with_limits(cpu_limit, fn, args, kwargs):
+    """Run one job in a worker under a CPU-time limit"""
+    limited = resource is not None and hasattr(signal, 'SIGXCPU') and cpu_limit
+    if limited:
+        # RLIMIT_CPU counts the whole process, so the limit is relative to the CPU already used
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+        soft = math.ceil(usage.ru_utime + usage.ru_stime + cpu_limit)
+        if hard != resource.RLIM_INFINITY:
+            soft = min(soft, hard)
+        resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+    try:
+        return fn(*args, **kwargs)
+    except _CPULimitExceeded:
+        raise TraceTimeoutError(f'Trace generation exceeded its CPU limit of {cpu_limit}s')
+    except MemoryError:
+        raise TraceExecutionError('Trace generation exceeded its memory limit')
+    finally:
+        if limited:
+            resource.setrlimit(resource.RLIMIT_CPU, (hard, hard))
+
+
+def _serve_jobs(connection, memory_limit):
+    """Worker process main loop: run jobs from ``connection`` until it is closed"""
+    _init_worker(memory_limit)
+    while True:
+        try:
+            job = connection.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+
+        cpu_limit, fn, args, kwargs = job
+        try:
+            reply = (True, _call_with_limits(cpu_limit, fn, args, kwargs))
+        except Exception as e:
+            reply = (False, e)
+        try:
+            connection.send(reply)
+        except Exception as e:
+            # The result or the exception cannot be pickled
+            connection.send((False, TraceExecutionError(f'Trace job returned an unusable result: {e}')))
+
+
+class _Worker:
+    """A worker process and the pipe its jobs and results go through"""
+
+    def __init__(self, context, memory_limit):
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(target=_serve_jobs, args=(child_connection, memory_limit), daemon=True)
+        self.process.start()
+        child_connection.close()
+        self.jobs = 0
+
+    def submit(self, cpu_limit, fn, args, kwargs):
+        self.jobs += 1
+        self.connection.send((cpu_limit, fn, args, kwargs))
+
+    def result(self):
+        """The reply to the submitted job; raises EOFError if the process died"""
+        succeeded, value = self.connection.recv()
+        if not succeeded:
+            raise value
+        return value
+
+    def stop(self):
+        try:
+            self.connection.send(None)
+        except OSError:
+            pass
+        self.connection.close()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+
+class TraceExecutor:
+    """
+    Bounded set of worker processes, started as needed, each running one job
+    at a time. A worker whose job overruns is killed and replaced on demand.
+    """
+
+    def __init__(self):
+        self._idle = []
+        self._workers = 0
+        self._generation = 0
+        self._condition = threading.Condition()
+
+    def run(self, fn, *args, **kwargs):
+        """
+        Run ``fn(*args, **kwargs)`` in a worker and return its result.
+        Runs inline when TRACE_EXECUTOR_WORKERS is 0.
+        """
+        if not getattr(settings, 'TRACE_EXECUTOR_WORKERS', DEFAULT_WORKERS):
+            return fn(*args, **kwargs)
+
+        timeout = getattr(settings, 'TRACE_EXECUTOR_TIMEOUT', DEFAULT_TIMEOUT)
+        worker, generation = self._acquire()
+        reusable = False
+        try:
+            self._submit(worker, fn, args, kwargs)
+            # The timeout starts now the job has a worker of its own
+            if not worker.connection.poll(timeout):
+                self._timed_out(worker, timeout)
+            reusable = True
+            return worker.result()
+        except (EOFError, OSError):
+            raise TraceExecutionError('Trace worker exited unexpectedly')
+        finally:
+            self._release(worker, generation, reusable)
+
+    async def arun(self, fn, *args, **kwargs):
+        """
+        Awaitable variant of run() for async views.
+        The event loop watches the worker's pipe while the job runs, so a slow
+        job does not hold a thread; only waiting for a free worker and reading
+        the result are done in a thread.
+        """
+        if not getattr(settings, 'TRACE_EXECUTOR_WORKERS', DEFAULT_WORKERS):
+            return await sync_to_async(fn, thread_sensitive=False)(*args, **kwargs)
+
+        timeout = getattr(settings, 'TRACE_EXECUTOR_TIMEOUT', DEFAULT_TIMEOUT)
+        worker, generation = await sync_to_async(self._acquire, thread_sensitive=False)()
+        reusable = False
+        try:
+            self._submit(worker, fn, args, kwargs)
+            try:
+                await asyncio.wait_for(_readable(worker.connection), timeout)
+            except asyncio.TimeoutError:
+                self._timed_out(worker, timeout)
+            reusable = True
+            return await sync_to_async(worker.result, thread_sensitive=False)()
+        except (EOFError, OSError):
+            raise TraceExecutionError('Trace worker exited unexpectedly')
+        finally:
+            self._release(worker, generation, reusable)
+
+    def shutdown(self):
+        """Stop the idle workers; busy ones stop when their job finishes"""
+        with self._condition:
+            idle, self._idle = self._idle, []
+            # Busy workers are from the old generation and are not counted again
+            self._workers = 0
+            self._generation += 1
+            self._condition.notify_all()
+        for worker in idle:
+            worker.stop()
+
+    def _submit(self, worker, fn, args, kwargs):
+        worker.submit(getattr(settings, 'TRACE_EXECUTOR_CPU_LIMIT', DEFAULT_CPU_LIMIT), fn, args, kwargs)
+
+    def _timed_out(self, worker, timeout):
+        # A running job cannot be cancelled, so its worker (and only that worker) is killed
+        logger.warning(f'Trace job exceeded {timeout}s, killing its worker process')
+        worker.kill()
+        raise TraceTimeoutError(f'Trace generation timed out after {timeout}s')
+
+    def _acquire(self):
+        """An idle worker, or a new one if there are fewer than TRACE_EXECUTOR_WORKERS"""
+        with self._condition:
+            while True:
+                if self._idle:
+                    return self._idle.pop(), self._generation
+                if self._workers < getattr(settings, 'TRACE_EXECUTOR_WORKERS', DEFAULT_WORKERS):
+                    self._workers += 1
+                    generation = self._generation
+                    break
+                self._condition.wait()
+
+        try:
+            # spawn rather than fork: forking a threaded server process is unsafe
+            return _Worker(
+                multiprocessing.get_context('spawn'),
+                getattr(settings, 'TRACE_EXECUTOR_MEMORY_LIMIT', DEFAULT_MEMORY_LIMIT),
+            ), generation
+        except Exception:
+            with self._condition:
+                self._workers -= 1
+                self._condition.notify()
+            raise
+
+    def _release(self, worker, generation, reusable):
+        """Return a worker to the idle list, or retire it if it is dead, used up or from before a shutdown"""
+        max_jobs = getattr(settings, 'TRACE_EXECUTOR_MAX_TASKS_PER_CHILD', DEFAULT_MAX_TASKS_PER_CHILD)
+        reusable = reusable and worker.process.is_alive() and worker.jobs < max_jobs
+        with self._condition:
+            if reusable and generation == self._generation:
+                self._idle.append(worker)
+            else:
+                reusable = False
+                if generation == self._generation:
+                    self._workers -= 1
+            self._condition.notify()
+        if not reusable and worker.process.is_alive():
+            worker.stop()
+
+
+async def _readable(connection):
+    """Wait until ``connection`` has data, or has been closed by the other end"""
+    loop = asyncio.get_running_loop()
+    ready = loop.create_future()
+    loop.add_reader(connection.fileno(), lambda: ready.done() or ready.set_result(None))
+    try:
+        await ready
+    finally:
+        loop.remove_reader(connection.fileno())
+
+
+executor = TraceExecutor()
+atexit.register(executor.shutdown)
+
+
+def generate_trace(algorithm_name, input_data, trace_format='full', keyframe_interval=DEFAULT_KEYFRAME_INTERVAL, **options):
+    """
+    The steps of execute_algorithm_steps in ``trace_format``. Delta traces
+    are encoded as the steps are generated, so the full trace is never held.
+    """
+    steps = iter_algorithm_steps(algorithm_name, input_data, **options)
+    if trace_format == 'delta':
+        steps = iter_delta_steps(steps, keyframe_interval)
+    return list(steps)
+
+
+def run_trace(algorithm_name, input_data, **options):
+    """Generate a trace through the worker pool, see generate_trace"""
+    return executor.run(generate_trace, algorithm_name, input_data, **options)
+
+
+async def arun_trace(algorithm_name, input_data, **options):
+    """Awaitable run_trace for async views"""
+    return await executor.arun(generate_trace, algorithm_name, input_data, **options)
@@ -0,0 +1,49 @@
+import json
+import zlib
+
+from django.db import models
+
+
+class CompressedJSONField(models.BinaryField):
+    """
+    Stores a JSON-serialisable value as zlib-compressed JSON bytes.
+    Values are compressed on save and decompressed when loaded, so the model
+    attribute behaves like a JSONField.
+    """
+    description = 'zlib-compressed JSON'
+
+    def __init__(self, *args, compression_level=6, **kwargs):
+        self.compression_level = compression_level
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.compression_level != 6:
+            kwargs['compression_level'] = self.compression_level
+        return name, path, args, kwargs
+
+    def compress(self, value):
+        encoded = json.dumps(value, separators=(',', ':')).encode('utf-8')
+        return zlib.compress(encoded, self.compression_level)
+
+    @staticmethod
+    def decompress(value):
+        return json.loads(zlib.decompress(bytes(value)))
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return None
+        return self.decompress(value)
+
+    def to_python(self, value):
+        if isinstance(value, (bytes, memoryview)):
+            return self.decompress(value)
+        return value
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        if value is None:
+            return None
+        return connection.Database.Binary(self.compress(value))
+
+    def value_to_string(self, obj):
+        return json.dumps(self.value_from_object(obj))
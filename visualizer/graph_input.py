@@ -0,0 +1,165 @@
+"""
+Graph input parsing for AlgoViz3D
+
+The graph algorithms take ``{'graph': adjacency, 'start': node}``. Clients may
+send the graph in one of three forms, all normalised to that shape here:
+
+    adjacency:  {'graph': {'0': [1, 2], '1': [2]}, 'start': 0}
+                {'graph': {'0': {'1': 4, '2': 1}}, 'start': 0}      # weighted
+    csr:        {'format': 'csr', 'offsets': [0, 2, 3, 3],
+                 'targets': [1, 2, 2], 'weights': [4, 1, 2], 'start': 0}
+    edges:      {'format': 'edges', 'edges': [[0, 1, 4], [0, 2, 1]],
+                 'directed': True, 'start': 0}
+
+JSON object keys are always strings, so numeric node names are converted back
+to integers. Invalid payloads raise ValueError with a client-facing message.
+"""
+
+GRAPH_FORMATS = ('adjacency', 'csr', 'edges')
+
+# Graph algorithms, mapped to whether they use edge weights
+GRAPH_ALGORITHMS = {
+    'Breadth-First Search': False,
+    'Breadth First Search': False,
+    'Depth-First Search': False,
+    'Dijkstra\'s Algorithm': True,
+}
+
+
+def is_graph_algorithm(algorithm_name):
+    """Return True if the algorithm takes a graph payload"""
+    return algorithm_name in GRAPH_ALGORITHMS
+
+
+def parse_graph_input(data, weighted=False):
+    """
+    Normalise a graph payload to {'graph': adjacency, 'start': node}.
+    Unweighted adjacency maps nodes to neighbor lists; weighted adjacency maps
+    nodes to {neighbor: weight} dicts.
+    """
+    if not isinstance(data, dict):
+        raise ValueError('Graph input must be an object')
+
+    graph_format = data.get('format', 'adjacency')
+    if graph_format == 'adjacency':
+        edges = _adjacency_edges(data.get('graph'))
+        nodes = [_node(node) for node in data['graph']]
+    elif graph_format == 'csr':
+        nodes, edges = _csr_edges(data)
+    elif graph_format == 'edges':
+        nodes, edges = _edge_list_edges(data)
+    else:
+        raise ValueError(f"Unknown graph format '{graph_format}'")
+
+    graph = {node: {} for node in nodes}
+    for source, target, weight in edges:
+        if weighted and weight < 0:
+            raise ValueError('Edge weights must not be negative')
+        graph.setdefault(source, {})[target] = weight
+        graph.setdefault(target, {})
+
+    if not graph:
+        raise ValueError('Graph must contain at least one node')
+
+    _check_node_types(graph)
+
+    start = data.get('start')
+    start = next(iter(graph)) if start is None else _node(start)
+    if start not in graph:
+        raise ValueError(f"Start node '{start}' is not in the graph")
+
+    if not weighted:
+        graph = {node: list(neighbors) for node, neighbors in graph.items()}
+
+    return {'graph': graph, 'start': start}
+
+
+def _node(value):
+    """Convert a node name to an int where it is numeric"""
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError('Node names must be integers or strings')
+    if isinstance(value, str) and value.lstrip('-').isdigit():
+        return int(value)
+    return value
+
+
+def _weight(value):
+    """Validate an edge weight"""
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value != value:
+        raise ValueError('Edge weights must be numbers')
+    return value
+
+
+def _adjacency_edges(adjacency):
+    """Yield (source, target, weight) from an adjacency mapping"""
+    if not isinstance(adjacency, dict):
+        raise ValueError('Adjacency graph must be an object mapping nodes to neighbors')
+
+    edges = []
+    for source, neighbors in adjacency.items():
+        source = _node(source)
+        if isinstance(neighbors, dict):
+            edges.extend((source, _node(target), _weight(weight)) for target, weight in neighbors.items())
+        elif isinstance(neighbors, list):
+            edges.extend((source, _node(target), 1) for target in neighbors)
+        else:
+            raise ValueError(f"Neighbors of node '{source}' must be a list or an object")
+    return edges
+
+
+def _csr_edges(data):
+    """Return (nodes, edges) from a compressed sparse row graph"""
+    offsets = data.get('offsets')
+    targets = data.get('targets')
+    weights = data.get('weights')
+
+    if not isinstance(offsets, list) or not isinstance(targets, list) or not offsets:
+        raise ValueError('CSR graphs require offsets and targets arrays')
+    if offsets[0] != 0 or offsets[-1] != len(targets):
+        raise ValueError('CSR offsets must start at 0 and end at the number of targets')
+    if any(not isinstance(offset, int) or offset < 0 for offset in offsets):
+        raise ValueError('CSR offsets must be non-negative integers')
+    if any(later < earlier for earlier, later in zip(offsets, offsets[1:])):
+        raise ValueError('CSR offsets must be non-decreasing')
+    if weights is not None and (not isinstance(weights, list) or len(weights) != len(targets)):
+        raise ValueError('CSR weights must have one entry per target')
+
+    node_count = len(offsets) - 1
+    nodes = list(range(node_count))
+
+    edges = []
+    for source in nodes:
+        for index in range(offsets[source], offsets[source + 1]):
+            target = targets[index]
+            if isinstance(target, bool) or not isinstance(target, int) or not 0 <= target < node_count:
+                raise ValueError(f'CSR target {target} is not a node index')
+            weight = _weight(weights[index]) if weights is not None else 1
+            edges.append((source, target, weight))
+    return nodes, edges
+
+
+def _edge_list_edges(data):
+    """Return (nodes, edges) from an edge list"""
+    edge_list = data.get('edges')
+    if not isinstance(edge_list, list):
+        raise ValueError('Edge-list graphs require an edges array')
+
+    directed = data.get('directed', True)
+    nodes = [_node(node) for node in data.get('nodes', [])]
+
+    edges = []
+    for edge in edge_list:
+        if not isinstance(edge, list) or len(edge) not in (2, 3):
+            raise ValueError('Each edge must be [source, target] or [source, target, weight]')
+        source, target = _node(edge[0]), _node(edge[1])
+        weight = _weight(edge[2]) if len(edge) == 3 else 1
+        edges.append((source, target, weight))
+        if not directed:
+            edges.append((target, source, weight))
+    return nodes, edges
+
+
+def _check_node_types(graph):
+    """Node names must all be integers or all strings so traces sort and hash consistently"""
+    if len({type(node) for node in graph}) > 1:
+        raise ValueError('Node names must be all integers or all strings')
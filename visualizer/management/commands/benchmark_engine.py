@@ -0,0 +1,95 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from visualizer.benchmarks import (
+    DEFAULT_SIZES, DEFAULT_THRESHOLD, DEFAULT_TIME_THRESHOLD, INPUT_GENERATOR,
+    compare_results, load_generator, load_results, run_benchmarks, save_results,
+)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark algorithm trace generation and compare against a saved baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--algorithm', action='append', dest='algorithms',
+                            help='Algorithm to benchmark (repeatable, default: all)')
+        parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                            help='Input sizes to run')
+        parser.add_argument('--shape', action='append', dest='shapes',
+                            help='Input shape to run (repeatable, default: all that apply)')
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='Timed runs per case; the fastest is reported')
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Seed for generated inputs')
+        parser.add_argument('--wire', action='store_true',
+                            help='Also report render time and compressed size of each trace')
+        parser.add_argument('--save', metavar='PATH',
+                            help='Write the results to a baseline file')
+        parser.add_argument('--compare', metavar='PATH',
+                            help='Compare the results against a baseline file')
+        parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                            help='Allowed growth in memory, steps and bytes before reporting a regression')
+        parser.add_argument('--time-threshold', type=float, default=DEFAULT_TIME_THRESHOLD,
+                            help='Allowed growth in wall time before reporting a regression')
+
+    def handle(self, *args, **options):
+        if options['compare']:
+            # Inputs made by another generator differ, so their cases cannot be compared
+            generator = load_generator(options['compare'])
+            if generator != INPUT_GENERATOR:
+                raise CommandError(
+                    f"{options['compare']} was made with the {generator} input generator, "
+                    f"this run uses {INPUT_GENERATOR}"
+                )
+
+        wire = options['wire']
+        header = (f"{'algorithm':<24} {'shape':<13} {'size':>6} {'time ms':>10} "
+                  f"{'peak KiB':>10} {'steps':>8} {'json KiB':>10}")
+        if wire:
+            header += f" {'render ms':>10} {'fast ms':>8} {'gzip KiB':>9} {'br KiB':>8} {'wire':>6}"
+        self.stdout.write(header)
+
+        def report(result):
+            line = (
+                f"{result['algorithm']:<24} {result['shape']:<13} {result['size']:>6} "
+                f"{result['wall_time'] * 1000:>10.2f} {result['peak_memory'] / 1024:>10.1f} "
+                f"{result['step_count']:>8} {result['json_bytes'] / 1024:>10.1f}"
+            )
+            if wire:
+                compressed = min(size for size in (result['gzip_bytes'], result['brotli_bytes']) if size is not None)
+                brotli_kib = f"{result['brotli_bytes'] / 1024:.1f}" if result['brotli_bytes'] is not None else '-'
+                line += (
+                    f" {result['render_time'] * 1000:>10.2f} {result['fast_render_time'] * 1000:>8.2f}"
+                    f" {result['gzip_bytes'] / 1024:>9.1f} {brotli_kib:>8} {compressed / result['json_bytes']:>6.1%}"
+                )
+            self.stdout.write(line)
+
+        try:
+            results = run_benchmarks(
+                algorithms=options['algorithms'],
+                sizes=options['sizes'],
+                shapes=options['shapes'],
+                repeat=options['repeat'],
+                seed=options['seed'],
+                progress=report,
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if options['save']:
+            save_results(results, options['save'])
+            self.stdout.write(self.style.SUCCESS(f"Saved {len(results)} results to {options['save']}"))
+
+        if options['compare']:
+            regressions = compare_results(
+                load_results(options['compare']), results,
+                threshold=options['threshold'], time_threshold=options['time_threshold'],
+            )
+            for regression in regressions:
+                self.stdout.write(self.style.WARNING(
+                    f"{regression['algorithm']} {regression['shape']} n={regression['size']}: "
+                    f"{regression['metric']} {regression['baseline']:.4g} -> {regression['current']:.4g} "
+                    f"({regression['change']:+.0%})"
+                ))
+            if regressions:
+                raise CommandError(f'{len(regressions)} regressions against {options["compare"]}')
+            self.stdout.write(self.style.SUCCESS(f"No regressions against {options['compare']}"))
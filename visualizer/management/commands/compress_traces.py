@@ -0,0 +1,60 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from visualizer.models import TraceBlob
+
+
+class Command(BaseCommand):
+    help = 'Convert uncompressed trace blobs to compressed storage and report the space saved'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100,
+                            help='Number of trace blobs converted per transaction')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Report the space that would be saved without writing anything')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+        field = TraceBlob._meta.get_field('compressed_steps')
+
+        pending = TraceBlob.objects.filter(compressed_steps__isnull=True, legacy_steps__isnull=False)
+        total = pending.count()
+        if not total:
+            self.stdout.write('No uncompressed trace blobs found.')
+            return
+
+        converted = 0
+        bytes_before = 0
+        bytes_after = 0
+        last_id = 0
+
+        while True:
+            # Page by primary key so converted rows never shift the window
+            batch = list(pending.filter(id__gt=last_id).order_by('id')[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1].id
+
+            with transaction.atomic():
+                for blob in batch:
+                    bytes_before += len(json.dumps(blob.legacy_steps).encode('utf-8'))
+                    bytes_after += len(field.compress(blob.legacy_steps))
+
+                    if not dry_run:
+                        blob.compressed_steps = blob.legacy_steps
+                        blob.legacy_steps = None
+                        blob.save(update_fields=['compressed_steps', 'legacy_steps'])
+
+            converted += len(batch)
+            self.stdout.write(f'Processed {converted}/{total} trace blobs')
+
+        saved = bytes_before - bytes_after
+        ratio = bytes_after / bytes_before if bytes_before else 1.0
+        verb = 'Would save' if dry_run else 'Saved'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {saved} bytes: {bytes_before} -> {bytes_after} bytes '
+            f'({ratio:.1%} of original) across {converted} trace blobs'
+        ))
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from visualizer.graph_input import GRAPH_ALGORITHMS, is_graph_algorithm, parse_graph_input
+from visualizer.models import Visualization
+from visualizer.profiling import SORT_KEYS, run_profiled, summarize_profile
+
+
+class Command(BaseCommand):
+    help = "Replay a saved visualization's input under cProfile and report where the time goes"
+
+    def add_arguments(self, parser):
+        parser.add_argument('visualization_id', type=int,
+                            help='ID of the Visualization to replay')
+        parser.add_argument('--top', type=int, default=None,
+                            help='Number of functions to list (default: PROFILE_TOP_FUNCTIONS)')
+        parser.add_argument('--sort', choices=sorted(SORT_KEYS), default='cumulative',
+                            help='Order functions by cumulative time, own time or call count')
+        parser.add_argument('--output', metavar='PATH',
+                            help='Also write the raw profile for pstats or snakeviz')
+
+    def handle(self, *args, **options):
+        try:
+            visualization = Visualization.objects.select_related('algorithm').get(id=options['visualization_id'])
+        except Visualization.DoesNotExist:
+            raise CommandError(f"Visualization {options['visualization_id']} not found")
+
+        algorithm_name = visualization.algorithm.name
+        input_data = visualization.input_data
+        # Graph inputs are stored as JSON, so node IDs come back as strings
+        if isinstance(input_data, dict) and is_graph_algorithm(algorithm_name):
+            try:
+                input_data = parse_graph_input(input_data, weighted=GRAPH_ALGORITHMS[algorithm_name])
+            except ValueError as e:
+                raise CommandError(f'Saved input is not a valid graph: {e}')
+
+        try:
+            steps, profiler, wall_time = run_profiled(algorithm_name, input_data)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(f'{algorithm_name}: {len(steps)} steps in {wall_time * 1000:.2f} ms')
+        self.stdout.write(f"{'calls':>10} {'own s':>10} {'cumulative s':>13}  function")
+        for function in summarize_profile(profiler, options['top'], options['sort']):
+            calls = function['calls']
+            if function['primitiveCalls'] != calls:
+                calls = f"{calls}/{function['primitiveCalls']}"
+            self.stdout.write(
+                f"{calls:>10} {function['totalTime']:>10.4f} {function['cumulativeTime']:>13.4f}  {function['function']}"
+            )
+
+        if options['output']:
+            profiler.dump_stats(options['output'])
+            self.stdout.write(self.style.SUCCESS(f"Wrote profile to {options['output']}"))
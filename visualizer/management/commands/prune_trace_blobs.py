@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from visualizer.models import TraceBlob
+
+
+class Command(BaseCommand):
+    help = 'Delete trace blobs that no visualization refers to'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Report the unreferenced blobs without deleting them')
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            count = TraceBlob.objects.filter(visualizations__isnull=True).count()
+            self.stdout.write(f'Would delete {count} unreferenced trace blobs')
+            return
+
+        deleted = TraceBlob.objects.delete_orphans()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} unreferenced trace blobs'))
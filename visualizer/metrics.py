@@ -0,0 +1,199 @@
+"""
+Request metrics for AlgoViz3D trace endpoints
+
+Trace execution is timed phase by phase (generating the trace, saving the
+Visualization, serializing the response) and recorded in per-algorithm
+histograms together with step counts and response sizes. The metrics view
+renders them in the Prometheus text exposition format.
+
+Metrics live in the memory of the process that recorded them, so each server
+worker reports its own; scrape every worker (or sum them in Prometheus). With
+METRICS_ENABLED off, spans are no-ops and the endpoint returns 404.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+
+DEFAULT_METRICS_ENABLED = True
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+STEP_BUCKETS = (10, 100, 1000, 10000, 100000, 1000000)
+BYTE_BUCKETS = (1024, 16384, 131072, 1048576, 8388608, 67108864)
+
+
+def metrics_enabled():
+    return getattr(settings, 'METRICS_ENABLED', DEFAULT_METRICS_ENABLED)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """A Prometheus histogram with one series per combination of label values"""
+
+    def __init__(self, name, documentation, labelnames, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, value, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        # Index of the first bucket the value falls in; counts are made cumulative on output
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0}
+            series['counts'][index] += 1
+            series['sum'] += value
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def collect(self):
+        with self._lock:
+            series = {key: {'counts': list(value['counts']), 'sum': value['sum']} for key, value in self._series.items()}
+
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        for key in sorted(series):
+            labels = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series[key]['counts']):
+                cumulative += count
+                bucket_labels = _format_labels(labels + [('le', _format_value(float(bound)))])
+                lines.append(f'{self.name}_bucket{bucket_labels} {cumulative}')
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(series[key]['sum'])}")
+            lines.append(f'{self.name}_count{_format_labels(labels)} {cumulative}')
+        return lines
+
+
+PHASE_SECONDS = Histogram(
+    'algoviz_execute_phase_seconds', 'Time spent in each phase of executing an algorithm',
+    ('algorithm', 'phase'), LATENCY_BUCKETS,
+)
+EXECUTE_SECONDS = Histogram(
+    'algoviz_execute_seconds', 'Time to execute an algorithm and render the response',
+    ('algorithm',), LATENCY_BUCKETS,
+)
+TRACE_STEPS = Histogram(
+    'algoviz_trace_steps', 'Number of steps in executed traces',
+    ('algorithm',), STEP_BUCKETS,
+)
+RESPONSE_BYTES = Histogram(
+    'algoviz_response_bytes', 'Size of execute responses before compression',
+    ('algorithm',), BYTE_BUCKETS,
+)
+HISTOGRAMS = (PHASE_SECONDS, EXECUTE_SECONDS, TRACE_STEPS, RESPONSE_BYTES)
+
+
+class _Span:
+    __slots__ = ('algorithm', 'phase', 'started')
+
+    def __init__(self, algorithm, phase):
+        self.algorithm = algorithm
+        self.phase = phase
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        PHASE_SECONDS.observe(time.perf_counter() - self.started, algorithm=self.algorithm, phase=self.phase)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(algorithm, phase):
+    """Context manager recording the time spent in ``phase`` of executing ``algorithm``"""
+    if not metrics_enabled():
+        return _NULL_SPAN
+    return _Span(algorithm, phase)
+
+
+def observe_trace(algorithm, steps):
+    if metrics_enabled():
+        TRACE_STEPS.observe(len(steps), algorithm=algorithm)
+
+
+def observe_response(algorithm, started, content):
+    """Record the size of a rendered response and the total time since ``started``"""
+    if metrics_enabled():
+        RESPONSE_BYTES.observe(len(content), algorithm=algorithm)
+        EXECUTE_SECONDS.observe(time.perf_counter() - started, algorithm=algorithm)
+
+
+def observe_rendering(response, algorithm, started):
+    """
+    Record the serialize phase, size and total time of a DRF response.
+    DRF renders responses after the view returns, so this is done from a
+    post-render callback.
+    """
+    if not metrics_enabled():
+        return
+    render_started = time.perf_counter()
+
+    def record(rendered):
+        PHASE_SECONDS.observe(time.perf_counter() - render_started, algorithm=algorithm, phase='serialize')
+        observe_response(algorithm, started, rendered.content)
+
+    response.add_post_render_callback(record)
+
+
+def _trace_cache_lines():
+    from .trace_cache import trace_cache_stats
+
+    stats = trace_cache_stats()
+    name = 'algoviz_trace_cache_requests_total'
+    return [
+        f'# HELP {name} Trace cache lookups by result',
+        f'# TYPE {name} counter',
+        f'{name}{{result="hit"}} {stats["hits"]}',
+        f'{name}{{result="miss"}} {stats["misses"]}',
+    ]
+
+
+def render_metrics():
+    """All metrics of this process in the Prometheus text format"""
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.collect())
+    lines.extend(_trace_cache_lines())
+    return '\n'.join(lines) + '\n'
+
+
+def reset_metrics():
+    for histogram in HISTOGRAMS:
+        histogram.reset()
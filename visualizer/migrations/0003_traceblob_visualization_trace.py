@@ -0,0 +1,91 @@
+# Generated by Django 5.0.1 on 2026-10-17 09:12
+
+import hashlib
+import json
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def canonical_digest(value):
+    encoded = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def backfill_trace_blobs(apps, schema_editor):
+    TraceBlob = apps.get_model("visualizer", "TraceBlob")
+    Visualization = apps.get_model("visualizer", "Visualization")
+
+    for visualization in Visualization.objects.iterator():
+        steps = visualization.steps
+        blob, _ = TraceBlob.objects.get_or_create(
+            digest=canonical_digest(steps),
+            defaults={"steps": steps, "step_count": len(steps)},
+        )
+        visualization.trace = blob
+        visualization.save(update_fields=["trace"])
+
+
+def restore_inline_steps(apps, schema_editor):
+    Visualization = apps.get_model("visualizer", "Visualization")
+
+    for visualization in Visualization.objects.select_related("trace").iterator():
+        visualization.steps = visualization.trace.steps
+        visualization.save(update_fields=["steps"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("visualizer", "0002_algorithm_best_use_cases_algorithm_educational_notes_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TraceBlob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("digest", models.CharField(max_length=64, unique=True)),
+                ("steps", models.JSONField()),
+                ("step_count", models.PositiveIntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="visualization",
+            name="trace",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="visualizations",
+                to="visualizer.traceblob",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="visualization",
+            name="steps",
+            field=models.JSONField(null=True),
+        ),
+        migrations.RunPython(backfill_trace_blobs, restore_inline_steps),
+        migrations.RemoveField(
+            model_name="visualization",
+            name="steps",
+        ),
+        migrations.AlterField(
+            model_name="visualization",
+            name="trace",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="visualizations",
+                to="visualizer.traceblob",
+            ),
+        ),
+    ]
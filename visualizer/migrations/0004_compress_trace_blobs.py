@@ -0,0 +1,39 @@
+# Generated by Django 5.0.1 on 2026-10-17 10:03
+
+import visualizer.fields
+from django.db import migrations, models
+
+
+def restore_legacy_steps(apps, schema_editor):
+    """Copy compressed traces back to the legacy column before it becomes required again"""
+    TraceBlob = apps.get_model("visualizer", "TraceBlob")
+    for blob in TraceBlob.objects.filter(compressed_steps__isnull=False).iterator():
+        blob.legacy_steps = blob.compressed_steps
+        blob.save(update_fields=["legacy_steps"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("visualizer", "0003_traceblob_visualization_trace"),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name="traceblob",
+            old_name="steps",
+            new_name="legacy_steps",
+        ),
+        migrations.AlterField(
+            model_name="traceblob",
+            name="legacy_steps",
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="traceblob",
+            name="compressed_steps",
+            field=visualizer.fields.CompressedJSONField(null=True),
+        ),
+        # Forwards, blobs are compressed by the compress_traces command
+        migrations.RunPython(migrations.RunPython.noop, restore_legacy_steps),
+    ]
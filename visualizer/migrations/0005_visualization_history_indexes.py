@@ -0,0 +1,23 @@
+# Generated by Django 5.0.1 on 2026-10-17 11:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('visualizer', '0004_compress_trace_blobs'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='visualization',
+            index=models.Index(fields=['algorithm', 'user', '-created_at'], name='viz_algo_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='visualization',
+            index=models.Index(fields=['user', '-created_at'], name='viz_user_created_idx'),
+        ),
+    ]
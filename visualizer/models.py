@@ -1,5 +1,10 @@
 from django.db import models
+from django.db.models import ProtectedError
 from django.contrib.auth.models import User
+from django.utils import timezone
+
+from .fields import CompressedJSONField
+from .digests import canonical_digest
 
 class DataStructure(models.Model):
     """Model representing a data structure type"""
@@ -45,14 +50,98 @@ class Algorithm(models.Model):
     def __str__(self):
         return self.name
 
+class CatalogueVersion(models.Model):
+    """
+    Single row counting changes to the algorithm and data structure catalogue.
+    It lives in the database so that every process sees changes made by any
+    other (server workers, the shell, management commands).
+    """
+    version = models.PositiveBigIntegerField(default=1)
+    modified_at = models.DateTimeField(default=timezone.now)
+    
+    def __str__(self):
+        return f"Catalogue version {self.version}"
+
+class TraceBlobManager(models.Manager):
+    def get_or_create_for_steps(self, steps, digest=None):
+        """Return the blob holding ``steps``, storing it if this trace is new"""
+        blob, _ = self.get_or_create(
+            digest=digest or canonical_digest(steps),
+            defaults={'compressed_steps': steps, 'step_count': len(steps)}
+        )
+        return blob
+    
+    def delete_orphans(self, ids=None):
+        """Delete the blobs no visualization refers to (only among ``ids`` if given)"""
+        orphans = self.filter(visualizations__isnull=True)
+        if ids is not None:
+            orphans = orphans.filter(pk__in=ids)
+        try:
+            return orphans.delete()[0]
+        except ProtectedError:
+            # A visualization started using one of them in the meantime
+            return 0
+
+class TraceBlob(models.Model):
+    """Model storing each distinct visualization trace once, keyed by content hash"""
+    digest = models.CharField(max_length=64, unique=True)
+    compressed_steps = CompressedJSONField(null=True)
+    # Uncompressed steps from before compression; see the compress_traces command
+    legacy_steps = models.JSONField(null=True, blank=True)
+    step_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    objects = TraceBlobManager()
+    
+    @property
+    def steps(self):
+        """The trace steps, whichever column they are stored in"""
+        if self.compressed_steps is not None:
+            return self.compressed_steps
+        return self.legacy_steps
+    
+    def __str__(self):
+        return f"{self.digest[:12]} ({self.step_count} steps)"
+
 class Visualization(models.Model):
     """Model representing a saved visualization"""
     algorithm = models.ForeignKey(Algorithm, on_delete=models.CASCADE)
     input_data = models.JSONField()
-    steps = models.JSONField()
+    trace = models.ForeignKey(TraceBlob, on_delete=models.PROTECT, related_name='visualizations')
     created_at = models.DateTimeField(auto_now_add=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
     name = models.CharField(max_length=200, default="Untitled Visualization")
     
+    class Meta:
+        indexes = [
+            # Per-algorithm history on the visualization page
+            models.Index(fields=['algorithm', 'user', '-created_at'], name='viz_algo_user_created_idx'),
+            # A user's visualization history in the API
+            models.Index(fields=['user', '-created_at'], name='viz_user_created_idx'),
+        ]
+    
+    # Steps assigned since the last save, resolved to a TraceBlob on save
+    _pending_steps = None
+    
+    @property
+    def steps(self):
+        """The visualization steps, read from the shared trace blob"""
+        if self._pending_steps is not None:
+            return self._pending_steps
+        return self.trace.steps if self.trace_id else None
+    
+    @steps.setter
+    def steps(self, value):
+        self._pending_steps = value
+    
+    def save(self, *args, **kwargs):
+        previous_trace_id = self.trace_id
+        if self._pending_steps is not None:
+            self.trace = TraceBlob.objects.get_or_create_for_steps(self._pending_steps)
+            self._pending_steps = None
+        super().save(*args, **kwargs)
+        if previous_trace_id and previous_trace_id != self.trace_id:
+            TraceBlob.objects.delete_orphans([previous_trace_id])
+    
     def __str__(self):
         return f"{self.algorithm.name} - {self.name}"
\ No newline at end of file
@@ -0,0 +1,18 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class VisualizationCursorPagination(CursorPagination):
+    """
+    Newest-first cursor pagination for visualization history.
+    Each page is a single indexed range query on (user, -created_at), so its
+    cost does not depend on how deep into the history the client has paged.
+    """
+    ordering = '-created_at'
+    page_size_query_param = 'page_size'
+
+    def get_page_size(self, request):
+        # Read per request so the sizes follow settings overrides
+        self.page_size = getattr(settings, 'VISUALIZATION_PAGE_SIZE', 20)
+        self.max_page_size = getattr(settings, 'VISUALIZATION_MAX_PAGE_SIZE', 100)
+        return super().get_page_size(request)
@@ -0,0 +1,141 @@
+"""
+Background persistence of executed visualizations
+
+Saving a Visualization means hashing its trace, resolving the TraceBlob and
+inserting the row, which under SQLite serializes all writers. When
+VISUALIZATION_ASYNC_SAVE is enabled the execute endpoints hand the record to a
+single writer thread instead; it drains the queue in batches, resolves blobs
+once per distinct trace and inserts the rows with bulk_create. Pending records
+are flushed when the interpreter exits.
+"""
+
+import atexit
+import logging
+import queue
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+
+from .models import TraceBlob, Visualization
+from .digests import canonical_digest
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_QUEUE_SIZE = 1000
+DEFAULT_FLUSH_INTERVAL = 0.5
+
+
+class VisualizationWriter:
+    """Queue of pending visualizations drained in batches by a daemon thread"""
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, queue_size=DEFAULT_QUEUE_SIZE,
+                 flush_interval=DEFAULT_FLUSH_INTERVAL):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    def submit(self, **fields):
+        """
+        Queue a visualization for saving.
+        Returns False if the queue is full, in which case the caller should
+        save synchronously.
+        """
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(fields)
+        except queue.Full:
+            return False
+        return True
+
+    def flush(self):
+        """Block until every queued visualization has been written"""
+        self._queue.join()
+
+    def shutdown(self):
+        """Write any pending visualizations and stop the writer thread"""
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join()
+        self._thread = None
+
+    def write_batch(self, batch):
+        """Resolve trace blobs for a batch and insert its visualizations"""
+        blobs = {}
+        visualizations = []
+
+        for fields in batch:
+            steps = fields.pop('steps')
+            digest = canonical_digest(steps)
+            if digest not in blobs:
+                blobs[digest] = TraceBlob.objects.get_or_create_for_steps(steps, digest=digest)
+            visualizations.append(Visualization(trace=blobs[digest], **fields))
+
+        Visualization.objects.bulk_create(visualizations)
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name='visualization-writer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while not (self._stopping.is_set() and self._queue.empty()):
+            batch = self._next_batch()
+            if not batch:
+                continue
+
+            try:
+                close_old_connections()
+                self.write_batch(batch)
+            except Exception as e:
+                logger.error(f"Error saving {len(batch)} visualizations: {str(e)}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+        connection.close()
+
+    def _next_batch(self):
+        """Wait for the first item, then take whatever else is already queued"""
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+
+writer = VisualizationWriter(
+    batch_size=getattr(settings, 'VISUALIZATION_SAVE_BATCH_SIZE', DEFAULT_BATCH_SIZE),
+    queue_size=getattr(settings, 'VISUALIZATION_SAVE_QUEUE_SIZE', DEFAULT_QUEUE_SIZE),
+)
+atexit.register(writer.shutdown)
+
+
+def save_visualization(**fields):
+    """
+    Persist a visualization, in the background when VISUALIZATION_ASYNC_SAVE
+    is enabled and inline otherwise (or when the queue is full).
+    """
+    if getattr(settings, 'VISUALIZATION_ASYNC_SAVE', False) and writer.submit(**fields):
+        return
+    Visualization.objects.create(**fields)
+
+
+async def asave_visualization(**fields):
+    """Async variant of save_visualization; the inline save uses the async ORM"""
+    if getattr(settings, 'VISUALIZATION_ASYNC_SAVE', False) and writer.submit(**fields):
+        return
+    await Visualization.objects.acreate(**fields)
@@ -0,0 +1,78 @@
+"""
+Profiling of algorithm trace generation
+
+profile_trace runs an algorithm under cProfile and summarises the functions
+that took the most time. Staff can ask for it with ?profile=1 on the execute
+endpoint, which runs it in the trace worker pool (so the usual limits apply)
+and returns the summary alongside the trace; the profile_visualization command
+replays the input of a saved Visualization the same way from the shell.
+"""
+
+import cProfile
+import os
+import pstats
+import time
+
+from django.conf import settings
+
+from .algorithm_engine import execute_algorithm_steps
+
+DEFAULT_PROFILE_TOP_FUNCTIONS = 25
+SORT_KEYS = {
+    'cumulative': pstats.SortKey.CUMULATIVE,
+    'tottime': pstats.SortKey.TIME,
+    'calls': pstats.SortKey.CALLS,
+}
+
+
+def run_profiled(algorithm_name, input_data, **options):
+    """Return (steps, profiler, wall_time) for the algorithm run under cProfile"""
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    profiler.enable()
+    try:
+        steps = execute_algorithm_steps(algorithm_name, input_data, **options)
+    finally:
+        profiler.disable()
+    return steps, profiler, time.perf_counter() - started
+
+
+def _function_label(function):
+    filename, line, name = function
+    if filename == '~':
+        # Built-in functions have no source location
+        return name
+    return f'{os.path.basename(filename)}:{line}({name})'
+
+
+def summarize_profile(profiler, limit=None, sort='cumulative'):
+    """The ``limit`` most expensive functions of a profile, most expensive first"""
+    if limit is None:
+        limit = getattr(settings, 'PROFILE_TOP_FUNCTIONS', DEFAULT_PROFILE_TOP_FUNCTIONS)
+    stats = pstats.Stats(profiler)
+    stats.sort_stats(SORT_KEYS[sort])
+
+    functions = []
+    for function in stats.fcn_list[:limit]:
+        primitive_calls, calls, total_time, cumulative_time, _ = stats.stats[function]
+        functions.append({
+            'function': _function_label(function),
+            'calls': calls,
+            'primitiveCalls': primitive_calls,
+            'totalTime': total_time,
+            'cumulativeTime': cumulative_time,
+        })
+    return functions
+
+
+def profile_trace(algorithm_name, input_data, limit=None, sort='cumulative', **options):
+    """
+    Return (steps, profile) for the algorithm run under cProfile, where
+    profile holds the wall time and the top functions.
+    """
+    steps, profiler, wall_time = run_profiled(algorithm_name, input_data, **options)
+    return steps, {
+        'wallTime': wall_time,
+        'sort': sort,
+        'functions': summarize_profile(profiler, limit, sort),
+    }
@@ -0,0 +1,68 @@
+import json
+
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # Optional; the stdlib encoder is used instead
+    orjson = None
+
+_fallback_encoder = JSONEncoder()
+
+
+def dumps_json(data):
+    """
+    Serialize ``data`` to compact UTF-8 JSON bytes.
+    Uses orjson when it is installed (several times faster on large traces)
+    and the standard library otherwise. Non-string dict keys (graph node
+    numbers) become strings either way; types neither encoder knows, such as
+    Decimal or lazy strings, go through DRF's encoder. Data orjson refuses,
+    such as integers wider than 64 bits, is left to the standard library.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, default=_fallback_encoder.default, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass
+    return json.dumps(data, cls=JSONEncoder, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class FastJSONRenderer(BaseRenderer):
+    """Drop-in JSONRenderer for the trace endpoints, backed by dumps_json"""
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return dumps_json(data)
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Lets streaming endpoints pass content negotiation for EventSource clients.
+    Streaming responses bypass rendering; error responses are sent as a single
+    JSON-encoded event.
+    """
+    media_type = 'text/event-stream'
+    format = 'sse'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return b'event: error\ndata: ' + dumps_json(data) + b'\n\n'
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Content negotiation counterpart of EventStreamRenderer for NDJSON clients"""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return dumps_json({'event': 'error', 'data': data}) + b'\n'
@@ -1,12 +1,30 @@
 from rest_framework import serializers
 from .models import Algorithm, DataStructure, Visualization
 
-class DataStructureSerializer(serializers.ModelSerializer):
+def requested_fields(request):
+    """Field names from a ?fields=a,b,c sparse fieldset parameter, or None"""
+    if request is None or not request.query_params.get('fields'):
+        return None
+    return [name.strip() for name in request.query_params['fields'].split(',') if name.strip()]
+
+class SparseFieldsetMixin:
+    """Drop fields not named in the request's ?fields= parameter"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Only top-level serializers are given the request context when constructed,
+        # so nested serializers always keep their full field set
+        fields = requested_fields(self.context.get('request'))
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+class DataStructureSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = DataStructure
         fields = ['id', 'name', 'category', 'description']
 
-class AlgorithmSerializer(serializers.ModelSerializer):
+class AlgorithmSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     data_structures = DataStructureSerializer(many=True, read_only=True)
     
     class Meta:
@@ -16,9 +34,19 @@ class AlgorithmSerializer(serializers.ModelSerializer):
 
 class VisualizationSerializer(serializers.ModelSerializer):
     algorithm_name = serializers.ReadOnlyField(source='algorithm.name')
+    steps = serializers.JSONField()
     
     class Meta:
         model = Visualization
         fields = ['id', 'algorithm', 'algorithm_name', 'input_data', 'steps', 
                  'created_at', 'name']
-        read_only_fields = ['created_at', 'user']
\ No newline at end of file
+        read_only_fields = ['created_at', 'user']
+
+class VisualizationListSerializer(serializers.ModelSerializer):
+    """Visualization metadata for history listings, without the trace itself"""
+    algorithm_name = serializers.ReadOnlyField(source='algorithm.name')
+    step_count = serializers.ReadOnlyField(source='trace.step_count')
+    
+    class Meta:
+        model = Visualization
+        fields = ['id', 'algorithm', 'algorithm_name', 'step_count', 'created_at', 'name']
@@ -0,0 +1,21 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .catalogue import bump_catalogue_version
+from .models import Algorithm, DataStructure, TraceBlob, Visualization
+
+
+@receiver(post_save, sender=Algorithm)
+@receiver(post_delete, sender=Algorithm)
+@receiver(post_save, sender=DataStructure)
+@receiver(post_delete, sender=DataStructure)
+@receiver(m2m_changed, sender=Algorithm.data_structures.through)
+def invalidate_catalogue(sender, **kwargs):
+    """Any change to the catalogue models invalidates the cached catalogue"""
+    bump_catalogue_version()
+
+
+@receiver(post_delete, sender=Visualization)
+def delete_orphan_trace(sender, instance, **kwargs):
+    """Traces are shared between visualizations; drop one once nothing refers to it"""
+    TraceBlob.objects.delete_orphans([instance.trace_id])
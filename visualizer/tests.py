@@ -1,6 +1,42 @@
-from django.test import TestCase
-from .models import Algorithm, DataStructure, Visualization
+import gzip
+import json
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+from io import StringIO
+from unittest.mock import patch
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import F
+from django.test import TestCase, TransactionTestCase, override_settings
+from .models import Algorithm, CatalogueVersion, DataStructure, TraceBlob, Visualization
 from django.contrib.auth.models import User
+from .algorithm_engine import MESSAGE_CATALOGUES, MILESTONE_STEP_TYPES, STATE_CHANGE_STEP_TYPES, count_algorithm_operations, execute_algorithm_steps, iter_algorithm_steps, render_step_messages, summarize_trace
+from .benchmarks import INPUT_GENERATOR, compare_results, load_results, make_input, nearly_sorted_swaps, run_benchmarks
+from .complexity import fit_complexity
+from .cost_model import estimate_trace_cost
+from .executor import TraceExecutionError, TraceTimeoutError, executor, run_trace
+from .fields import CompressedJSONField
+from .graph_input import parse_graph_input
+from .metrics import reset_metrics
+from .persistence import VisualizationWriter, writer
+from .renderers import dumps_json
+from .trace_cache import get_or_compute_trace, get_trace_cache, reset_trace_cache_stats, trace_cache_key, trace_cache_stats
+from .trace_encoding import encode_delta_trace, expand_delta_trace, is_delta_trace, iter_delta_steps
+from .trace_pages import decoded_traces
+
+def create_algorithm(name, **fields):
+    """An Algorithm row for the engine function called ``name``"""
+    fields.setdefault('category', 'sort')
+    fields.setdefault('description', f'{name} for tests')
+    fields.setdefault('code_implementation', 'def run(data):\n    # Implementation')
+    fields.setdefault('time_complexity', 'O(n²)')
+    fields.setdefault('space_complexity', 'O(1)')
+    return Algorithm.objects.create(name=name, **fields)
 
 class AlgorithmModelTests(TestCase):
     def setUp(self):
@@ -56,4 +92,1073 @@ class VisualizationModelTests(TestCase):
     def test_visualization_creation(self):
         self.assertEqual(self.visualization.name, "Test Visualization")
         self.assertEqual(self.visualization.algorithm.name, "Bubble Sort")
-        self.assertEqual(self.visualization.user.username, "testuser")
\ No newline at end of file
+        self.assertEqual(self.visualization.user.username, "testuser")
+
+class DeltaTraceEncodingTests(TestCase):
+    def setUp(self):
+        self.input_data = [5, 3, 8, 1, 9, 2, 7]
+        self.sorting_algorithms = ['Bubble Sort', 'Selection Sort', 'Insertion Sort', 'Merge Sort', 'Quick Sort']
+    
+    def test_round_trip_matches_full_trace(self):
+        for name in self.sorting_algorithms:
+            steps = execute_algorithm_steps(name, self.input_data)
+            encoded = encode_delta_trace(steps, keyframe_interval=10)
+            self.assertEqual(expand_delta_trace(encoded), steps, name)
+    
+    def test_keyframes_and_swap_deltas(self):
+        encoded = encode_delta_trace(execute_algorithm_steps('Bubble Sort', self.input_data), keyframe_interval=10)
+        self.assertEqual(encoded[0]['state'], self.input_data)
+        self.assertTrue(all('state' in step for step in encoded[::10]))
+        swap_steps = [step for step in encoded if step['type'] == 'swap' and 'delta' in step]
+        self.assertTrue(swap_steps)
+        self.assertTrue(all('swap' in step['delta'] for step in swap_steps))
+    
+    def test_execute_algorithm_returns_delta_trace(self):
+        algorithm = create_algorithm('Bubble Sort')
+        response = self.client.post('/api/execute-algorithm/', {
+            'algorithm_id': algorithm.id,
+            'input_data': self.input_data,
+            'trace_format': 'delta'
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['traceFormat'], 'delta')
+        self.assertTrue(is_delta_trace(response.json()['steps']))
+    
+    @override_settings(TRACE_EXECUTOR_WORKERS=0)
+    def test_trace_job_encodes_delta_traces(self):
+        data = list(range(30, 0, -1))
+        steps = run_trace('Bubble Sort', data, trace_format='delta', keyframe_interval=10)
+        self.assertEqual(steps, encode_delta_trace(execute_algorithm_steps('Bubble Sort', data), keyframe_interval=10))
+        
+        get_trace_cache().clear()
+        algorithm = create_algorithm('Bubble Sort')
+        with patch('visualizer.executor.iter_delta_steps', wraps=iter_delta_steps) as encode:
+            self.client.post('/api/execute-algorithm/', {
+                'algorithm_id': algorithm.id, 'input_data': data, 'trace_format': 'delta'
+            }, content_type='application/json')
+        encode.assert_called_once()
+    
+    @override_settings(VISUALIZATION_ASYNC_SAVE=False)
+    def test_saved_delta_trace_pages_are_full_steps(self):
+        algorithm = create_algorithm('Bubble Sort')
+        user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.force_login(user)
+        data = list(range(30, 0, -1))
+        self.client.post('/api/execute-algorithm/', {
+            'algorithm_id': algorithm.id, 'input_data': data, 'trace_format': 'delta'
+        }, content_type='application/json')
+        
+        visualization = Visualization.objects.get(user=user)
+        self.assertTrue(is_delta_trace(visualization.steps))
+        response = self.client.get(f'/api/visualizations/{visualization.id}/steps/', {'offset': 100, 'limit': 30})
+        self.assertEqual(response.json()['steps'], execute_algorithm_steps('Bubble Sort', data)[100:130])
+    
+    def test_delta_budget_counts_per_step_index_lists(self):
+        algorithm = create_algorithm('Bubble Sort')
+        response = self.client.post('/api/execute-algorithm/', {
+            'algorithm_id': algorithm.id, 'input_data': list(range(350, 0, -1)), 'trace_format': 'delta'
+        }, content_type='application/json')
+        
+        # The sorted_indices lists alone put this trace over the byte budget
+        self.assertEqual(response.status_code, 413)
+
+
+class StreamingExecutionTests(TestCase):
+    def setUp(self):
+        self.algorithm = create_algorithm('Merge Sort', time_complexity='O(n log n)', space_complexity='O(n)')
+        self.input_data = [4, 2, 7, 1, 3]
+    
+    def test_engine_yields_steps_lazily(self):
+        steps = iter_algorithm_steps('Merge Sort', self.input_data)
+        self.assertEqual(next(steps)['type'], 'initial')
+        self.assertEqual([next(steps)] + list(steps), execute_algorithm_steps('Merge Sort', self.input_data)[1:])
+    
+    def test_ndjson_stream(self):
+        response = self.client.post('/api/execute-algorithm/stream/', {
+            'algorithm_id': self.algorithm.id,
+            'input_data': self.input_data
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        
+        events = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        steps = [event['data'] for event in events if event['event'] == 'step']
+        self.assertEqual(events[0]['event'], 'meta')
+        self.assertEqual(events[-1], {'event': 'end', 'data': {'stepCount': len(steps)}})
+        self.assertEqual(steps, execute_algorithm_steps('Merge Sort', self.input_data))
+    
+    def test_sse_stream(self):
+        response = self.client.get('/api/execute-algorithm/stream/', {
+            'algorithm_id': self.algorithm.id,
+            'input_data': json.dumps(self.input_data)
+        }, HTTP_ACCEPT='text/event-stream')
+        self.assertEqual(response.status_code, 200)
+        
+        body = b''.join(response.streaming_content).decode()
+        self.assertTrue(body.startswith('event: meta\n'))
+        self.assertTrue(body.endswith('event: end\ndata: {"stepCount":%d}\n\n' % body.count('event: step\n')))
+
+
+class TraceCacheTests(TestCase):
+    def setUp(self):
+        self.algorithm = create_algorithm('Bubble Sort')
+        get_trace_cache().clear()
+        reset_trace_cache_stats()
+    
+    def test_cache_key_is_canonical(self):
+        self.assertEqual(
+            trace_cache_key('Dijkstra\'s Algorithm', {'start': 0, 'graph': {'0': {}}}),
+            trace_cache_key('Dijkstra\'s Algorithm', {'graph': {'0': {}}, 'start': 0})
+        )
+        self.assertNotEqual(trace_cache_key('Bubble Sort', [1, 2]), trace_cache_key('Bubble Sort', [2, 1]))
+        self.assertNotEqual(trace_cache_key('Bubble Sort', [1, 2]), trace_cache_key('Quick Sort', [1, 2]))
+    
+    def test_repeat_request_is_served_from_cache(self):
+        payload = {'algorithm_id': self.algorithm.id, 'input_data': [3, 1, 2]}
+        first = self.client.post('/api/execute-algorithm/', payload, content_type='application/json')
+        second = self.client.post('/api/execute-algorithm/', payload, content_type='application/json')
+        
+        self.assertEqual(first['X-Trace-Cache'], 'miss')
+        self.assertEqual(second['X-Trace-Cache'], 'hit')
+        self.assertEqual(first.json()['steps'], second.json()['steps'])
+        self.assertEqual(trace_cache_stats()['hits'], 1)
+        self.assertEqual(trace_cache_stats()['misses'], 1)
+    
+    @override_settings(TRACE_CACHE_MAX_STEPS=5)
+    def test_long_traces_are_not_cached(self):
+        get_or_compute_trace('Bubble Sort', [3, 1, 2])
+        steps, cache_hit = get_or_compute_trace('Bubble Sort', [3, 1, 2])
+        self.assertFalse(cache_hit)
+        self.assertGreater(len(steps), 5)
+    
+    @override_settings(TRACE_CACHE_MAX_ENTRY_BYTES=64 * 1024)
+    def test_large_traces_are_not_cached(self):
+        get_or_compute_trace('Bubble Sort', [3, 1, 2])
+        self.assertTrue(get_or_compute_trace('Bubble Sort', [3, 1, 2])[1])
+        
+        get_or_compute_trace('Bubble Sort', list(range(30, 0, -1)))
+        self.assertFalse(get_or_compute_trace('Bubble Sort', list(range(30, 0, -1)))[1])
+
+
+class TraceDeduplicationTests(TestCase):
+    def setUp(self):
+        self.algorithm = create_algorithm('Bubble Sort')
+        self.steps = execute_algorithm_steps('Bubble Sort', [3, 1, 2])
+    
+    def test_identical_traces_share_one_blob(self):
+        first = Visualization.objects.create(algorithm=self.algorithm, input_data=[3, 1, 2], steps=self.steps)
+        second = Visualization.objects.create(algorithm=self.algorithm, input_data=[3, 1, 2], steps=self.steps)
+        
+        self.assertEqual(TraceBlob.objects.count(), 1)
+        self.assertEqual(first.trace_id, second.trace_id)
+        self.assertEqual(Visualization.objects.get(id=second.id).steps, self.steps)
+        self.assertEqual(first.trace.step_count, len(self.steps))
+    
+    def test_reassigning_steps_switches_blob(self):
+        visualization = Visualization.objects.create(algorithm=self.algorithm, input_data=[3, 1, 2], steps=self.steps)
+        visualization.steps = self.steps[:1]
+        visualization.save()
+        
+        # The blob of the old trace is no longer referenced, so it is dropped
+        self.assertEqual(TraceBlob.objects.count(), 1)
+        self.assertEqual(Visualization.objects.get(id=visualization.id).steps, self.steps[:1])
+    
+    def test_blobs_are_deleted_with_their_last_visualization(self):
+        first = Visualization.objects.create(algorithm=self.algorithm, input_data=[3, 1, 2], steps=self.steps)
+        second = Visualization.objects.create(algorithm=self.algorithm, input_data=[3, 1, 2], steps=self.steps)
+        
+        first.delete()
+        self.assertEqual(TraceBlob.objects.count(), 1)
+        second.delete()
+        self.assertEqual(TraceBlob.objects.count(), 0)
+    
+    def test_prune_command_deletes_unreferenced_blobs(self):
+        Visualization.objects.create(algorithm=self.algorithm, input_data=[3, 1, 2], steps=self.steps)
+        TraceBlob.objects.get_or_create_for_steps(self.steps[:1])
+        
+        call_command('prune_trace_blobs', stdout=StringIO())
+        self.assertEqual(TraceBlob.objects.count(), 1)
+        self.assertEqual(Visualization.objects.get().steps, self.steps)
+
+
+class CompressedTraceStorageTests(TestCase):
+    def setUp(self):
+        self.steps = execute_algorithm_steps('Insertion Sort', [4, 3, 2, 1])
+    
+    def test_steps_are_stored_compressed(self):
+        blob = TraceBlob.objects.get_or_create_for_steps(self.steps)
+        
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT compressed_steps FROM visualizer_traceblob WHERE id = %s', [blob.id])
+            stored = bytes(cursor.fetchone()[0])
+        
+        self.assertLess(len(stored), len(json.dumps(self.steps)))
+        self.assertEqual(TraceBlob.objects.get(id=blob.id).steps, self.steps)
+    
+    def test_compress_traces_command_converts_legacy_rows(self):
+        blob = TraceBlob.objects.create(digest='legacy', legacy_steps=self.steps, step_count=len(self.steps))
+        out = StringIO()
+        call_command('compress_traces', stdout=out)
+        
+        blob.refresh_from_db()
+        self.assertIsNone(blob.legacy_steps)
+        self.assertEqual(blob.compressed_steps, self.steps)
+        self.assertIn('Saved', out.getvalue())
+
+
+class VisualizationStepsApiTests(TestCase):
+    def setUp(self):
+        self.algorithm = create_algorithm('Bubble Sort')
+        self.user = User.objects.create_user(username="testuser", password="testpassword")
+        self.steps = execute_algorithm_steps('Bubble Sort', [5, 4, 3, 2, 1])
+        self.visualization = Visualization.objects.create(
+            algorithm=self.algorithm,
+            input_data=[5, 4, 3, 2, 1],
+            steps=self.steps,
+            name="Reversed",
+            user=self.user
+        )
+        self.client.force_login(self.user)
+    
+    def test_list_omits_steps(self):
+        response = self.client.get('/api/visualizations/')
+        self.assertEqual(response.status_code, 200)
+        
+        item = response.json()['results'][0]
+        self.assertNotIn('steps', item)
+        self.assertEqual(item['step_count'], len(self.steps))
+        self.assertEqual(item['algorithm_name'], 'Bubble Sort')
+    
+    def test_step_range(self):
+        response = self.client.get(f'/api/visualizations/{self.visualization.id}/steps/', {'offset': 3, 'limit': 4})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], len(self.steps))
+        self.assertEqual(response.json()['steps'], self.steps[3:7])
+    
+    def test_paging_decodes_the_trace_once(self):
+        decoded_traces.clear()
+        url = f'/api/visualizations/{self.visualization.id}/steps/'
+        with patch.object(CompressedJSONField, 'decompress', wraps=CompressedJSONField.decompress) as decompress:
+            pages = [self.client.get(url, {'offset': offset, 'limit': 5}).json()['steps'] for offset in range(0, len(self.steps), 5)]
+        
+        self.assertEqual(decompress.call_count, 1)
+        self.assertEqual([step for page in pages for step in page], self.steps)
+    
+    def test_step_range_rejects_bad_parameters(self):
+        response = self.client.get(f'/api/visualizations/{self.visualization.id}/steps/', {'offset': -1})
+        self.assertEqual(response.status_code, 400)
+    
+    def test_detail_still_returns_steps(self):
+        response = self.client.get(f'/api/visualizations/{self.visualization.id}/')
+        self.assertEqual(response.json()['steps'], self.steps)
+
+
+class BackgroundPersistenceTests(TransactionTestCase):
+    def setUp(self):
+        self.algorithm = create_algorithm('Bubble Sort')
+        self.user = User.objects.create_user(username="testuser", password="testpassword")
+        self.steps = execute_algorithm_steps('Bubble Sort', [2, 1])
+    
+    def test_write_batch_shares_blobs(self):
+        VisualizationWriter().write_batch([
+            {'algorithm': self.algorithm, 'input_data': [2, 1], 'steps': self.steps, 'user': self.user},
+            {'algorithm': self.algorithm, 'input_data': [2, 1], 'steps': self.steps, 'user': self.user},
+        ])
+        self.assertEqual(Visualization.objects.count(), 2)
+        self.assertEqual(TraceBlob.objects.count(), 1)
+    
+    @override_settings(VISUALIZATION_ASYNC_SAVE=True)
+    def test_execute_saves_in_background(self):
+        self.client.force_login(self.user)
+        response = self.client.post('/api/execute-algorithm/', {
+            'algorithm_id': self.algorithm.id,
+            'input_data': [2, 1]
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        
+        writer.flush()
+        self.assertEqual(Visualization.objects.get().steps, self.steps)
+
+
+class MessageCatalogueTests(TestCase):
+    def test_catalogue_steps_render_to_inline_steps(self):
+        for name, catalogue in MESSAGE_CATALOGUES.items():
+            raw = execute_algorithm_steps(name, [4, 1, 3, 2], messages='catalogue')
+            self.assertTrue(all('description' not in step and step['message'] in catalogue for step in raw), name)
+            self.assertEqual(list(render_step_messages(raw, catalogue)), execute_algorithm_steps(name, [4, 1, 3, 2]), name)
+    
+    def test_execute_algorithm_sends_catalogue_once(self):
+        algorithm = create_algorithm('Selection Sort')
+        response = self.client.post('/api/execute-algorithm/', {
+            'algorithm_id': algorithm.id,
+            'input_data': [3, 1, 2],
+            'messages': 'catalogue'
+        }, content_type='application/json')
+        
+        data = response.json()
+        self.assertEqual(data['messageCatalogue'], MESSAGE_CATALOGUES['Selection Sort'])
+        self.assertEqual(data['steps'][0]['message'], 'initial')
+        self.assertNotIn('educational_note', data['steps'][0])
+
+
+class DijkstraTests(TestCase):
+    def test_shortest_distances_and_unreachable_nodes(self):
+        graph = {'graph': {0: {1: 4, 2: 1}, 1: {3: 1}, 2: {1: 2, 3: 5}, 3: {}, 4: {0: 1}}, 'start': 0}
+        steps = execute_algorithm_steps("Dijkstra's Algorithm", graph)
+        
+        final = steps[-1]
+        self.assertEqual(final['distances'], {0: 0, 1: 3, 2: 1, 3: 4, 4: None})
+        self.assertEqual(final['paths'][3], [0, 2, 1, 3])
+        self.assertEqual(steps[-2]['unreachable'], [4])
+        json.dumps(steps, allow_nan=False)
+    
+    def test_update_steps_carry_only_changed_entries(self):
+        graph = {'graph': {0: {1: 4, 2: 1}, 1: {}, 2: {1: 2}}, 'start': 0}
+        updates = [step for step in execute_algorithm_steps("Dijkstra's Algorithm", graph) if step['type'] == 'dijkstra_update']
+        
+        self.assertEqual([step['distance_update'] for step in updates], [{1: 4}, {2: 1}, {1: 3}])
+        self.assertTrue(all('distances' not in step for step in updates))
+    
+    def test_large_chain_graph(self):
+        size = 20000
+        graph = {node: {node + 1: 1} for node in range(size - 1)}
+        graph[size - 1] = {}
+        final = execute_algorithm_steps("Dijkstra's Algorithm", {'graph': graph, 'start': 0})[-1]
+        
+        self.assertEqual(final['distances'][size - 1], size - 1)
+        self.assertEqual(final['previous'][size - 1], size - 2)
+        self.assertEqual(final['paths'], {})
+
+
+class GraphInputTests(TestCase):
+    def setUp(self):
+        self.algorithm = create_algorithm("Dijkstra's Algorithm", category='graph', time_complexity='O((V + E) log V)', space_complexity='O(V)')
+    
+    def test_graph_formats_normalise_to_the_same_adjacency(self):
+        expected = {'graph': {0: {1: 4, 2: 1}, 1: {}, 2: {1: 2}}, 'start': 0}
+        
+        adjacency = {'graph': {'0': {'1': 4, '2': 1}, '1': {}, '2': {'1': 2}}, 'start': '0'}
+        csr = {'format': 'csr', 'offsets': [0, 2, 2, 3], 'targets': [1, 2, 1], 'weights': [4, 1, 2], 'start': 0}
+        edges = {'format': 'edges', 'edges': [[0, 1, 4], [0, 2, 1], [2, 1, 2]], 'start': 0}
+        
+        for payload in (adjacency, csr, edges):
+            self.assertEqual(parse_graph_input(payload, weighted=True), expected)
+        self.assertEqual(parse_graph_input(edges)['graph'], {0: [1, 2], 1: [], 2: [1]})
+    
+    def test_invalid_graphs_are_rejected(self):
+        for payload in (
+            {'graph': {'0': [1]}, 'start': 5},
+            {'format': 'csr', 'offsets': [0, 2], 'targets': [1]},
+            {'format': 'edges', 'edges': [[0]]},
+            {'graph': {'a': [0]}},
+        ):
+            with self.assertRaises(ValueError):
+                parse_graph_input(payload)
+    
+    def test_execute_algorithm_accepts_graph_payload(self):
+        response = self.client.post('/api/execute-algorithm/', {
+            'algorithm_id': self.algorithm.id,
+            'input_data': {'format': 'edges', 'edges': [[0, 1, 4], [0, 2, 1], [2, 1, 2]], 'start': 0}
+        }, content_type='application/json')
+        
+        self.assertEqual(response.status_code, 200)
+        steps = response.json()['steps']
+        self.assertEqual(steps[-1]['distances'], {'0': 0, '1': 3, '2': 1})
+        self.assertIn('state', steps[0])
+        self.assertTrue(all('state' not in step for step in steps[1:]))
+    
+    def test_execute_algorithm_rejects_bad_graph(self):
+        response = self.client.post('/api/execute-algorithm/', {
+            'algorithm_id': self.algorithm.id,
+            'input_data': {'graph': {'0': {'1': -1}}}
+        }, content_type='application/json')
+        
+        self.assertEqual(response.status_code, 400)
+
+
+class BenchmarkTests(TestCase):
+    def test_benchmark_covers_every_algorithm_and_shape(self):
+        results = run_benchmarks(sizes=[8], repeat=1)
+        
+        cases = {(result['algorithm'], result['shape']) for result in results}
+        self.assertIn(('Bubble Sort', 'reversed'), cases)
+        self.assertIn(("Dijkstra's Algorithm", 'dense'), cases)
+        self.assertTrue(all(result['step_count'] > 0 and result['json_bytes'] > 0 for result in results))
+    
+    def test_compare_reports_regressions(self):
+        baseline = [{'algorithm': 'Bubble Sort', 'shape': 'random', 'size': 8,
+                     'wall_time': 0.01, 'peak_memory': 1000, 'step_count': 50, 'json_bytes': 4000}]
+        current = [dict(baseline[0], wall_time=0.012, step_count=80)]
+        
+        regressions = compare_results(baseline, current)
+        self.assertEqual([regression['metric'] for regression in regressions], ['step_count'])
+    
+    def test_command_saves_and_compares_baseline(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'baseline.json')
+            options = {'algorithms': ['Quick Sort'], 'sizes': [8], 'repeat': 1, 'stdout': StringIO()}
+            call_command('benchmark_engine', save=path, **options)
+            self.assertEqual(len(load_results(path)), 5)
+            
+            out = StringIO()
+            call_command('benchmark_engine', compare=path, time_threshold=100, **dict(options, stdout=out))
+            self.assertIn('No regressions', out.getvalue())
+    
+    def test_compare_refuses_baseline_from_other_generator(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'baseline.json')
+            options = {'algorithms': ['Quick Sort'], 'sizes': [8], 'repeat': 1, 'stdout': StringIO()}
+            call_command('benchmark_engine', save=path, **options)
+            with open(path) as f:
+                report = json.load(f)
+            self.assertEqual(report['generator'], INPUT_GENERATOR)
+            
+            report['generator'] = 'numpy' if INPUT_GENERATOR == 'random' else 'random'
+            with open(path, 'w') as f:
+                json.dump(report, f)
+            with self.assertRaises(CommandError):
+                call_command('benchmark_engine', compare=path, **options)
+
+
+class TraceBudgetTests(TestCase):
+    def setUp(self):
+        self.algorithm = create_algorithm('Bubble Sort')
+    
+    def test_estimate_tracks_actual_step_count(self):
+        data = list(range(40, 0, -1))
+        estimate = estimate_trace_cost('Bubble Sort', data)
+        steps = execute_algorithm_steps('Bubble Sort', data)
+        
+        self.assertGreaterEqual(estimate['steps'], len(steps))
+        self.assertLess(estimate['steps'], len(steps) * 1.5)
+        self.assertLess(estimate_trace_cost('Merge Sort', data)['steps'], estimate['steps'])
+    
+    def test_oversized_input_is_rejected_before_running(self):
+        response = self.client.post('/api/execute-algorithm/', {
+            'algorithm_id': self.algorithm.id,
+            'input_data': list(range(10000, 0, -1))
+        }, content_type='application/json')
+        
+        self.assertEqual(response.status_code, 413)
+        self.assertGreater(response.json()['estimatedSteps'], response.json()['maxSteps'])
+    
+    @override_settings(TRACE_MAX_BYTES=5 * 1024 * 1024)
+    def test_full_trace_over_byte_budget_is_downgraded_to_delta(self):
+        response = self.client.post('/api/execute-algorithm/', {
+            'algorithm_id': self.algorithm.id,
+            'input_data': list(range(100, 0, -1))
+        }, content_type='application/json')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['traceFormat'], 'delta')
+    
+    def test_estimate_endpoint(self):
+        response = self.client.post('/api/estimate/', {
+            'algorithm_id': self.algorithm.id,
+            'input_data': list(range(10000))
+        }, content_type='application/json')
+        
+        data = response.json()
+        self.assertFalse(data['withinBudget'])
+        self.assertEqual(data['inputSize'], 10000)
+        self.assertEqual(Visualization.objects.count(), 0)
+
+
+class TraceExecutorTests(TestCase):
+    def test_pool_results_match_inline_execution(self):
+        with override_settings(TRACE_EXECUTOR_WORKERS=2):
+            pooled = run_trace('Merge Sort', [5, 2, 4, 1], messages='catalogue')
+        self.assertEqual(pooled, execute_algorithm_steps('Merge Sort', [5, 2, 4, 1], messages='catalogue'))
+    
+    @override_settings(TRACE_EXECUTOR_WORKERS=1, TRACE_EXECUTOR_TIMEOUT=0.5)
+    def test_runaway_job_times_out_and_pool_recovers(self):
+        started = time.monotonic()
+        with self.assertRaises(TraceTimeoutError), self.assertLogs('visualizer.executor', 'WARNING'):
+            executor.run(time.sleep, 30)
+        self.assertLess(time.monotonic() - started, 5)
+        
+        self.assertEqual(run_trace('Bubble Sort', [2, 1])[-1]['type'], 'final')
+    
+    @override_settings(TRACE_EXECUTOR_WORKERS=2, TRACE_EXECUTOR_TIMEOUT=2)
+    def test_runaway_job_only_fails_itself(self):
+        results = {}
+        
+        def submit(name, seconds):
+            try:
+                results[name] = executor.run(time.sleep, seconds)
+            except TraceExecutionError as e:
+                results[name] = e
+        
+        # Start both workers first so neither job waits for a process to spawn
+        warm_up = [threading.Thread(target=submit, args=(name, 0.2)) for name in ('runaway', 'other')]
+        for thread in warm_up:
+            thread.start()
+        for thread in warm_up:
+            thread.join()
+        
+        runaway = threading.Thread(target=submit, args=('runaway', 30))
+        other = threading.Thread(target=submit, args=('other', 1.5))
+        with self.assertLogs('visualizer.executor', 'WARNING'):
+            runaway.start()
+            time.sleep(1)
+            other.start()
+            runaway.join()
+            other.join()
+        
+        # The other job was still running when the runaway one was killed
+        self.assertIsInstance(results['runaway'], TraceTimeoutError)
+        self.assertIsNone(results['other'])
+    
+    @override_settings(TRACE_EXECUTOR_WORKERS=1, TRACE_EXECUTOR_TIMEOUT=1)
+    def test_timeout_excludes_time_waiting_for_a_worker(self):
+        threads = [threading.Thread(target=executor.run, args=(time.sleep, 0.7)) for _ in range(2)]
+        with self.assertNoLogs('visualizer.executor', 'WARNING'):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+
+class BatchExecutionTests(TestCase):
+    def setUp(self):
+        self.algorithms = [
+            create_algorithm(name, time_complexity=complexity, space_complexity='O(n)')
+            for name, complexity in (("Bubble Sort", "O(n²)"), ("Merge Sort", "O(n log n)"), ("Quick Sort", "O(n log n)"))
+        ]
+    
+    def test_batch_returns_traces_and_metrics_in_request_order(self):
+        data = [5, 3, 8, 1, 9, 2, 7]
+        with self.assertNumQueries(1):
+            response = self.client.post('/api/execute-algorithm/batch/', {
+                'algorithm_ids': [algorithm.id for algorithm in reversed(self.algorithms)],
+                'input_data': data
+            }, content_type='application/json')
+        
+        results = response.json()['results']
+        self.assertEqual([result['algorithm']['name'] for result in results], ['Quick Sort', 'Merge Sort', 'Bubble Sort'])
+        bubble = results[2]
+        self.assertEqual(bubble['metrics'], summarize_trace(execute_algorithm_steps('Bubble Sort', data)))
+        self.assertEqual(bubble['metrics']['swaps'], 10)
+        self.assertEqual(bubble['metrics']['steps'], len(bubble['steps']))
+    
+    def test_unknown_algorithm_is_rejected(self):
+        response = self.client.post('/api/execute-algorithm/batch/', {
+            'algorithm_ids': [self.algorithms[0].id, 9999],
+            'input_data': [3, 1, 2]
+        }, content_type='application/json')
+        
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json()['missing'], [9999])
+    
+    def test_graph_input_errors_are_reported_per_algorithm(self):
+        response = self.client.post('/api/execute-algorithm/batch/', {
+            'algorithm_ids': [self.algorithms[0].id],
+            'input_data': {'graph': {'0': [1]}}
+        }, content_type='application/json')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['status'], 400)
+
+
+
+@override_settings(VISUALIZATION_ASYNC_SAVE=False)
+class AsyncExecutionTests(TestCase):
+    def setUp(self):
+        self.algorithm = create_algorithm('Insertion Sort')
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+    
+    async def test_async_view_matches_sync_view(self):
+        payload = {'algorithm_id': self.algorithm.id, 'input_data': [4, 2, 3, 1], 'trace_format': 'delta'}
+        
+        async_response = await self.async_client.post('/api/execute-algorithm/async/', payload, content_type='application/json')
+        sync_response = await self.async_client.post('/api/execute-algorithm/', payload, content_type='application/json')
+        
+        self.assertEqual(async_response.status_code, 200)
+        self.assertEqual(async_response.json(), sync_response.json())
+    
+    async def test_async_view_saves_for_authenticated_users(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.post('/api/execute-algorithm/async/', {
+            'algorithm_id': self.algorithm.id,
+            'input_data': [2, 1]
+        }, content_type='application/json')
+        
+        self.assertEqual(response.status_code, 200)
+        visualization = await Visualization.objects.select_related('trace').aget(user=self.user)
+        self.assertEqual(visualization.steps, execute_algorithm_steps('Insertion Sort', [2, 1]))
+    
+    async def test_async_view_errors(self):
+        missing = await self.async_client.post('/api/execute-algorithm/async/', {
+            'algorithm_id': 9999,
+            'input_data': [2, 1]
+        }, content_type='application/json')
+        malformed = await self.async_client.post('/api/execute-algorithm/async/', 'not json', content_type='application/json')
+        
+        self.assertEqual(missing.status_code, 404)
+        self.assertEqual(malformed.status_code, 400)
+
+
+class DashboardCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.algorithm = create_algorithm('Bubble Sort')
+    
+    def test_warm_dashboard_only_reads_the_catalogue_version(self):
+        self.client.get('/dashboard/')
+        
+        with self.assertNumQueries(1):
+            response = self.client.get('/dashboard/')
+        self.assertContains(response, 'Bubble Sort')
+    
+    def test_changes_made_by_another_process_invalidate_the_cache(self):
+        self.client.get('/dashboard/')
+        
+        # Another process changes the catalogue; its signals bump the shared version, not this cache
+        Algorithm.objects.filter(pk=self.algorithm.pk).update(name='Cocktail Sort')
+        CatalogueVersion.objects.update(version=F('version') + 1)
+        self.assertContains(self.client.get('/dashboard/'), 'Cocktail Sort')
+    
+    def test_catalogue_changes_invalidate_the_cache(self):
+        self.client.get('/dashboard/')
+        
+        self.algorithm.name = 'Cocktail Sort'
+        self.algorithm.save()
+        self.assertContains(self.client.get('/dashboard/'), 'Cocktail Sort')
+        
+        self.algorithm.delete()
+        self.assertNotContains(self.client.get('/dashboard/'), 'Cocktail Sort')
+
+
+class AlgorithmApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.array = DataStructure.objects.create(name="Array", category="linear", description="Contiguous elements")
+        for name in ("Bubble Sort", "Merge Sort", "Quick Sort"):
+            algorithm = create_algorithm(name)
+            algorithm.data_structures.add(self.array)
+    
+    def test_listing_prefetches_data_structures(self):
+        # Catalogue version for the ETag and Last-Modified, algorithms, data structures
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/algorithms/')
+        self.assertEqual(response.json()[0]['data_structures'][0]['name'], 'Array')
+    
+    def test_sparse_fieldset(self):
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/algorithms/?fields=id,name')
+        self.assertEqual(set(response.json()[0]), {'id', 'name'})
+    
+    def test_conditional_requests(self):
+        response = self.client.get('/api/algorithms/')
+        etag = response['ETag']
+        self.assertIn('no-cache', response['Cache-Control'])
+        
+        # Only the catalogue version is read
+        with self.assertNumQueries(1):
+            not_modified = self.client.get('/api/algorithms/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(not_modified.status_code, 304)
+        
+        self.assertNotEqual(self.client.get('/api/algorithms/?fields=name')['ETag'], etag)
+        
+        Algorithm.objects.filter(name="Quick Sort").get().delete()
+        changed = self.client.get('/api/algorithms/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(len(changed.json()), 2)
+    
+    def test_validators_follow_changes_made_by_another_process(self):
+        response = self.client.get('/api/algorithms/')
+        cache.clear()
+        self.assertEqual(self.client.get('/api/algorithms/')['ETag'], response['ETag'])
+        
+        # Another process's signals bump the shared version without touching this cache
+        CatalogueVersion.objects.update(version=F('version') + 1)
+        changed = self.client.get('/api/algorithms/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(changed.status_code, 200)
+
+
+
+@override_settings(VISUALIZATION_ASYNC_SAVE=False)
+class VisualizationHistoryQueryTests(TestCase):
+    def setUp(self):
+        self.algorithm = create_algorithm('Bubble Sort')
+        self.user = User.objects.create_user(username="testuser", password="testpassword")
+        self.client.force_login(self.user)
+    
+    def add_visualizations(self, count):
+        for i in range(count):
+            data = [i + 2, i + 1, i]
+            Visualization.objects.create(
+                algorithm=self.algorithm,
+                input_data=data,
+                steps=execute_algorithm_steps('Bubble Sort', data),
+                name=f"Run {i}",
+                user=self.user
+            )
+    
+    def test_history_query_count_does_not_grow_with_page_size(self):
+        self.add_visualizations(2)
+        # Session, user and one select for the page
+        with self.assertNumQueries(3):
+            self.client.get('/api/visualizations/')
+        
+        self.add_visualizations(8)
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/visualizations/')
+        self.assertEqual(response.json()['results'][0]['name'], 'Run 7')
+    
+    def test_cursor_pagination_walks_history_newest_first(self):
+        self.add_visualizations(7)
+        
+        names = []
+        url = '/api/visualizations/?page_size=3'
+        while url:
+            with self.assertNumQueries(3):
+                page = self.client.get(url).json()
+            self.assertLessEqual(len(page['results']), 3)
+            names.extend(item['name'] for item in page['results'])
+            url = page['next']
+        
+        self.assertEqual(names, [f"Run {i}" for i in range(6, -1, -1)])
+    
+    def test_history_queries_use_composite_indexes_and_skip_traces(self):
+        history = Visualization.objects.filter(user=self.user).order_by('-created_at')
+        examples = Visualization.objects.filter(algorithm=self.algorithm, user=self.user).order_by('-created_at')
+        
+        if connection.vendor == 'sqlite':
+            self.assertIn('viz_user_created_idx', history.explain())
+            self.assertIn('viz_algo_user_created_idx', examples.explain())
+        
+        with self.assertNumQueries(3):
+            response = self.client.get(f'/visualization/{self.algorithm.id}/')
+        self.assertEqual(response.status_code, 200)
+        for visualization in response.context['example_visualizations']:
+            self.assertEqual(visualization.get_deferred_fields(), {'input_data', 'trace_id'})
+
+
+class ResponseCompressionTests(TestCase):
+    def setUp(self):
+        self.algorithm = create_algorithm('Bubble Sort')
+        self.payload = {'algorithm_id': self.algorithm.id, 'input_data': list(range(40, 0, -1))}
+    
+    def test_execute_response_is_gzipped_when_accepted(self):
+        plain = self.client.post('/api/execute-algorithm/', self.payload, content_type='application/json')
+        response = self.client.post('/api/execute-algorithm/', self.payload, content_type='application/json',
+                                    HTTP_ACCEPT_ENCODING='gzip')
+        
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertLess(len(response.content), len(plain.content))
+        self.assertEqual(json.loads(gzip.decompress(response.content)), plain.json())
+        self.assertFalse(plain.has_header('Content-Encoding'))
+    
+    async def test_async_requests_are_compressed_without_thread_adaptation(self):
+        # Django only logs middleware adaptation with DEBUG on
+        with override_settings(DEBUG=True), self.assertNoLogs('django.request', level='DEBUG'):
+            ASGIHandler()
+        
+        response = await self.async_client.post('/api/execute-algorithm/async/', self.payload,
+                                                 content_type='application/json', headers={'accept-encoding': 'gzip'})
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(json.loads(gzip.decompress(response.content))['algorithm']['name'], 'Bubble Sort')
+    
+    def test_html_is_not_compressed(self):
+        response = self.client.get('/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+    
+    def test_dumps_json_is_compact_and_accepts_int_keys(self):
+        self.assertEqual(dumps_json({'distances': {0: 0, 1: None}}), b'{"distances":{"0":0,"1":null}}')
+    
+    def test_integers_wider_than_64_bits_are_rendered(self):
+        self.assertEqual(dumps_json([2 ** 70, 1]), b'[1180591620717411303424,1]')
+        
+        response = self.client.post('/api/execute-algorithm/', dict(self.payload, input_data=[2 ** 70, 1, 3]),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['steps'][-1]['state'], [1, 3, 2 ** 70])
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        reset_metrics()
+        self.algorithm = create_algorithm('Bubble Sort')
+    
+    def test_execution_is_recorded_in_histograms(self):
+        self.client.post('/api/execute-algorithm/', {
+            'algorithm_id': self.algorithm.id, 'input_data': [3, 1, 2]
+        }, content_type='application/json')
+        
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        for phase in ('generate', 'serialize'):
+            self.assertIn(f'algoviz_execute_phase_seconds_count{{algorithm="Bubble Sort",phase="{phase}"}} 1', body)
+        self.assertIn('algoviz_execute_seconds_count{algorithm="Bubble Sort"} 1', body)
+        self.assertIn('algoviz_trace_steps_bucket{algorithm="Bubble Sort",le="+Inf"} 1', body)
+        self.assertIn('algoviz_response_bytes_count{algorithm="Bubble Sort"} 1', body)
+    
+    @override_settings(METRICS_ENABLED=False)
+    def test_disabled_metrics_record_nothing(self):
+        self.client.post('/api/execute-algorithm/', {
+            'algorithm_id': self.algorithm.id, 'input_data': [3, 1, 2]
+        }, content_type='application/json')
+        self.assertEqual(self.client.get('/metrics').status_code, 404)
+        
+        with override_settings(METRICS_ENABLED=True):
+            body = self.client.get('/metrics').content.decode()
+        self.assertNotIn('Bubble Sort', body)
+
+
+
+@override_settings(TRACE_EXECUTOR_WORKERS=0, VISUALIZATION_ASYNC_SAVE=False)
+class ProfilingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.algorithm = create_algorithm('Bubble Sort')
+        self.payload = {'algorithm_id': self.algorithm.id, 'input_data': [5, 2, 4, 1, 3]}
+    
+    def test_staff_get_profile_with_trace(self):
+        staff = User.objects.create_user(username='staff', password='testpassword', is_staff=True)
+        self.client.force_login(staff)
+        
+        response = self.client.post('/api/execute-algorithm/?profile=1', self.payload, content_type='application/json')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Trace-Cache'], 'bypass')
+        profile = response.json()['profile']
+        self.assertGreater(profile['wallTime'], 0)
+        self.assertTrue(any('bubble_sort' in function['function'] for function in profile['functions']))
+    
+    def test_profile_is_staff_only(self):
+        response = self.client.post('/api/execute-algorithm/?profile=1', self.payload, content_type='application/json')
+        self.assertEqual(response.status_code, 403)
+    
+    def test_command_replays_saved_visualization(self):
+        visualization = Visualization.objects.create(
+            algorithm=self.algorithm, input_data=[3, 1, 2],
+            steps=execute_algorithm_steps('Bubble Sort', [3, 1, 2])
+        )
+        out = StringIO()
+        call_command('profile_visualization', visualization.id, top=5, stdout=out)
+        
+        self.assertIn('Bubble Sort:', out.getvalue())
+        self.assertIn('bubble_sort', out.getvalue())
+
+
+class LevelOfDetailTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.algorithm = create_algorithm('Bubble Sort')
+        self.data = [9, 4, 7, 1, 8, 2, 6, 3, 5]
+    
+    def test_levels_keep_only_their_step_types(self):
+        full = execute_algorithm_steps('Bubble Sort', self.data)
+        swaps = execute_algorithm_steps('Bubble Sort', self.data, detail='swaps-only')
+        passes = execute_algorithm_steps('Bubble Sort', self.data, detail='pass-level')
+        
+        self.assertLess(len(passes), len(swaps))
+        self.assertLess(len(swaps), len(full))
+        self.assertTrue(all(step['type'] in MILESTONE_STEP_TYPES for step in passes))
+        self.assertTrue(all(step['type'] in MILESTONE_STEP_TYPES | STATE_CHANGE_STEP_TYPES for step in swaps))
+        self.assertEqual([step for step in full if step['type'] not in ('comparison', 'no_swap')], swaps)
+    
+    def test_frame_limit_keeps_first_and_last_steps(self):
+        data = list(range(60, 0, -1))
+        steps = execute_algorithm_steps('Insertion Sort', data, detail=50)
+        
+        self.assertLessEqual(len(steps), 50)
+        self.assertGreater(len(steps), 20)
+        self.assertEqual(steps[0]['type'], 'initial')
+        self.assertEqual(steps[-1]['state'], sorted(data))
+    
+    def test_dropped_dijkstra_updates_are_carried_forward(self):
+        graph = {i: {j: (i * j) % 7 + 1 for j in range(12) if j != i and (i + j) % 3 == 0} for i in range(12)}
+        for detail in ('pass-level', 8):
+            distances = {0: 0}
+            for step in execute_algorithm_steps("Dijkstra's Algorithm", {'graph': graph, 'start': 0}, detail=detail):
+                distances.update(step.get('distance_update', {}))
+                if step['type'] == 'dijkstra_current':
+                    self.assertEqual(distances[step['current_node']], step['current_distance'])
+    
+    def test_execute_accepts_detail(self):
+        response = self.client.post('/api/execute-algorithm/', {
+            'algorithm_id': self.algorithm.id, 'input_data': self.data, 'detail': 'pass-level'
+        }, content_type='application/json')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['detail'], 'pass-level')
+        self.assertEqual(response.json()['steps'], execute_algorithm_steps('Bubble Sort', self.data, detail='pass-level'))
+        
+        response = self.client.post('/api/execute-algorithm/', {
+            'algorithm_id': self.algorithm.id, 'input_data': self.data, 'detail': 'sparse'
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+    
+    @override_settings(TRACE_MAX_BYTES=1024 * 1024)
+    def test_frame_limit_brings_large_trace_within_byte_budget(self):
+        payload = {'algorithm_id': self.algorithm.id, 'input_data': list(range(200, 0, -1))}
+        self.assertFalse(self.client.post('/api/estimate/', payload, content_type='application/json').json()['withinBudget'])
+        
+        response = self.client.post('/api/estimate/', dict(payload, detail=500), content_type='application/json')
+        self.assertTrue(response.json()['withinBudget'])
+        self.assertEqual(response.json()['estimatedSteps'], 500)
+        self.assertGreater(response.json()['estimatedWork'], 40000)
+    
+    def test_frame_limit_does_not_lift_the_step_budget(self):
+        response = self.client.post('/api/execute-algorithm/', {
+            'algorithm_id': self.algorithm.id, 'input_data': list(range(20000)), 'detail': 3
+        }, content_type='application/json')
+        
+        # The engine still runs every comparison of the full trace
+        self.assertEqual(response.status_code, 413)
+        self.assertGreater(response.json()['estimatedWork'], response.json()['maxWork'])
+    
+    def test_coarse_detail_admits_inputs_full_detail_rejects(self):
+        payload = {'algorithm_id': self.algorithm.id, 'input_data': list(range(600, 0, -1))}
+        response = self.client.post('/api/execute-algorithm/', payload, content_type='application/json')
+        self.assertEqual(response.status_code, 413)
+        
+        for detail in ('pass-level', 50):
+            response = self.client.post('/api/execute-algorithm/', dict(payload, detail=detail), content_type='application/json')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()['steps'][-1]['state'], list(range(1, 601)))
+
+
+
+@override_settings(TRACE_EXECUTOR_WORKERS=0)
+class OperationCountTests(TestCase):
+    def setUp(self):
+        self.algorithm = create_algorithm('Merge Sort', time_complexity='O(n log n)', space_complexity='O(n)')
+    
+    def test_counts_match_the_full_trace(self):
+        for name, data in [('Quick Sort', [5, 2, 4, 6, 1, 3]), ('BST Insertion', [5, 2, 8, 1, 9]),
+                           ("Dijkstra's Algorithm", {'graph': {0: {1: 4, 2: 1}, 2: {1: 2}}, 'start': 0})]:
+            counts, final_step, wall_time = count_algorithm_operations(name, data)
+            steps = execute_algorithm_steps(name, data, messages='catalogue')
+            
+            self.assertEqual(counts, summarize_trace(steps))
+            self.assertEqual(final_step, steps[-1])
+            self.assertGreaterEqual(wall_time, 0)
+    
+    def test_comparisons_without_a_step_are_counted(self):
+        counts = count_algorithm_operations('Insertion Sort', list(range(100)))[0]
+        self.assertEqual(counts['comparisons'], 99)
+        
+        data = [5, 2, 4, 6, 1, 3]
+        counts = count_algorithm_operations('Insertion Sort', data)[0]
+        trace_counts = summarize_trace(execute_algorithm_steps('Insertion Sort', data))
+        # Every shift loop but the two that run out of elements ends on a failed comparison
+        self.assertEqual(counts['comparisons'], trace_counts['comparisons'] + 3)
+        self.assertEqual(counts['steps'], trace_counts['steps'])
+    
+    def test_graph_searches_count_large_graphs(self):
+        size = 50000
+        graph = {node: [node + 1] for node in range(size - 1)}
+        for name in ('Breadth-First Search', 'Depth-First Search'):
+            counts, final_step, wall_time = count_algorithm_operations(name, {'graph': graph, 'start': 0})
+            
+            self.assertEqual(len(final_step['visited']), size)
+            # Quadratic membership checks took over ten seconds here
+            self.assertLess(wall_time, 5)
+    
+    def test_quick_sort_counts_ordered_input_deeper_than_the_recursion_limit(self):
+        for data in (list(range(2000)), list(range(2000, 0, -1))):
+            counts, final_step, _ = count_algorithm_operations('Quick Sort', data)
+            
+            self.assertEqual(final_step['state'], sorted(data))
+            self.assertEqual(counts['comparisons'], 2000 * 1999 // 2)
+    
+    def test_merge_sort_count_memory_is_linear(self):
+        tracemalloc.start()
+        try:
+            count_algorithm_operations('Merge Sort', list(range(20000, 0, -1)))
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        
+        # Segment bookkeeping of n log n indices peaked at about 17 MB here
+        self.assertLess(peak, 5 * 1024 * 1024)
+    
+    def test_failed_search_ends_with_not_found_at_every_detail(self):
+        data = {'array': [4, 8, 15, 16, 23, 42], 'target': 5}
+        for name in ('Linear Search', 'Binary Search'):
+            self.assertEqual(count_algorithm_operations(name, data)[1]['type'], 'not_found')
+            for detail in ('full', 'pass-level', 3):
+                self.assertEqual(execute_algorithm_steps(name, data, detail=detail)[-1]['type'], 'not_found')
+    
+    def test_endpoint_counts_generated_input_beyond_trace_budget(self):
+        response = self.client.post('/api/execute-algorithm/counts/', {
+            'algorithm_id': self.algorithm.id,
+            'generate': {'shape': 'reversed', 'size': 20000}
+        }, content_type='application/json')
+        
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['inputSize'], 20000)
+        self.assertGreater(data['counts']['comparisons'], 20000)
+        self.assertGreater(data['counts']['accesses'], data['counts']['writes'])
+        self.assertEqual(data['final']['state'], sorted(data['final']['state']))
+        self.assertEqual(data['generator'], INPUT_GENERATOR)
+        self.assertEqual(Visualization.objects.count(), 0)
+    
+    def test_endpoint_rejects_oversized_inputs(self):
+        response = self.client.post('/api/execute-algorithm/counts/', {
+            'algorithm_id': self.algorithm.id,
+            'generate': {'shape': 'random', 'size': 10 ** 7}
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 413)
+        
+        with override_settings(COUNT_MAX_STEPS=1000):
+            response = self.client.post('/api/execute-algorithm/counts/', {
+                'algorithm_id': self.algorithm.id, 'input_data': list(range(500))
+            }, content_type='application/json')
+        self.assertEqual(response.status_code, 413)
+
+
+@override_settings(TRACE_EXECUTOR_WORKERS=0, COMPLEXITY_MAX_STEPS=100000)
+class ComplexityCurveTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.algorithm = create_algorithm('Bubble Sort')
+    
+    def test_fit_recovers_complexity_classes(self):
+        sizes = [16, 32, 64, 128, 256]
+        self.assertEqual(fit_complexity(sizes, [3 * n * n + 5 for n in sizes])[0]['class'], 'O(n²)')
+        self.assertEqual(fit_complexity(sizes, [2 * n + 1 for n in sizes])[0]['class'], 'O(n)')
+        best = fit_complexity(sizes, [n.bit_length() * n for n in sizes])[0]
+        self.assertEqual(best['class'], 'O(n log n)')
+        self.assertLess(best['error'], 0.2)
+    
+    def test_nearly_sorted_input(self):
+        values = make_input('Bubble Sort', 'nearly-sorted', 200, seed=1)
+        
+        self.assertEqual(values, make_input('Bubble Sort', 'nearly-sorted', 200, seed=1))
+        self.assertEqual(len(values), 200)
+        out_of_place = sum(1 for value, expected in zip(values, sorted(values)) if value != expected)
+        self.assertLessEqual(out_of_place, 2 * nearly_sorted_swaps(200))
+    
+    def test_endpoint_measures_and_caches_curve(self):
+        url = f'/api/algorithms/{self.algorithm.id}/complexity/?shape=reversed'
+        response = self.client.get(url)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Complexity-Cache'], 'miss')
+        data = response.json()
+        self.assertEqual(data['complexity'], 'O(n²)')
+        self.assertEqual(data['declared'], 'O(n²)')
+        sizes = [point['size'] for point in data['points']]
+        self.assertEqual(sizes, [16 * 2 ** k for k in range(len(sizes))])
+        self.assertGreaterEqual(len(sizes), 3)
+        self.assertEqual(data['fits']['swaps'][0]['class'], 'O(n²)')
+        
+        cached = self.client.get(url)
+        self.assertEqual(cached['X-Complexity-Cache'], 'hit')
+        self.assertEqual(cached.json()['points'], data['points'])
+        
+        # Clients cannot pick the inputs, so query parameters cannot force a new measurement
+        self.assertEqual(self.client.get(url + '&seed=7')['X-Complexity-Cache'], 'hit')
+    
+    def test_endpoint_rejects_unknown_shape(self):
+        response = self.client.get(f'/api/algorithms/{self.algorithm.id}/complexity/?shape=dense')
+        self.assertEqual(response.status_code, 400)
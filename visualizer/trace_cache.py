@@ -0,0 +1,118 @@
+"""
+Content-addressed cache for algorithm traces
+
+Traces are keyed by a canonical hash of (algorithm name, engine version, input)
+and stored in the cache configured by TRACE_CACHE_ALIAS. The default 'traces'
+cache is a LocMemCache, which evicts least recently used entries once
+MAX_ENTRIES is reached. Entries are bounded in size as well as in number:
+traces over TRACE_CACHE_MAX_STEPS steps or TRACE_CACHE_MAX_ENTRY_BYTES
+(estimated by the cost model) are not cached, so the cache holds at most
+MAX_ENTRIES * TRACE_CACHE_MAX_ENTRY_BYTES.
+"""
+
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .algorithm_engine import ENGINE_VERSION
+from .cost_model import estimate_trace_cost
+from .digests import canonical_digest
+from .executor import arun_trace, run_trace
+
+DEFAULT_TRACE_CACHE_ALIAS = 'traces'
+DEFAULT_TRACE_CACHE_MAX_STEPS = 50000
+DEFAULT_TRACE_CACHE_MAX_ENTRY_BYTES = 2 * 1024 * 1024
+
+_stats_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0}
+
+
+def trace_cache_key(algorithm_name, input_data, **options):
+    """Cache key for the trace of ``algorithm_name`` run on ``input_data``"""
+    digest = canonical_digest([algorithm_name, ENGINE_VERSION, input_data, options])
+    return f'trace:{digest}'
+
+
+def get_trace_cache():
+    return caches[getattr(settings, 'TRACE_CACHE_ALIAS', DEFAULT_TRACE_CACHE_ALIAS)]
+
+
+def is_cacheable(algorithm_name, input_data, steps, **options):
+    """True if a computed trace is within the step and byte limits of a cache entry"""
+    if len(steps) > getattr(settings, 'TRACE_CACHE_MAX_STEPS', DEFAULT_TRACE_CACHE_MAX_STEPS):
+        return False
+    estimate = estimate_trace_cost(
+        algorithm_name, input_data, options.get('messages', 'inline'), options.get('trace_format', 'full'),
+        options.get('detail', 'full')
+    )
+    # Scaled to the actual step count, which the estimate only bounds
+    estimated_bytes = len(steps) * estimate['bytes'] / max(estimate['steps'], 1)
+    return estimated_bytes <= getattr(settings, 'TRACE_CACHE_MAX_ENTRY_BYTES', DEFAULT_TRACE_CACHE_MAX_ENTRY_BYTES)
+
+
+def get_or_compute_trace(algorithm_name, input_data, **options):
+    """
+    Return (steps, cache_hit) for the algorithm run on ``input_data``.
+    ``options`` are passed to executor.generate_trace and are part of the key.
+    Misses are computed in the trace worker pool (see executor.run_trace).
+    Traces over the entry limits (see is_cacheable) are computed but not
+    cached so a single huge trace cannot flush the whole cache.
+    """
+    cache = get_trace_cache()
+    key = trace_cache_key(algorithm_name, input_data, **options)
+
+    steps = cache.get(key)
+    if steps is not None:
+        _record('hits')
+        return steps, True
+
+    _record('misses')
+    steps = run_trace(algorithm_name, input_data, **options)
+
+    if is_cacheable(algorithm_name, input_data, steps, **options):
+        cache.set(key, steps)
+
+    return steps, False
+
+
+async def aget_or_compute_trace(algorithm_name, input_data, **options):
+    """Async variant of get_or_compute_trace for async views"""
+    cache = get_trace_cache()
+    key = trace_cache_key(algorithm_name, input_data, **options)
+
+    steps = await cache.aget(key)
+    if steps is not None:
+        _record('hits')
+        return steps, True
+
+    _record('misses')
+    steps = await arun_trace(algorithm_name, input_data, **options)
+
+    if is_cacheable(algorithm_name, input_data, steps, **options):
+        await cache.aset(key, steps)
+
+    return steps, False
+
+
+def trace_cache_stats():
+    """Hit/miss counters for this process"""
+    with _stats_lock:
+        hits, misses = _stats['hits'], _stats['misses']
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': hits / total if total else 0.0,
+    }
+
+
+def reset_trace_cache_stats():
+    with _stats_lock:
+        _stats['hits'] = 0
+        _stats['misses'] = 0
+
+
+def _record(counter):
+    with _stats_lock:
+        _stats[counter] += 1
@@ -0,0 +1,140 @@
+"""
+Compact trace encoding for AlgoViz3D
+
+Array-based traces (the sorting and searching algorithms) carry a full copy of
+the array in every step. The delta format keeps a full ``state`` only on
+keyframe steps and describes every other step by how the array changed since
+the previous step, so the player can seek to the nearest keyframe and replay
+deltas from there.
+
+Delta step format:
+    keyframe step:  {..., 'keyframe': True, 'state': [...]}
+    other steps:    {..., 'delta': {'swap': [i, j]}}
+                    {..., 'delta': {'set': [[index, value], ...]}}
+                    {..., 'delta': {}}          # array unchanged
+"""
+
+DEFAULT_KEYFRAME_INTERVAL = 64
+
+TRACE_FORMATS = ('full', 'delta')
+
+
+def iter_delta_steps(steps, keyframe_interval=DEFAULT_KEYFRAME_INTERVAL):
+    """
+    Lazily delta-encode an iterable of full steps.
+    Only the previous array is held in memory, so this can be chained onto a
+    step generator without materialising the whole trace.
+    """
+    keyframe_interval = max(1, int(keyframe_interval))
+    previous = None
+
+    for index, step in enumerate(steps):
+        state = step.get('state')
+
+        # Non-array states (graphs, empty trees) are passed through untouched
+        if not isinstance(state, list):
+            yield step
+            continue
+
+        encoded = {key: value for key, value in step.items() if key != 'state'}
+        delta = _array_delta(previous, state)
+
+        if delta is None or index % keyframe_interval == 0:
+            encoded['keyframe'] = True
+            encoded['state'] = list(state)
+        else:
+            encoded['delta'] = delta
+
+        previous = list(state)
+        yield encoded
+
+
+def encode_delta_trace(steps, keyframe_interval=DEFAULT_KEYFRAME_INTERVAL):
+    """Delta-encode a full trace and return the encoded step list"""
+    return list(iter_delta_steps(steps, keyframe_interval))
+
+
+def expand_delta_trace(steps):
+    """
+    Rebuild full steps (with a 'state' on every step) from a delta trace.
+    Full traces are returned unchanged.
+    """
+    if not is_delta_trace(steps):
+        return steps
+    return _expand_steps(steps)
+
+
+def expand_delta_window(steps, start, stop):
+    """
+    Full steps for ``steps[start:stop]`` of a delta trace, replayed from the
+    last keyframe at or before ``start`` so only that window is expanded.
+    """
+    if start >= len(steps):
+        return []
+    first = start
+    while first > 0 and 'delta' in steps[first]:
+        first -= 1
+    return _expand_steps(steps[first:stop])[start - first:]
+
+
+def is_delta_trace(steps):
+    """Return True if the step list is in the delta format"""
+    return any(isinstance(step, dict) and 'delta' in step for step in steps)
+
+
+def _expand_steps(steps):
+    """Full steps for delta steps that start on a keyframe"""
+    expanded = []
+    current = None
+
+    for step in steps:
+        full_step = {key: value for key, value in step.items() if key not in ('delta', 'keyframe')}
+
+        if 'delta' in step and current is not None:
+            current = _apply_delta(current, step['delta'])
+            full_step['state'] = list(current)
+        elif isinstance(step.get('state'), list):
+            current = list(step['state'])
+
+        expanded.append(full_step)
+
+    return expanded
+
+
+def _array_delta(previous, current):
+    """
+    Describe how ``current`` differs from ``previous``.
+    Returns None when a keyframe is cheaper (no previous array, a change in
+    length, or more than half of the array rewritten).
+    """
+    if previous is None or len(previous) != len(current):
+        return None
+
+    changed = [i for i, (old, new) in enumerate(zip(previous, current)) if old != new]
+
+    if not changed:
+        return {}
+
+    if len(changed) == 2:
+        i, j = changed
+        if previous[i] == current[j] and previous[j] == current[i]:
+            return {'swap': [i, j]}
+
+    if len(changed) * 2 > len(current):
+        return None
+
+    return {'set': [[i, current[i]] for i in changed]}
+
+
+def _apply_delta(array, delta):
+    """Apply a single delta to a copy of ``array``"""
+    result = list(array)
+
+    if 'swap' in delta:
+        i, j = delta['swap']
+        result[i], result[j] = result[j], result[i]
+
+    for index, value in delta.get('set', []):
+        result[index] = value
+
+    return result
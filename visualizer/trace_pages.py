@@ -0,0 +1,64 @@
+"""
+Decoded traces for the paged steps endpoint
+
+A saved trace is a single compressed blob, so reading any window of it means
+decompressing and parsing the whole trace. DecodedTraceCache keeps the most
+recently paged traces decoded in this process, keyed by blob digest (blobs are
+immutable), so paging through a trace decodes it once rather than once per
+page. It holds at most TRACE_PAGE_CACHE_MAX_STEPS steps in total, evicting the
+least recently used traces; longer traces are decoded on every request.
+"""
+
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+from .models import TraceBlob
+
+DEFAULT_TRACE_PAGE_CACHE_MAX_STEPS = 100000
+
+
+class DecodedTraceCache:
+    """Least recently used decoded traces, bounded by their total step count"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._traces = OrderedDict()
+        self._step_total = 0
+
+    def get_steps(self, blob):
+        """
+        The steps of ``blob``, which may be loaded without its step columns:
+        they are only read from the database when the trace is not held.
+        """
+        with self._lock:
+            steps = self._traces.get(blob.digest)
+            if steps is not None:
+                self._traces.move_to_end(blob.digest)
+                return steps
+
+        steps = TraceBlob.objects.only('compressed_steps', 'legacy_steps').get(pk=blob.pk).steps
+        self._store(blob.digest, steps)
+        return steps
+
+    def _store(self, digest, steps):
+        max_steps = getattr(settings, 'TRACE_PAGE_CACHE_MAX_STEPS', DEFAULT_TRACE_PAGE_CACHE_MAX_STEPS)
+        if len(steps) > max_steps:
+            return
+        with self._lock:
+            if digest in self._traces:
+                return
+            self._traces[digest] = steps
+            self._step_total += len(steps)
+            while self._step_total > max_steps:
+                _, evicted = self._traces.popitem(last=False)
+                self._step_total -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._traces.clear()
+            self._step_total = 0
+
+
+decoded_traces = DecodedTraceCache()
@@ -19,4 +19,12 @@ urlpatterns = [
     # API endpoints
     path('api/', include(router.urls)),
     path('api/execute-algorithm/', views.execute_algorithm, name='execute-algorithm'),
+    path('api/execute-algorithm/stream/', views.stream_algorithm, name='execute-algorithm-stream'),
+    path('api/execute-algorithm/async/', views.execute_algorithm_async, name='execute-algorithm-async'),
+    path('api/execute-algorithm/batch/', views.execute_algorithm_batch, name='execute-algorithm-batch'),
+    path('api/execute-algorithm/counts/', views.count_algorithm, name='execute-algorithm-counts'),
+    path('api/estimate/', views.estimate_algorithm, name='estimate-algorithm'),
+    
+    # Monitoring
+    path('metrics', views.metrics, name='metrics'),
 ]
\ No newline at end of file
@@ -1,14 +1,30 @@
+from django.conf import settings
 from django.shortcuts import render, get_object_or_404
-from django.http import JsonResponse
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
-from rest_framework.decorators import api_view
+from django.views.decorators.http import require_POST
+from rest_framework.decorators import api_view, renderer_classes
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.renderers import BrowsableAPIRenderer
 import json
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-from .models import Algorithm, DataStructure, Visualization
-from .algorithm_engine import execute_algorithm_steps
+from .models import Algorithm, Visualization
+from .catalogue import DEFAULT_CATALOGUE_CACHE_TIMEOUT, get_catalogue_version, get_grouped_catalogue
+from .persistence import asave_visualization, save_visualization
+from .renderers import EventStreamRenderer, FastJSONRenderer, NDJSONRenderer, dumps_json
+from .trace_cache import aget_or_compute_trace, get_or_compute_trace
+from .cost_model import estimate_trace_cost, get_trace_budget, get_work_budget, plan_trace
+from .executor import TraceExecutionError, TraceTimeoutError, executor
+from .metrics import CONTENT_TYPE, metrics_enabled, observe_rendering, observe_response, observe_trace, render_metrics, span
+from .graph_input import GRAPH_ALGORITHMS, is_graph_algorithm, parse_graph_input
+from .profiling import DEFAULT_PROFILE_TOP_FUNCTIONS, profile_trace
+from .benchmarks import INPUT_GENERATOR, input_elements, make_input, shapes_for
+from .algorithm_engine import DETAIL_LEVELS, MESSAGE_CATALOGUES, MESSAGE_MODES, MIN_FRAMES, count_algorithm_operations, is_valid_detail, iter_algorithm_steps, render_step_messages, summarize_trace
+from .trace_encoding import DEFAULT_KEYFRAME_INTERVAL, TRACE_FORMATS, encode_delta_trace, iter_delta_steps
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -19,28 +35,13 @@ def index(request):
 
 def dashboard(request):
     """Dashboard page with algorithm and data structure selection"""
-    # Get all algorithms and data structures
-    algorithms = Algorithm.objects.all().order_by('category', 'name')
-    data_structures = DataStructure.objects.all().order_by('category', 'name')
-    
-    # Group algorithms by category
-    algorithm_categories = {}
-    for algorithm in algorithms:
-        if algorithm.category not in algorithm_categories:
-            algorithm_categories[algorithm.category] = []
-        algorithm_categories[algorithm.category].append(algorithm)
-    
-    # Group data structures by category
-    data_structure_categories = {}
-    for data_structure in data_structures:
-        if data_structure.category not in data_structure_categories:
-            data_structure_categories[data_structure.category] = []
-        data_structure_categories[data_structure.category].append(data_structure)
-    
-    context = {
-        'algorithm_categories': algorithm_categories,
-        'data_structure_categories': data_structure_categories,
-    }
+    # Grouped catalogue and rendered sidebar are cached until a catalogue model changes
+    catalogue_version = get_catalogue_version()
+    context = dict(
+        get_grouped_catalogue(catalogue_version),
+        catalogue_version=catalogue_version,
+        catalogue_cache_timeout=getattr(settings, 'CATALOGUE_CACHE_TIMEOUT', DEFAULT_CATALOGUE_CACHE_TIMEOUT),
+    )
     
     return render(request, 'dashboard.html', context)
 
@@ -54,10 +55,11 @@ def visualization(request, algorithm_id):
     # Get example visualizations if user is authenticated
     example_visualizations = []
     if request.user.is_authenticated:
+        # Served by the (algorithm, user, -created_at) index; traces and inputs are not loaded
         example_visualizations = Visualization.objects.filter(
             algorithm=algorithm,
             user=request.user
-        ).order_by('-created_at')[:5]
+        ).only('id', 'name', 'created_at', 'algorithm_id', 'user_id').order_by('-created_at')[:5]
     
     context = {
         'algorithm': algorithm,
@@ -84,43 +86,245 @@ def saved_visualization(request, visualization_id):
     
     return render(request, 'saved_visualization.html', context)
 
+def _validate_options(data):
+    """
+    Validate the trace options shared by the execute endpoints.
+    Returns (options, error_response).
+    """
+    options = {
+        'trace_format': data.get('trace_format', 'full'),
+        'messages': data.get('messages', 'inline'),
+        'detail': data.get('detail', 'full'),
+    }
+    
+    # A maximum frame count may arrive as a string from a query parameter
+    if isinstance(options['detail'], str) and options['detail'].isdigit():
+        options['detail'] = int(options['detail'])
+    
+    if options['trace_format'] not in TRACE_FORMATS:
+        return None, Response({'error': f"Unknown trace format '{options['trace_format']}'"}, status=status.HTTP_400_BAD_REQUEST)
+    
+    if options['messages'] not in MESSAGE_MODES:
+        return None, Response({'error': f"Unknown message mode '{options['messages']}'"}, status=status.HTTP_400_BAD_REQUEST)
+    
+    if not is_valid_detail(options['detail']):
+        levels = ', '.join(DETAIL_LEVELS)
+        return None, Response({
+            'error': f"detail must be one of {levels} or a number of steps of at least {MIN_FRAMES}"
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    return options, None
+
+def _prepare_input(algorithm, input_data):
+    """
+    Check that the input suits the algorithm, normalising graph payloads.
+    Returns (input_data, error_response).
+    """
+    # Graph payloads are only meaningful for graph algorithms
+    if isinstance(input_data, dict):
+        if not is_graph_algorithm(algorithm.name):
+            return None, Response({'error': f'{algorithm.name} requires an input data array'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            input_data = parse_graph_input(input_data, weighted=GRAPH_ALGORITHMS[algorithm.name])
+        except ValueError as e:
+            return None, Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    return input_data, None
+
+def _validate_execute_payload(data):
+    """
+    Validate the fields of an execute request that need no database access.
+    Returns (algorithm_id, input_data, options, error_response).
+    """
+    algorithm_id = data.get('algorithm_id')
+    input_data = data.get('input_data', [])
+    
+    # Validate input data
+    if not algorithm_id:
+        return None, None, None, Response({'error': 'Algorithm ID is required'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    if not input_data or not isinstance(input_data, (list, dict)):
+        return None, None, None, Response({'error': 'Valid input data array is required'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    options, error_response = _validate_options(data)
+    if error_response is not None:
+        return None, None, None, error_response
+    
+    return algorithm_id, input_data, options, None
+
+def _validate_execute_request(data):
+    """
+    Validate an execute request payload.
+    Returns (algorithm, input_data, options, error_response); error_response
+    is None when the request is valid.
+    """
+    algorithm_id, input_data, options, error_response = _validate_execute_payload(data)
+    if error_response is not None:
+        return None, None, None, error_response
+    
+    # Get algorithm
+    try:
+        algorithm = Algorithm.objects.get(id=algorithm_id)
+    except (Algorithm.DoesNotExist, ValueError):
+        return None, None, None, Response({'error': 'Algorithm not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    input_data, error_response = _prepare_input(algorithm, input_data)
+    if error_response is not None:
+        return None, None, None, error_response
+    
+    return algorithm, input_data, options, None
+
+def _check_trace_budget(algorithm, input_data, options):
+    """
+    Apply the trace budget to a validated request before running it.
+    Downgrades options['trace_format'] to 'delta' when only that fits;
+    returns an error response when the trace would still be too large.
+    """
+    try:
+        trace_format, estimate, within_budget = plan_trace(
+            algorithm.name, input_data, options['messages'], options['trace_format'], options['detail']
+        )
+    except ValueError:
+        # No cost model (unknown algorithm); execution reports the error itself
+        return None
+    
+    if not within_budget:
+        max_steps, max_bytes = get_trace_budget(algorithm.name)
+        return Response({
+            'error': f'Input is too large for {algorithm.name}',
+            'estimatedSteps': estimate['steps'],
+            'estimatedBytes': estimate['bytes'],
+            'estimatedWork': estimate['work'],
+            'maxSteps': max_steps,
+            'maxBytes': max_bytes,
+            'maxWork': get_work_budget(algorithm.name)
+        }, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+    
+    options['trace_format'] = trace_format
+    return None
+
+def _input_size_label(input_data):
+    """Describe the size of an input for logs and visualization names"""
+    if isinstance(input_data, dict):
+        return f"{len(input_data['graph'])} nodes"
+    return f"{len(input_data)} elements"
+
+def _algorithm_payload(algorithm):
+    """Algorithm metadata in the shape expected by the React component"""
+    return {
+        'id': algorithm.id,
+        'name': algorithm.name,
+        'description': algorithm.description,
+        'timeComplexity': algorithm.time_complexity,
+        'spaceComplexity': algorithm.space_complexity,
+        'code_implementation': algorithm.code_implementation
+    }
+
+def _checked_steps(steps, input_data):
+    """Replace a missing or empty trace with a single explanatory step"""
+    # Ensure steps is a list
+    if not isinstance(steps, list):
+        return [{'type': 'error', 'description': 'Algorithm execution did not return valid steps'}]
+    
+    # If steps is empty, add a placeholder step
+    if len(steps) == 0:
+        return [{'type': 'placeholder', 'description': 'No visualization steps returned', 'state': input_data}]
+    
+    return steps
+
+def _execution_error_response(error):
+    """Response for a trace job aborted by the worker pool"""
+    # Runaway jobs are reported as errors rather than as an error trace
+    logger.warning(f"Algorithm execution aborted: {str(error)}")
+    status_code = status.HTTP_504_GATEWAY_TIMEOUT if isinstance(error, TraceTimeoutError) else status.HTTP_503_SERVICE_UNAVAILABLE
+    return Response({'error': str(error)}, status=status_code)
+
+def _visualization_fields(algorithm, input_data, steps, options, user):
+    """Fields of the Visualization saved for an executed trace"""
+    # Saved traces always carry their text so they render without a catalogue
+    if options['messages'] == 'catalogue':
+        steps = list(render_step_messages(steps, MESSAGE_CATALOGUES.get(algorithm.name, {})))
+    return {
+        'algorithm': algorithm,
+        'input_data': input_data,
+        'steps': steps,
+        'user': user,
+        'name': f"{algorithm.name} - {_input_size_label(input_data)}"
+    }
+
+def _trace_options(options):
+    """
+    Options for get_or_compute_trace. Delta traces are encoded by the trace
+    job itself, so the full trace is never built in or sent to this process.
+    """
+    trace_options = {'messages': options['messages'], 'detail': options['detail']}
+    if options['trace_format'] == 'delta':
+        trace_options['trace_format'] = 'delta'
+        trace_options['keyframe_interval'] = getattr(settings, 'TRACE_KEYFRAME_INTERVAL', DEFAULT_KEYFRAME_INTERVAL)
+    return trace_options
+
+def _execute_payload(algorithm, input_data, steps, options):
+    """Format an executed trace, already in options['trace_format'], for the React component"""
+    payload = {
+        'algorithm': _algorithm_payload(algorithm),
+        'steps': steps,
+        'traceFormat': options['trace_format'],
+        'detail': options['detail'],
+        'inputData': input_data
+    }
+    if options['messages'] == 'catalogue':
+        payload['messageCatalogue'] = MESSAGE_CATALOGUES.get(algorithm.name, {})
+    return payload
+
+def _profile_requested(request):
+    return request.query_params.get('profile', '').lower() in ('1', 'true', 'yes')
+
+def _profiled_trace(algorithm, input_data, options):
+    """Run a trace under the profiler in the worker pool, bypassing the trace cache"""
+    limit = getattr(settings, 'PROFILE_TOP_FUNCTIONS', DEFAULT_PROFILE_TOP_FUNCTIONS)
+    steps, profile = executor.run(profile_trace, algorithm.name, input_data, limit=limit, messages=options['messages'], detail=options['detail'])
+    if options['trace_format'] == 'delta':
+        keyframe_interval = getattr(settings, 'TRACE_KEYFRAME_INTERVAL', DEFAULT_KEYFRAME_INTERVAL)
+        steps = encode_delta_trace(steps, keyframe_interval)
+    return steps, profile
+
 @csrf_exempt
 @api_view(['POST'])
+@renderer_classes([FastJSONRenderer, BrowsableAPIRenderer])
 def execute_algorithm(request):
-    """API endpoint to execute an algorithm and return visualization steps"""
+    """
+    API endpoint to execute an algorithm and return visualization steps.
+    Staff can add ?profile=1 to run the algorithm under cProfile and get the
+    most expensive functions back in a 'profile' field.
+    """
+    started = time.perf_counter()
     try:
-        # Parse the request data
-        data = request.data
-        algorithm_id = data.get('algorithm_id')
-        input_data = data.get('input_data', [])
-        
-        # Validate input data
-        if not algorithm_id:
-            return Response({'error': 'Algorithm ID is required'}, status=status.HTTP_400_BAD_REQUEST)
-        
-        if not input_data or not isinstance(input_data, list):
-            return Response({'error': 'Valid input data array is required'}, status=status.HTTP_400_BAD_REQUEST)
+        profile_requested = _profile_requested(request)
+        if profile_requested and not request.user.is_staff:
+            return Response({'error': 'Profiling is only available to staff'}, status=status.HTTP_403_FORBIDDEN)
         
-        # Get algorithm
-        try:
-            algorithm = Algorithm.objects.get(id=algorithm_id)
-        except Algorithm.DoesNotExist:
-            return Response({'error': 'Algorithm not found'}, status=status.HTTP_404_NOT_FOUND)
+        # Parse and validate the request data
+        algorithm, input_data, options, error_response = _validate_execute_request(request.data)
+        if error_response is None:
+            error_response = _check_trace_budget(algorithm, input_data, options)
+        if error_response is not None:
+            return error_response
         
         # Log the algorithm execution request
-        logger.info(f"Executing algorithm: {algorithm.name} with {len(input_data)} elements")
+        logger.info(f"Executing algorithm: {algorithm.name} with {_input_size_label(input_data)}")
         
-        # Execute algorithm and get steps
+        # Execute algorithm (or reuse a cached trace) and get steps
+        cache_hit = False
+        profile = None
         try:
-            steps = execute_algorithm_steps(algorithm.name, input_data)
-            
-            # Ensure steps is a list
-            if not isinstance(steps, list):
-                steps = [{'type': 'error', 'description': 'Algorithm execution did not return valid steps'}]
-                
-            # If steps is empty, add a placeholder step
-            if len(steps) == 0:
-                steps = [{'type': 'placeholder', 'description': 'No visualization steps returned', 'state': input_data}]
+            with span(algorithm.name, 'generate'):
+                if profile_requested:
+                    steps, profile = _profiled_trace(algorithm, input_data, options)
+                else:
+                    steps, cache_hit = get_or_compute_trace(algorithm.name, input_data, **_trace_options(options))
+            steps = _checked_steps(steps, input_data)
+        except TraceExecutionError as e:
+            return _execution_error_response(e)
         except Exception as e:
             logger.error(f"Error executing algorithm: {str(e)}")
             # Create a default step showing the input data
@@ -128,33 +332,389 @@ def execute_algorithm(request):
                 {'type': 'error', 'description': f'Error executing algorithm: {str(e)}', 'state': input_data}
             ]
         
-        # Create visualization record if user is authenticated
+        observe_trace(algorithm.name, steps)
+        
+        # Save a visualization record if user is authenticated, off the request path when enabled
         if request.user.is_authenticated:
             try:
-                Visualization.objects.create(
-                    algorithm=algorithm,
-                    input_data=input_data,
-                    steps=steps,
-                    user=request.user,
-                    name=f"{algorithm.name} - {len(input_data)} elements"
-                )
+                with span(algorithm.name, 'save'):
+                    save_visualization(**_visualization_fields(algorithm, input_data, steps, options, request.user))
             except Exception as e:
                 logger.error(f"Error saving visualization: {str(e)}")
         
-        # Format the response for the React component
-        return Response({
-            'algorithm': {
-                'id': algorithm.id,
-                'name': algorithm.name,
-                'description': algorithm.description,
-                'timeComplexity': algorithm.time_complexity,
-                'spaceComplexity': algorithm.space_complexity,
-                'code_implementation': algorithm.code_implementation
-            },
-            'steps': steps,
-            'inputData': input_data
-        })
+        payload = _execute_payload(algorithm, input_data, steps, options)
+        if profile is not None:
+            payload['profile'] = profile
+        
+        response = Response(payload)
+        response['X-Trace-Cache'] = 'bypass' if profile is not None else ('hit' if cache_hit else 'miss')
+        observe_rendering(response, algorithm.name, started)
+        return response
     
     except Exception as e:
         logger.error(f"Unexpected error in execute_algorithm: {str(e)}")
-        return Response({'error': f'Server error: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+        return Response({'error': f'Server error: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+def _json_response(response):
+    """Convert a DRF error response for use from a plain Django view"""
+    return JsonResponse(response.data, status=response.status_code)
+
+@csrf_exempt
+@require_POST
+async def execute_algorithm_async(request):
+    """
+    Async variant of execute_algorithm for ASGI deployments.
+    The algorithm lookup and inline saves use the async ORM, and the trace is
+    awaited on the worker pool, so slow clients do not each hold a thread.
+    """
+    started = time.perf_counter()
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        return JsonResponse({'error': 'Request body must be valid JSON'}, status=status.HTTP_400_BAD_REQUEST)
+    if not isinstance(data, dict):
+        return JsonResponse({'error': 'Request body must be a JSON object'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    algorithm_id, input_data, options, error_response = _validate_execute_payload(data)
+    if error_response is not None:
+        return _json_response(error_response)
+    
+    try:
+        algorithm = await Algorithm.objects.aget(id=algorithm_id)
+    except (Algorithm.DoesNotExist, ValueError):
+        return JsonResponse({'error': 'Algorithm not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    input_data, error_response = _prepare_input(algorithm, input_data)
+    if error_response is None:
+        error_response = _check_trace_budget(algorithm, input_data, options)
+    if error_response is not None:
+        return _json_response(error_response)
+    
+    logger.info(f"Executing algorithm (async): {algorithm.name} with {_input_size_label(input_data)}")
+    
+    cache_hit = False
+    try:
+        with span(algorithm.name, 'generate'):
+            steps, cache_hit = await aget_or_compute_trace(algorithm.name, input_data, **_trace_options(options))
+        steps = _checked_steps(steps, input_data)
+    except TraceExecutionError as e:
+        return _json_response(_execution_error_response(e))
+    except Exception as e:
+        logger.error(f"Error executing algorithm: {str(e)}")
+        steps = [
+            {'type': 'error', 'description': f'Error executing algorithm: {str(e)}', 'state': input_data}
+        ]
+    
+    observe_trace(algorithm.name, steps)
+    
+    user = await request.auser()
+    if user.is_authenticated:
+        try:
+            with span(algorithm.name, 'save'):
+                await asave_visualization(**_visualization_fields(algorithm, input_data, steps, options, user))
+        except Exception as e:
+            logger.error(f"Error saving visualization: {str(e)}")
+    
+    with span(algorithm.name, 'serialize'):
+        content = dumps_json(_execute_payload(algorithm, input_data, steps, options))
+    observe_response(algorithm.name, started, content)
+    
+    response = HttpResponse(content, content_type='application/json')
+    response['X-Trace-Cache'] = 'hit' if cache_hit else 'miss'
+    return response
+
+def _execute_batch_item(algorithm, input_data, options):
+    """Run one algorithm of a batch request and return its result entry"""
+    options = dict(options)
+    result = {'algorithm': _algorithm_payload(algorithm)}
+    
+    input_data, error_response = _prepare_input(algorithm, input_data)
+    if error_response is None:
+        error_response = _check_trace_budget(algorithm, input_data, options)
+    if error_response is not None:
+        result.update(error_response.data, status=error_response.status_code)
+        return result
+    
+    try:
+        with span(algorithm.name, 'generate'):
+            steps, _ = get_or_compute_trace(algorithm.name, input_data, **_trace_options(options))
+    except TraceExecutionError as e:
+        error_response = _execution_error_response(e)
+        result.update(error_response.data, status=error_response.status_code)
+        return result
+    except Exception as e:
+        logger.error(f"Error executing algorithm in batch: {str(e)}")
+        result.update(error=f'Error executing algorithm: {str(e)}', status=status.HTTP_400_BAD_REQUEST)
+        return result
+    
+    observe_trace(algorithm.name, steps)
+    result = _execute_payload(algorithm, input_data, steps, options)
+    del result['inputData']
+    result['metrics'] = summarize_trace(steps)
+    return result
+
+@csrf_exempt
+@api_view(['POST'])
+@renderer_classes([FastJSONRenderer, BrowsableAPIRenderer])
+def execute_algorithm_batch(request):
+    """
+    API endpoint to run several algorithms on the same input.
+    Traces are generated in parallel and returned together with comparative
+    metrics (steps, comparisons, swaps, writes). An algorithm that cannot run
+    gets an error entry instead of failing the whole batch.
+    """
+    algorithm_ids = request.data.get('algorithm_ids')
+    input_data = request.data.get('input_data', [])
+    max_algorithms = getattr(settings, 'BATCH_MAX_ALGORITHMS', 8)
+    
+    if not algorithm_ids or not isinstance(algorithm_ids, list):
+        return Response({'error': 'A list of algorithm IDs is required'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        algorithm_ids = [int(algorithm_id) for algorithm_id in algorithm_ids]
+    except (TypeError, ValueError):
+        return Response({'error': 'Algorithm IDs must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    # Keep the requested order but run each algorithm once
+    algorithm_ids = list(dict.fromkeys(algorithm_ids))
+    if len(algorithm_ids) > max_algorithms:
+        return Response({'error': f'At most {max_algorithms} algorithms can be run in one batch'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    if not input_data or not isinstance(input_data, (list, dict)):
+        return Response({'error': 'Valid input data array is required'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    options, error_response = _validate_options(request.data)
+    if error_response is not None:
+        return error_response
+    
+    algorithms = Algorithm.objects.in_bulk(algorithm_ids)
+    missing = [algorithm_id for algorithm_id in algorithm_ids if algorithm_id not in algorithms]
+    if missing:
+        return Response({'error': 'Algorithm not found', 'missing': missing}, status=status.HTTP_404_NOT_FOUND)
+    
+    logger.info(f"Executing batch of {len(algorithm_ids)} algorithms")
+    
+    # Each thread waits on its own job in the trace worker pool, so the traces run in parallel
+    ordered = [algorithms[algorithm_id] for algorithm_id in algorithm_ids]
+    with ThreadPoolExecutor(max_workers=len(ordered)) as pool:
+        results = list(pool.map(lambda algorithm: _execute_batch_item(algorithm, input_data, options), ordered))
+    
+    return Response({
+        'inputData': input_data,
+        'results': results
+    })
+
+def _encode_stream_event(event, payload, stream_format):
+    """Encode one stream event as an NDJSON line or a server-sent event"""
+    if stream_format == 'sse':
+        return f"event: {event}\ndata: ".encode('utf-8') + dumps_json(payload) + b'\n\n'
+    return dumps_json({'event': event, 'data': payload}) + b'\n'
+
+def _stream_steps(algorithm, input_data, steps, options, stream_format):
+    """Yield encoded stream events for a step generator, one step at a time"""
+    meta = {
+        'algorithm': _algorithm_payload(algorithm),
+        'traceFormat': options['trace_format'],
+        'detail': options['detail'],
+        'inputData': input_data
+    }
+    if options['messages'] == 'catalogue':
+        meta['messageCatalogue'] = MESSAGE_CATALOGUES[algorithm.name]
+    yield _encode_stream_event('meta', meta, stream_format)
+    
+    step_count = 0
+    try:
+        for step in steps:
+            yield _encode_stream_event('step', step, stream_format)
+            step_count += 1
+    except Exception as e:
+        logger.error(f"Error streaming algorithm: {str(e)}")
+        yield _encode_stream_event('error', {'error': f'Error executing algorithm: {str(e)}'}, stream_format)
+        return
+    
+    yield _encode_stream_event('end', {'stepCount': step_count}, stream_format)
+
+@csrf_exempt
+@api_view(['GET', 'POST'])
+@renderer_classes([FastJSONRenderer, NDJSONRenderer, EventStreamRenderer])
+def stream_algorithm(request):
+    """
+    API endpoint that streams visualization steps as they are produced.
+    Emits newline-delimited JSON by default, or server-sent events when
+    stream_format=sse or the client accepts text/event-stream. GET requests
+    (for EventSource) pass input_data as a JSON-encoded query parameter.
+    Streamed traces are not saved as visualizations.
+    """
+    if request.method == 'GET':
+        data = request.query_params.dict()
+        try:
+            data['input_data'] = json.loads(data.get('input_data', '[]'))
+        except ValueError:
+            return Response({'error': 'input_data must be a JSON array or graph object'}, status=status.HTTP_400_BAD_REQUEST)
+    else:
+        data = request.data
+    
+    algorithm, input_data, options, error_response = _validate_execute_request(data)
+    if error_response is None:
+        error_response = _check_trace_budget(algorithm, input_data, options)
+    if error_response is not None:
+        return error_response
+    
+    stream_format = data.get('stream_format')
+    if stream_format is None:
+        stream_format = 'sse' if 'text/event-stream' in request.META.get('HTTP_ACCEPT', '') else 'ndjson'
+    if stream_format not in ('ndjson', 'sse'):
+        return Response({'error': f"Unknown stream format '{stream_format}'"}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        steps = iter_algorithm_steps(algorithm.name, input_data, messages=options['messages'], detail=options['detail'])
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    if options['trace_format'] == 'delta':
+        keyframe_interval = getattr(settings, 'TRACE_KEYFRAME_INTERVAL', DEFAULT_KEYFRAME_INTERVAL)
+        steps = iter_delta_steps(steps, keyframe_interval)
+    
+    logger.info(f"Streaming algorithm: {algorithm.name} with {_input_size_label(input_data)}")
+    
+    response = StreamingHttpResponse(
+        _stream_steps(algorithm, input_data, steps, options, stream_format),
+        content_type='text/event-stream' if stream_format == 'sse' else 'application/x-ndjson'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+def _count_input(algorithm, data):
+    """
+    Input for an operation count request: input_data as sent, or one built
+    from a 'generate' spec of shape, size and seed (see benchmarks.make_input).
+    Returns (input_data, error_response).
+    """
+    spec = data.get('generate')
+    if spec is None:
+        input_data = data.get('input_data')
+        if not input_data or not isinstance(input_data, (list, dict)):
+            return None, Response({'error': 'input_data or generate is required'}, status=status.HTTP_400_BAD_REQUEST)
+        return _prepare_input(algorithm, input_data)
+    
+    if not isinstance(spec, dict):
+        return None, Response({'error': 'generate must be an object with shape, size and seed'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    shapes = shapes_for(algorithm.name)
+    shape = spec.get('shape', shapes[0])
+    size = spec.get('size')
+    seed = spec.get('seed', 0)
+    if shape not in shapes:
+        return None, Response({'error': f"shape must be one of {', '.join(shapes)}"}, status=status.HTTP_400_BAD_REQUEST)
+    if not isinstance(size, int) or isinstance(size, bool) or size < 1:
+        return None, Response({'error': 'size must be a positive integer'}, status=status.HTTP_400_BAD_REQUEST)
+    if not isinstance(seed, int) or isinstance(seed, bool):
+        return None, Response({'error': 'seed must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    max_size = getattr(settings, 'COUNT_MAX_INPUT_SIZE', 1000000)
+    if input_elements(shape, size) > max_size:
+        return None, Response({
+            'error': f'A {shape} input of size {size} is too large to generate',
+            'maxInputSize': max_size
+        }, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+    
+    return make_input(algorithm.name, shape, size, seed), None
+
+@csrf_exempt
+@api_view(['POST'])
+@renderer_classes([FastJSONRenderer, BrowsableAPIRenderer])
+def count_algorithm(request):
+    """
+    API endpoint that runs an algorithm for its operation counts only.
+    No trace is built, so inputs far beyond the trace budgets can be
+    measured; the response has the comparison, swap, write and element
+    access counts, the time the run took and the final step.
+    """
+    algorithm_id = request.data.get('algorithm_id')
+    if not algorithm_id:
+        return Response({'error': 'Algorithm ID is required'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        algorithm = Algorithm.objects.get(id=algorithm_id)
+    except (Algorithm.DoesNotExist, ValueError):
+        return Response({'error': 'Algorithm not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    input_data, error_response = _count_input(algorithm, request.data)
+    if error_response is not None:
+        return error_response
+    
+    # Counting costs about as much per step as tracing minus the step itself
+    try:
+        estimate = estimate_trace_cost(algorithm.name, input_data)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    max_steps = getattr(settings, 'COUNT_MAX_STEPS', 50000000)
+    if estimate['steps'] > max_steps:
+        return Response({
+            'error': f'Input is too large for {algorithm.name}',
+            'estimatedSteps': estimate['steps'],
+            'maxSteps': max_steps
+        }, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+    
+    logger.info(f"Counting operations: {algorithm.name} with {_input_size_label(input_data)}")
+    
+    try:
+        with span(algorithm.name, 'count'):
+            counts, final_step, wall_time = executor.run(count_algorithm_operations, algorithm.name, input_data)
+    except TraceExecutionError as e:
+        return _execution_error_response(e)
+    except Exception as e:
+        logger.error(f"Error counting algorithm operations: {str(e)}")
+        return Response({'error': f'Error executing algorithm: {str(e)}'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    payload = {
+        'algorithm': _algorithm_payload(algorithm),
+        'inputSize': estimate['size'],
+        'counts': counts,
+        'wallTime': wall_time,
+        'final': final_step
+    }
+    if request.data.get('generate') is not None:
+        # Generated inputs depend on the generator as well as the seed
+        payload['generator'] = INPUT_GENERATOR
+    return Response(payload)
+
+@csrf_exempt
+@api_view(['POST'])
+def estimate_algorithm(request):
+    """
+    API endpoint that predicts the size of a trace without running it.
+    Takes the same payload as execute-algorithm and reports the trace format
+    that would be served and whether the request fits the budget.
+    """
+    algorithm, input_data, options, error_response = _validate_execute_request(request.data)
+    if error_response is not None:
+        return error_response
+    
+    try:
+        trace_format, estimate, within_budget = plan_trace(
+            algorithm.name, input_data, options['messages'], options['trace_format'], options['detail']
+        )
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    max_steps, max_bytes = get_trace_budget(algorithm.name)
+    
+    return Response({
+        'algorithm': _algorithm_payload(algorithm),
+        'inputSize': estimate['size'],
+        'estimatedSteps': estimate['steps'],
+        'estimatedBytes': estimate['bytes'],
+        'estimatedWork': estimate['work'],
+        'traceFormat': trace_format,
+        'detail': options['detail'],
+        'withinBudget': within_budget,
+        'maxSteps': max_steps,
+        'maxBytes': max_bytes,
+        'maxWork': get_work_budget(algorithm.name)
+    })
+
+def metrics(request):
+    """Trace execution metrics of this process in the Prometheus text format"""
+    if not metrics_enabled():
+        raise Http404('Metrics are disabled')
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE)